@@ -0,0 +1,498 @@
+# Autopilot
+# Drives a SnakeEngine in any game mode: A* from the head to the nearest
+# fruit, checked so the snake can never trap itself, and a Hamiltonian
+# cycle that finishes the board once the snake fills most of it.
+#
+#   pilot = Autopilot().attach(game)   # game.step() now steers itself
+#   autopilot.run(engine.SnakeEngine("Wall-less", "Hard"))   # headless
+
+import heapq
+from array import array
+from collections import deque
+
+import engine
+
+ENDGAME_FILL = 0.5   # Share of the board filled before the snake only follows the cycle
+SHORTCUT_MARGIN = 4  # Free cells kept ahead of the tail when cutting across the cycle
+SEARCH_BUDGET = 4096 # Cells searched per tick; longer searches go on while the snake holds its course
+SEARCH_CHUNK = 256   # Cells searched between checks on the budget
+
+
+def hamiltonian_cycle(width, height):
+    """A cycle through every cell as a list of positions, or None if the board has none.
+
+    Runs along the top row, zigzags down and up the remaining columns and
+    returns up column 0, so it needs an even width (or, transposed, an even
+    height).
+    """
+    runs = _cycle_runs(width, height)
+    if runs is None:
+        return None
+    return [(x + dx * i, y + dy * i) for x, y, dx, dy, count in runs for i in range(count)]
+
+
+def _cycle_runs(width, height):
+    """hamiltonian_cycle as straight runs of (x, y, dx, dy, count), or None."""
+    if width < 2 or height < 2:
+        return None
+    if width % 2:
+        if height % 2:
+            return None
+        return [(y, x, dy, dx, count) for x, y, dx, dy, count in _cycle_runs(height, width)]
+    runs = [(0, 0, 1, 0, width)]
+    for i, x in enumerate(range(width - 1, 0, -1)):
+        runs.append((x, 1, 0, 1, height - 1) if i % 2 == 0 else (x, height - 1, 0, -1, height - 1))
+    runs.append((0, height - 1, 0, -1, height - 1))
+    return runs
+
+
+class Autopilot:
+    """Chooses a direction for every tick of a game.
+
+    On boards with a Hamiltonian cycle and no obstacles the body is kept
+    in cycle order, tail to head, so every cell ahead of the head along
+    the cycle up to the tail is free. A* then searches only moves that go
+    forward along the cycle, no further than the fruit and short of the
+    tail by SHORTCUT_MARGIN, so any path it finds keeps that order and the
+    snake can never trap itself. Once the board is ENDGAME_FILL full the
+    snake follows the cycle exactly until the board is full.
+
+    Other boards (obstacles, or odd by odd sizes) use A* over the whole
+    grid instead, knowing when each body cell will be vacated, and only
+    take a path if the head can still reach the tail after eating;
+    otherwise the snake chases its tail until a safe path opens. If none
+    has opened after a board's worth of moves the snake takes the unsafe
+    path rather than circle forever.
+
+    A plan is followed move by move: cells ahead of the head can only be
+    vacated, never filled, until the target fruit is eaten, so the board
+    is searched about once per fruit rather than once per move.
+
+    Searches expand at most budget cells per tick. A plan that needs more
+    is searched for from where the snake will be after holding its course
+    long enough for the search to finish: following the cycle, or chasing
+    its tail round the loop of its body.
+    """
+    def __init__(self, endgame_fill=ENDGAME_FILL, budget=SEARCH_BUDGET):
+        self.endgame_fill = endgame_fill
+        self.budget = budget
+        self.plan = deque()       # (cell index, direction) still to move through
+        self.target = None        # Cell index of the planned fruit, None on a tail chase
+        self.searches = 0         # Board searches run, for load tests and benchmarks
+        self.stalled = 0          # Moves spent chasing the tail since the last fruit plan
+        self._pending = None      # Search for the plan that follows the course being held
+        self._tick = None
+        self._cycle_key = None
+        self._cycle_next = None    # Next cell along the cycle
+        self._cycle_order = None   # Position of each cell along the cycle
+        self._scratch = []         # Spare [g-scores, stamps, came-from, latest stamp] for searches
+
+    def attach(self, game):
+        self._cycle(game.board)   # Built now rather than on the first tick
+        game.autopilot = self
+        return self
+
+    def detach(self, game):
+        if game.autopilot is self:
+            game.autopilot = None
+
+    def reset(self):
+        self.plan.clear()
+        self.target = None
+        self.stalled = 0
+        self._drop_pending()
+
+    def _drop_pending(self):
+        if self._pending is not None:
+            self._pending.close()
+            self._pending = None
+
+    # --- Decision ---
+    def choose(self, game):
+        """Returns the direction to move on this tick, or None to keep going."""
+        if game.ticks != self._tick:
+            self.reset()   # New game, or steps taken without the autopilot
+        self._tick = game.ticks + 1
+        board = game.board
+        head = board.index(game.snake.get_head_position())
+        neighbors = self._neighbors(game, head)
+        use_cycle = not game.obstacles and self._cycle(board) is not None
+
+        if self.plan:
+            nxt = self.plan[0][0]
+            if (nxt not in neighbors or (board.fruit[nxt] and nxt != self.target) or
+                    (self.target is not None and not board.fruit[self.target])):
+                self.plan.clear()   # A fruit appeared on the way, or the target went
+                self._drop_pending()
+        if self._pending is not None:
+            done, path, _ = self._run(self._pending, self.budget)
+            if done:
+                self._pending = None
+                if path:
+                    self._follow(path)
+            elif not self.plan:
+                self._drop_pending()   # Held as long as the search was given; start over
+        if not self.plan and self._pending is None:
+            self._replan(game, use_cycle)
+        if self.plan:
+            if self.target is None:
+                self.stalled += 1
+            return engine.DIRECTIONS[self.plan.popleft()[1]]
+        if use_cycle:
+            return engine.DIRECTIONS[neighbors[self._cycle_next[head]]]
+        return None
+
+    def _replan(self, game, use_cycle):
+        """Plans from the head, or holds course while a longer search goes on."""
+        board = game.board
+        size = board.width * board.height
+        state = self._state(game)
+        if use_cycle:
+            if game.snake.length >= self.endgame_fill * size:
+                return
+            planner, passes = self._plan_along_cycle, 1
+        else:
+            fruits = len(game.fruits)
+            planner, passes = self._plan_to_fruit, 2 * (1 + (fruits if fruits > 1 else 0))
+        search = planner(game, state)
+        done, path, _ = self._run(search, self.budget)
+        if done:
+            if path:
+                self._follow(path)
+            elif not use_cycle:
+                self._plan_stall(game, state)
+            return
+        search.close()
+
+        # Each search expands a cell at most once, so this many ticks finish the plan
+        moves = passes * size // self.budget + 1
+        if use_cycle:
+            loop, cell = [], state[0][0]
+            for _ in range(moves):
+                cell = self._cycle_next[cell]
+                loop.append(cell)
+            hold = self._hold(game, state, loop, moves)
+            if hold is None:
+                return   # A fruit is closer than that along the cycle
+        else:
+            best, fallback = self._stall_route(game, state)
+            hold = None
+            if best is not None:
+                positions = state[0]
+                tail = best[-1][0]
+                # The route to the tail, then the old body from tail to head, is a loop the snake fits in
+                behind = positions.index(tail) if tail in positions else len(positions)
+                hold = self._hold(game, state, [cell for cell, _ in best] + positions[:behind][::-1], moves)
+            if hold is None:
+                self.target = None
+                self.plan.extend(best or fallback or [])
+                return
+        self.plan.extend(hold)
+        self.target = None
+        self._pending = planner(game, self._after(state, hold))
+
+    def _hold(self, game, state, loop, moves):
+        """moves steps round loop from the head, or None if they would eat a fruit."""
+        fruit = game.board.fruit
+        cells = [loop[i % len(loop)] for i in range(moves)]
+        if any(fruit[cell] for cell in cells):
+            return None
+        hold, cell = [], state[0][0]
+        for nxt in cells:
+            hold.append((nxt, self._neighbors(game, cell)[nxt]))
+            cell = nxt
+        return hold
+
+    def _follow(self, path):
+        self.plan.extend(path)
+        self.target = path[-1][0]
+        self.stalled = 0
+
+    def _plan_along_cycle(self, game, state):
+        """Searches for the shortest forward shortcut along the cycle to the next fruit ahead."""
+        board = game.board
+        positions, pending, _ = state
+        order = self._cycle_order
+        size = len(order)
+        here = order[positions[0]]
+        room = (order[positions[-1]] - here) % size or size
+        ahead = [((order[board.index(f.pos)] - here) % size, board.index(f.pos)) for f in game.fruits]
+        if not ahead:
+            return None
+        reach, fruit = min(ahead)
+        if reach + pending + SHORTCUT_MARGIN >= room:
+            return None   # Too close to the tail to cut across; follow the cycle
+
+        def passable(cell, moves, prev):
+            return (order[prev] - here) % size < (order[cell] - here) % size <= reach
+
+        return (yield from self._search(game, positions[0], {fruit}, passable))
+
+    def _plan_to_fruit(self, game, state):
+        """Searches for a path to the nearest fruit that leaves the tail reachable.
+
+        After a board's worth of moves chasing the tail any path will do.
+        """
+        board = game.board
+        risky = self.stalled > board.width * board.height
+        fruits = [board.index(fruit.pos) for fruit in game.fruits]
+        if game.obstacle_layout is not None:
+            field = game.obstacle_layout.distances()
+            fruits = [f for f in fruits if field[f] >= 0]   # No search can reach the others
+            if not fruits:
+                return None
+        candidates = [fruits] + ([[f] for f in fruits] if len(fruits) > 1 else [])
+        free_at = self._vacate_times(game, state)
+        for targets in candidates:
+            avoid = set(fruits) - set(targets)
+            path = yield from self._search(game, state[0][0], set(targets), self._passable(board, free_at, avoid))
+            if path and (risky or (yield from self._safe_after(game, state, path, eats=True)) is not None):
+                return path
+        return None
+
+    def _plan_stall(self, game, state):
+        """Plans a chase of the tail along the longest safe route, or any legal move."""
+        best, fallback = self._stall_route(game, state)
+        self.target = None
+        self.plan.extend(best or fallback or [])
+
+    def _stall_route(self, game, state):
+        """The longest safe chase of the tail and a legal first move, either possibly None.
+
+        The searches share one tick's budget; one that runs out counts as unsafe.
+        """
+        board = game.board
+        free_at = self._vacate_times(game, state)
+        best, fallback, budget = None, None, self.budget
+        for cell, d in self._neighbors(game, state[0][0]).items():
+            if free_at.get(cell, 0) > 1 or board.blocked[cell]:
+                continue
+            if fallback is None:
+                fallback = [(cell, d)]
+            search = self._safe_after(game, state, [(cell, d)], bool(board.fruit[cell]))
+            done, route, spent = self._run(search, budget)
+            budget -= spent
+            if not done:
+                search.close()
+            elif route is not None and (best is None or len(route) + 1 > len(best)):
+                best = [(cell, d)] + route
+        return best, fallback
+
+    # --- Search ---
+    def _neighbors(self, game, i):
+        """Maps each cell reachable in one move from cell i to its direction index."""
+        board = game.board
+        width, height = board.width, board.height
+        x, y = i % width, i // width
+        wrap = game.game_mode == "Wall-less"
+        result = {}
+        for d, (dx, dy) in enumerate(engine.DIRECTIONS):
+            nx, ny = x + dx, y + dy
+            if wrap:
+                nx %= width
+                ny %= height
+            elif not (0 <= nx < width and 0 <= ny < height):
+                continue
+            result[ny * width + nx] = d
+        return result
+
+    def _estimate(self, game, targets):
+        """Lower bound on the moves from a cell to the nearest target.
+
+        Manhattan distance, around the edges in Wall-less mode, read from
+        per-column and per-row tables. With obstacles it is raised to the
+        difference in the layout's distances from the start, which counts
+        the detours around them.
+        """
+        width, height = game.board.width, game.board.height
+        wrap = game.game_mode == "Wall-less"
+        field = game.obstacle_layout.distances() if game.obstacle_layout is not None else None
+
+        def axis(length, at):
+            return [min(abs(i - at), length - abs(i - at)) if wrap else abs(i - at) for i in range(length)]
+
+        tables = [(axis(width, t % width), axis(height, t // width), field[t] if field is not None else 0) for t in targets]
+        if len(tables) == 1:
+            (columns, rows, depth), = tables
+            if field is not None:
+                return lambda cell: max(columns[cell % width] + rows[cell // width], abs(field[cell] - depth))
+            return lambda cell: columns[cell % width] + rows[cell // width]
+        if field is not None:
+            return lambda cell: min(max(columns[cell % width] + rows[cell // width], abs(field[cell] - depth))
+                                    for columns, rows, depth in tables)
+        return lambda cell: min(columns[cell % width] + rows[cell // width] for columns, rows, _ in tables)
+
+    def _search(self, game, start, targets, passable):
+        """A* from start to the nearest target as [(cell, direction)], or None.
+
+        A generator that yields the cells it has expanded every
+        SEARCH_CHUNK, so _run can spread it over ticks, and returns the
+        path. passable(cell, moves, prev) says whether the cell may be
+        entered from prev on the given move number.
+        """
+        self.searches += 1
+        board = game.board
+        width = board.width
+        size = width * board.height
+        wrap = game.game_mode == "Wall-less"
+        steps = [(d, dy * width + dx, dx) for d, (dx, dy) in enumerate(engine.DIRECTIONS)]
+        estimate = self._estimate(game, targets)
+        scratch = self._borrow(size)
+        g_score, seen, came, mark = scratch
+        try:
+            g_score[start] = 0
+            seen[start] = mark
+            rest = estimate(start)
+            heap = [(rest, rest, start)]   # Ties go to the cell nearest a target
+            work = 0
+            while heap:
+                f, rest, cell = heapq.heappop(heap)
+                if cell in targets:
+                    path = []
+                    while cell != start:
+                        path.append((cell, came[cell] & 3))
+                        cell = came[cell] >> 2
+                    path.reverse()
+                    return path
+                g = f - rest
+                if g > g_score[cell]:
+                    continue
+                work += 1
+                if work == SEARCH_CHUNK:
+                    yield work
+                    work = 0
+                g += 1
+                x = cell % width
+                for d, delta, dx in steps:
+                    nxt = cell + delta
+                    if dx:
+                        if not 0 <= x + dx < width:
+                            if not wrap:
+                                continue
+                            nxt -= dx * width
+                    elif not 0 <= nxt < size:
+                        if not wrap:
+                            continue
+                        nxt %= size
+                    if (seen[nxt] == mark and g >= g_score[nxt]) or not passable(nxt, g, cell):
+                        continue
+                    seen[nxt] = mark
+                    g_score[nxt] = g
+                    came[nxt] = cell << 2 | d   # Previous cell and the direction from it
+                    rest = estimate(nxt)
+                    heapq.heappush(heap, (g + rest, rest, nxt))
+            return None
+        finally:
+            self._scratch.append(scratch)
+
+    def _borrow(self, size):
+        """Arrays for one search over size cells, reused once it finishes."""
+        while self._scratch:
+            scratch = self._scratch.pop()
+            if len(scratch[0]) == size:
+                break
+        else:
+            scratch = [array('i', bytes(4 * size)) for _ in range(3)] + [0]
+        scratch[3] += 1   # Cells stamped with an older search count as unseen
+        return scratch
+
+    def _run(self, search, budget):
+        """Advances a search by about budget cells: (finished, result, cells expanded)."""
+        spent = 0
+        try:
+            while spent < budget:
+                spent += next(search)
+        except StopIteration as stop:
+            return True, stop.value, spent
+        return False, None, spent
+
+    def _passable(self, board, free_at, avoid=()):
+        """Cells without obstacles or avoided fruit, entered no earlier than free_at allows."""
+        blocked = board.blocked
+        return lambda cell, moves, prev: not blocked[cell] and cell not in avoid and free_at.get(cell, 0) <= moves
+
+    def _state(self, game):
+        """The snake as (cells head first, growth still owed, heading or None)."""
+        snake = game.snake
+        positions = [game.board.index(pos) for pos in snake.positions]
+        heading = engine.DIRECTIONS.index(snake.next_direction) if snake.length > 1 else None
+        return positions, snake.length - len(positions), heading
+
+    def _after(self, state, path, eats=0):
+        """The state once path has been moved, eating eats fruit at its end."""
+        positions, pending, _ = state
+        moved = [cell for cell, _ in reversed(path)] + positions
+        grown = min(pending, len(path))
+        moved = moved[:len(positions) + grown]
+        pending = pending - grown + eats
+        return moved, pending, path[-1][1] if len(moved) + pending > 1 else None
+
+    def _vacate_times(self, game, state):
+        """Maps each body cell to the first move that may enter it."""
+        positions, pending, heading = state
+        n = len(positions)
+        free_at = {}
+        for i, cell in enumerate(positions):
+            free_at[cell] = max(free_at.get(cell, 0), n - i + pending)
+        if heading is not None:
+            # The snake may not reverse, even before its body has grown into that cell
+            dx, dy = engine.DIRECTIONS[heading]
+            back = engine.DIRECTIONS.index((-dx, -dy))
+            for cell, d in self._neighbors(game, positions[0]).items():
+                if d == back:
+                    free_at[cell] = max(free_at.get(cell, 0), 2)
+        return free_at
+
+    def _safe_after(self, game, state, path, eats):
+        """Searches for a route from the head to the tail once path has been moved.
+
+        Only the tail cell is treated as passable, not the cells it will
+        vacate on the way: following such a route leaves the old body's
+        path free ahead of the head, so the tail can be chased again.
+        """
+        board = game.board
+        positions, pending, _ = self._after(state, path, 1 if eats else 0)
+        if len(positions) == 1:
+            return []
+        free_at = dict.fromkeys(positions, float('inf'))
+        free_at[positions[-1]] = max(1 + pending, 4 - len(positions))   # A neck can't be reversed into
+        avoid = {board.index(fruit.pos) for fruit in game.fruits} - {positions[0]}
+        return (yield from self._search(game, positions[0], {positions[-1]}, self._passable(board, free_at, avoid)))
+
+    def _cycle(self, board):
+        """Successor of each cell on the board's Hamiltonian cycle, built once per board size."""
+        key = (board.width, board.height)
+        if self._cycle_key != key:
+            self._cycle_key = key
+            runs = _cycle_runs(*key)
+            self._cycle_next = self._cycle_order = None
+            if runs is not None:
+                # Each run is a strided slice of the cell indices, so even big boards build quickly
+                width = board.width
+                index = array('i', range(width * board.height))
+                slices = []
+                for x, y, dx, dy, count in runs:
+                    start, step = y * width + x, dy * width + dx
+                    stop = start + step * count
+                    slices.append((slice(start, stop if stop >= 0 else None, step), count))
+                cycle = array('i')
+                for cells, _ in slices:
+                    cycle.extend(index[cells])
+                cycle.append(cycle[0])
+                self._cycle_next = array('i', index)
+                self._cycle_order = array('i', index)
+                n = 0
+                for cells, count in slices:
+                    self._cycle_order[cells] = index[n:n + count]
+                    self._cycle_next[cells] = cycle[n + 1:n + count + 1]
+                    n += count
+        return self._cycle_next
+
+
+def run(game, max_ticks=None, autopilot=None):
+    """Plays game headlessly under an autopilot until it ends or max_ticks pass."""
+    autopilot = (autopilot or Autopilot()).attach(game)
+    while not game.game_over_flag and (max_ticks is None or game.ticks < max_ticks):
+        game.step()
+    autopilot.detach(game)
+    return game
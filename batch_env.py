@@ -0,0 +1,213 @@
+# Vectorized Snake Environments
+# Steps many independent games in lockstep with NumPy, following the rules
+# in engine.SnakeEngine. Requires numpy (pip install numpy).
+
+import random
+
+import numpy as np
+
+import engine
+
+# Death causes are stored as codes into this list
+CAUSES = [None, "self", "wall", "obstacle", "board_full"]
+CAUSE_SELF, CAUSE_WALL, CAUSE_OBSTACLE, CAUSE_BOARD_FULL = 1, 2, 3, 4
+
+# Fruits are stored in the fruit grid as index + 1 into FRUIT_NAMES
+FRUIT_NAMES = list(engine.FRUIT_TYPES)
+FRUIT_SCORES = np.array([engine.FRUIT_TYPES[f]['score'] for f in FRUIT_NAMES], dtype=np.int64)
+FRUIT_PROBS = np.array([engine.FRUIT_WEIGHTS[f] for f in FRUIT_NAMES], dtype=np.float64)
+FRUIT_PROBS /= FRUIT_PROBS.sum()
+SPEED_BOOST = np.array([engine.FRUIT_TYPES[f]['effect'] == 'speed_boost' for f in FRUIT_NAMES])
+SLOW_DOWN = np.array([engine.FRUIT_TYPES[f]['effect'] == 'slow_down' for f in FRUIT_NAMES])
+
+# Actions are indices into engine.DIRECTIONS; -1 keeps the current direction
+DX = np.array([d[0] for d in engine.DIRECTIONS], dtype=np.int64)
+DY = np.array([d[1] for d in engine.DIRECTIONS], dtype=np.int64)
+OPPOSITE = np.array([engine.DIRECTIONS.index((-x, -y)) for x, y in engine.DIRECTIONS], dtype=np.int64)
+
+
+class BatchSnakeEnv:
+    """N independent games of one mode and difficulty stepped together.
+
+    Each board is a row of flat (height * width) arrays: body_grid counts
+    snake segments, obstacle_grid marks obstacles and fruit_grid holds
+    fruit codes. Bodies are ring buffers of cell indices; the head is at
+    body[env, head_ptr[env]] and the tail body_count[env] - 1 slots behind.
+    Finished games stay frozen until reset() is called for them.
+    """
+    def __init__(self, num_envs, game_mode="Classic", difficulty="Medium",
+                 width=engine.GRID_WIDTH, height=engine.GRID_HEIGHT, seed=None):
+        self.num_envs = num_envs
+        self.game_mode = game_mode
+        self.difficulty = difficulty
+        self.width = width
+        self.height = height
+        self.cells = width * height
+        self.rng = np.random.default_rng(seed)
+        self.base_speed = engine.BASE_SPEEDS[difficulty]
+
+        n, cells = num_envs, self.cells
+        self.body_grid = np.zeros((n, cells), dtype=np.uint8)
+        self.obstacle_grid = np.zeros((n, cells), dtype=bool)
+        self.fruit_grid = np.zeros((n, cells), dtype=np.int8)
+        self.body = np.zeros((n, cells), dtype=np.int32)
+        self.head_ptr = np.zeros(n, dtype=np.int64)
+        self.body_count = np.zeros(n, dtype=np.int64)
+        self.length = np.zeros(n, dtype=np.int64)
+        self.head_x = np.zeros(n, dtype=np.int64)
+        self.head_y = np.zeros(n, dtype=np.int64)
+        self.direction = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.speed = np.zeros(n, dtype=np.float64)
+        self.ticks = np.zeros(n, dtype=np.int64)
+        self.fruit_count = np.zeros(n, dtype=np.int64)
+        self.done = np.zeros(n, dtype=bool)
+        self.death_cause = np.zeros(n, dtype=np.int8)
+        self._layout_board = engine.Board(width, height)   # Scratch board for generating obstacle layouts
+        self.reset()
+
+    def reset(self, mask=None):
+        """Starts new games for every env, or only where mask is True."""
+        idx = np.arange(self.num_envs) if mask is None else np.nonzero(mask)[0]
+        if not len(idx):
+            return
+        self.body_grid[idx] = 0
+        self.obstacle_grid[idx] = 0
+        self.fruit_grid[idx] = 0
+
+        start_x, start_y = self.width // 2, self.height // 2
+        start = start_y * self.width + start_x
+        self.head_ptr[idx] = 0
+        self.body[idx, 0] = start
+        self.body_grid[idx, start] = 1
+        self.body_count[idx] = 1
+        self.length[idx] = 1
+        self.head_x[idx] = start_x
+        self.head_y[idx] = start_y
+        self.direction[idx] = self.rng.integers(0, len(engine.DIRECTIONS), size=len(idx))
+        self.score[idx] = 0
+        self.speed[idx] = self.base_speed
+        self.ticks[idx] = 0
+        self.fruit_count[idx] = 0
+        self.done[idx] = False
+        self.death_cause[idx] = 0
+
+        # Obstacle layouts come from the engine's generator, so every open cell
+        # is reachable and the first move is clear, as in SnakeEngine
+        if self.game_mode == "Obstacle":
+            count = engine.obstacle_count(self.difficulty, self.width, self.height)
+            board = self._layout_board
+            for env, seed in zip(idx, self.rng.integers(0, 2 ** 63, size=len(idx))):
+                board.clear()
+                board.add_body((start_x, start_y))
+                engine.generate_layout(board, random.Random(int(seed)), count, (start_x, start_y),
+                                       engine.DIRECTIONS[self.direction[env]])
+                self.obstacle_grid[env] = np.frombuffer(board.blocked, dtype=np.uint8)
+
+        self._spawn_fruit(idx)
+
+    def _spawn_fruit(self, idx):
+        """Places fruit(s) on random free cells; returns which envs got any."""
+        num_fruits = 3 if self.game_mode == 'Multi-fruit' else 1
+        for _ in range(num_fruits):
+            free = (self.body_grid[idx] == 0) & ~self.obstacle_grid[idx] & (self.fruit_grid[idx] == 0)
+            keys = self.rng.random(free.shape)
+            keys[~free] = -1.0
+            cell = keys.argmax(axis=1)
+            ok = free.any(axis=1)
+            if self.game_mode == 'Multi-fruit':
+                kind = self.rng.choice(len(FRUIT_NAMES), size=len(idx), p=FRUIT_PROBS)
+            else:
+                kind = np.zeros(len(idx), dtype=np.int64)
+            self.fruit_grid[idx[ok], cell[ok]] = kind[ok] + 1
+            self.fruit_count[idx[ok]] += 1
+        return self.fruit_count[idx] > 0
+
+    def step(self, actions):
+        """Applies one action per env and moves every live snake one cell.
+
+        Returns (score_gained, done) arrays; death causes are kept in
+        death_cause as codes into CAUSES.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        gained = np.zeros(self.num_envs, dtype=np.int64)
+        idx = np.nonzero(~self.done)[0]
+        if not len(idx):
+            return gained, self.done.copy()
+
+        # Turn, ignoring reversals once the snake is longer than one cell
+        act = actions[idx]
+        cur = self.direction[idx]
+        turn = (act >= 0) & ~((self.length[idx] > 1) & (OPPOSITE[np.maximum(act, 0)] == cur))
+        cur = np.where(turn, act, cur)
+        self.direction[idx] = cur
+
+        nx = self.head_x[idx] + DX[cur]
+        ny = self.head_y[idx] + DY[cur]
+        if self.game_mode == "Wall-less":
+            nx %= self.width
+            ny %= self.height
+        inside = (nx >= 0) & (nx < self.width) & (ny >= 0) & (ny < self.height)
+        cell = np.where(inside, ny * self.width + nx, 0)
+
+        # Retract the tail first so moving into the cell it just left is safe
+        retract = idx[self.body_count[idx] >= self.length[idx]]
+        tail = self.body[retract, (self.head_ptr[retract] - self.body_count[retract] + 1) % self.cells]
+        self.body_grid[retract, tail] -= 1
+        self.body_count[retract] -= 1
+
+        hit_self = inside & (self.body_grid[idx, cell] > 0)
+
+        # Advance the head
+        self.head_ptr[idx] = (self.head_ptr[idx] + 1) % self.cells
+        self.body[idx, self.head_ptr[idx]] = cell
+        self.body_count[idx] += 1
+        self.body_grid[idx[inside], cell[inside]] += 1
+        self.head_x[idx] = nx
+        self.head_y[idx] = ny
+        self.ticks[idx] += 1
+
+        # Collision with fruit
+        fruit = np.where(inside, self.fruit_grid[idx, cell], 0)
+        eat = fruit > 0
+        eaten = idx[eat]
+        kind = fruit[eat].astype(np.int64) - 1
+        gained[eaten] = FRUIT_SCORES[kind]
+        self.score[eaten] += gained[eaten]
+        self.length[eaten] += 1
+        boost = eaten[SPEED_BOOST[kind]]
+        self.speed[boost] *= 1.5
+        slow = eaten[SLOW_DOWN[kind]]
+        self.speed[slow] = np.maximum(self.base_speed, self.speed[slow] * 0.75)
+        self.fruit_grid[eaten, cell[eat]] = 0
+        self.fruit_count[eaten] -= 1
+
+        board_full = np.zeros(len(idx), dtype=bool)
+        empty = eaten[self.fruit_count[eaten] == 0]
+        if len(empty):
+            full = empty[~self._spawn_fruit(empty)]
+            board_full = np.isin(idx, full)
+
+        # Collision with self, wall and obstacles
+        wall = ~inside if self.game_mode != "Wall-less" else np.zeros(len(idx), dtype=bool)
+        if self.game_mode == "Obstacle":
+            obstacle = inside & self.obstacle_grid[idx, cell]
+        else:
+            obstacle = np.zeros(len(idx), dtype=bool)
+        cause = np.select([board_full, hit_self, wall, obstacle],
+                          [CAUSE_BOARD_FULL, CAUSE_SELF, CAUSE_WALL, CAUSE_OBSTACLE], 0)
+        dead = cause > 0
+        self.done[idx[dead]] = True
+        self.death_cause[idx[dead]] = cause[dead]
+
+        # Speed-up mode logic
+        if self.game_mode == "Speed-up":
+            self.speed[idx] += 0.05
+
+        return gained, self.done.copy()
+
+    def snake_cells(self, env):
+        """Returns one env's body as (x, y) positions, head first."""
+        ptrs = (self.head_ptr[env] - np.arange(self.body_count[env])) % self.cells
+        cells = self.body[env, ptrs]
+        return [(int(c % self.width), int(c // self.width)) for c in cells]
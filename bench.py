@@ -0,0 +1,349 @@
+# Benchmark Suite
+# Measures the simulation and rendering hot paths and compares the results
+# against a stored baseline so performance changes come with numbers.
+#
+#   python bench.py                              # run and print results
+#   python bench.py --output results.json        # also save machine-readable results
+#   python bench.py --save-baseline              # store results as bench_baseline.json
+#   python bench.py --baseline bench_baseline.json --threshold 0.15
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import deque
+
+import engine
+from autopilot import Autopilot, hamiltonian_cycle
+
+DEFAULT_BASELINE = 'bench_baseline.json'
+
+
+# --- Measurement ---
+def measure(op, number, repeat=7, setup=None):
+    """Times op() number times per repeat and returns per-op statistics in microseconds."""
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            op()
+        samples.append((time.perf_counter() - start) / number * 1e6)
+    return summarize(samples)
+
+def measure_each(op, count, setup=None):
+    """Times count separate calls of op(), for ops slow enough to time one at a time."""
+    samples = []
+    for _ in range(count):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        op()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return summarize(samples)
+
+def summarize(samples):
+    ordered = sorted(samples)
+    median = statistics.median(ordered)
+    return {
+        "median_us": median,
+        "min_us": ordered[0],
+        "p99_us": ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))],
+        "ops_per_sec": 1e6 / median if median else 0.0,
+    }
+
+
+# --- Board Helpers ---
+def lay_snake(snake, cycle, length):
+    """Places a snake of the given length along the cycle, head last."""
+    board = snake.board
+    for pos in snake.positions:
+        board.remove_body(pos)
+    snake.positions = deque(reversed(cycle[:length]))
+    for pos in snake.positions:
+        board.add_body(pos)
+    snake.length = length
+    snake.turn_queue.clear()
+
+
+# --- Simulation Benchmarks ---
+def bench_snake_move(results, quick):
+    width, height = engine.GRID_WIDTH, engine.GRID_HEIGHT
+    cycle = hamiltonian_cycle(width, height)
+    cells = width * height
+    for length in (1, 10, 100, cells // 2, cells - 1):
+        board = engine.Board(width, height)
+        snake = engine.Snake(board, random.Random(0))
+        lay_snake(snake, cycle, length)
+        state = {"i": length - 1}
+
+        def op():
+            i = state["i"]
+            a, b = cycle[i % cells], cycle[(i + 1) % cells]
+            snake.direction = (b[0] - a[0], b[1] - a[1])
+            snake.move(False)
+            snake.collides_with_self()
+            snake.collides_with_wall()
+            snake.collides_with_obstacles()
+            state["i"] = i + 1
+
+        results[f"snake_move_collide/len={length}"] = measure(op, 2000 if quick else 20000)
+
+def bench_randomize_position(results, quick):
+    width, height = engine.GRID_WIDTH, engine.GRID_HEIGHT
+    rng = random.Random(0)
+    for occupancy in (0.0, 0.5, 0.9, 0.99):
+        board = engine.Board(width, height)
+        cells = [(x, y) for x in range(width) for y in range(height)]
+        rng.shuffle(cells)
+        for pos in cells[:int(occupancy * len(cells))]:
+            board.add_body(pos)
+        fruit = engine.Fruit()
+        results[f"randomize_position/occupancy={occupancy:.2f}"] = measure(
+            lambda: fruit.randomize_position(board, rng), 2000 if quick else 20000)
+
+def bench_spawn_fruit(results, quick):
+    game = engine.SnakeEngine("Multi-fruit", "Medium", seed=0)
+    results["spawn_fruit/Multi-fruit"] = measure(game.spawn_fruit, 1000 if quick else 10000)
+
+def bench_autopilot(results, quick):
+    for mode in ("Classic", "Wall-less", "Obstacle", "Multi-fruit"):
+        game = engine.SnakeEngine(mode, "Hard", seed=0)
+        Autopilot().attach(game)
+
+        def op():
+            if game.game_over_flag:
+                game.reset(seed=0)
+            game.step()
+
+        results[f"autopilot_step/{mode}"] = measure(op, 500 if quick else 5000)
+
+def bench_snapshot(results, quick):
+    for board in ("default", "250x250"):
+        width, height = (engine.GRID_WIDTH, engine.GRID_HEIGHT) if board == "default" else (250, 250)
+        game = engine.SnakeEngine("Obstacle", "Hard", seed=0, width=width, height=height)
+        Autopilot().attach(game)
+        for _ in range(200):
+            game.step()
+        snapshot = game.snapshot()
+        number = 500 if quick else 5000
+        results[f"snapshot/board={board}"] = measure(game.snapshot, number)
+        results[f"snapshot_restore/board={board}"] = measure(lambda: game.restore(snapshot), number)
+        results[f"snapshot_clone/board={board}"] = measure(lambda: game.clone(snapshot), number)
+
+
+def bench_layouts(results, quick):
+    from layouts import LayoutCache
+
+    sizes = {"default": (engine.GRID_WIDTH, engine.GRID_HEIGHT), "250x250": (250, 250), "1000x1000": (1000, 1000)}
+    for board, (width, height) in list(sizes.items())[:2 if quick else 3]:
+        game = engine.SnakeEngine("Classic", "Hard", width=width, height=height)
+        count = 3 if width >= 1000 else 20
+        results[f"obstacle_layout_generate/board={board}"] = measure_each(
+            lambda: game.reset("Obstacle", "Hard", 0), count)
+        with tempfile.TemporaryDirectory() as tmp:
+            game.layout_cache = LayoutCache(tmp)
+            game.reset("Obstacle", "Hard", 0)
+            results[f"obstacle_layout_cached/board={board}"] = measure_each(
+                lambda: game.reset("Obstacle", "Hard", 0), count)
+
+
+def bench_observation(results, quick):
+    from observation import ObservationEncoder
+
+    for mode in ("Classic", "Wall-less"):
+        game = engine.SnakeEngine(mode, "Hard", seed=0)
+        Autopilot().attach(game)
+        encoder = ObservationEncoder(game)
+
+        def step():
+            if game.game_over_flag:
+                game.reset(seed=0)
+            game.step()
+
+        def step_and_update():
+            step()
+            encoder.update()
+
+        number = 500 if quick else 5000
+        results[f"observation_step/{mode}"] = measure(step, number)
+        results[f"observation_step_update/{mode}"] = measure(step_and_update, number)
+        results[f"observation_rebuild/{mode}"] = measure(lambda: (encoder.rebuild(), encoder._encode_crop(),
+                                                                  encoder._encode_features()), number)
+
+
+# --- Rendering Benchmarks ---
+def bench_rendering(results, quick):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    import snake as game_module
+    from scores import ScoreStore
+
+    pygame.display.init()
+    pygame.font.init()
+    game_module.load_assets(audio=False)
+    # Scores (and the replays saved beside them) go to a scratch directory, never the player's
+    scratch = tempfile.TemporaryDirectory()
+    store = ScoreStore(os.path.join(scratch.name, 'high_scores.jsonl'), legacy_path=None)
+    game = game_module.SnakeGame(score_store=store)
+    frames = 60 if quick else 600
+
+    def frame(screen):
+        def run():
+            dirty_rects = screen()
+            if dirty_rects is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(dirty_rects)
+        return run
+
+    game.game_state = "MAIN_MENU"
+    results["render/MAIN_MENU"] = measure_each(frame(game.main_menu_screen), frames)
+    game.high_scores = [{"name": f"Player {i}", "score": 1000 - i, "date": "2025-01-01",
+                         "mode": "Classic", "difficulty": "Medium"} for i in range(10)]
+    results["render/LEADERBOARD"] = measure_each(frame(game.leaderboard_screen), frames)
+
+    # The snake follows a cycle through every cell and moves once per frame;
+    # on the large board the camera scrolls with it
+    for board, lengths in ((game_module.BOARD_SIZES[0], (1, 500)), ("1000x1000", (1, 100000))):
+        width, height = (int(n) for n in board.split('x'))
+        cycle = hamiltonian_cycle(width, height)
+        for dirty in (False, True):
+            for length in lengths:
+                game.game_mode = "Classic"
+                game.board_size = board
+                game.reset_game_state()
+                lay_snake(game.snake, cycle, length)
+                game.game_state = "PLAYING"
+                game.dirty_rendering = dirty
+                game.world = None
+                state = {"i": length - 1}
+
+                def play():
+                    i = state["i"]
+                    a, b = cycle[i % len(cycle)], cycle[(i + 1) % len(cycle)]
+                    game.snake.direction = (b[0] - a[0], b[1] - a[1])
+                    game.snake.move(False)
+                    state["i"] = i + 1
+                    return game.game_play_screen()
+
+                name = "dirty" if dirty else "full"
+                if board != game_module.BOARD_SIZES[0]:
+                    name += f"/board={board}"
+                results[f"render/PLAYING/{name}/len={length}"] = measure_each(frame(play), frames)
+
+    game.game_state = "GAME_OVER"
+    results["render/GAME_OVER"] = measure_each(frame(game.game_over_screen), frames)
+    store.close()
+    scratch.cleanup()
+    pygame.quit()
+
+
+# --- Leaderboard Benchmarks ---
+def bench_leaderboard(results, quick):
+    from scores import ScoreStore
+
+    rng = random.Random(0)
+    for count in ((10, 1000) if quick else (10, 1000, 100000)):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'high_scores.jsonl')
+            with open(path, 'w') as f:
+                for i in range(count):
+                    f.write(json.dumps({
+                        "name": f"Player {i}", "score": rng.randint(0, 5000), "date": "2025-01-01",
+                        "mode": rng.choice(engine.GAME_MODES), "difficulty": rng.choice(engine.DIFFICULTIES),
+                    }) + '\n')
+
+            def load():
+                store = ScoreStore(path, compact_every=10 ** 9, legacy_path=None)
+                store.top(10)
+                store.close()
+            results[f"leaderboard_load/entries={count}"] = measure_each(load, 3 if count > 1000 else 20)
+
+            store = ScoreStore(path, compact_every=10 ** 9, legacy_path=None)
+            entry = {"name": "Bench", "score": 100, "date": "2025-01-01", "mode": "Classic", "difficulty": "Easy"}
+            results[f"leaderboard_save/entries={count}"] = measure_each(lambda: store.add(dict(entry)), 200)
+            results[f"leaderboard_save_flush/entries={count}"] = measure_each(
+                lambda: (store.add(dict(entry)), store.flush()), 20)
+            store.close()
+
+
+BENCHMARKS = {
+    "snake_move": bench_snake_move,
+    "randomize_position": bench_randomize_position,
+    "spawn_fruit": bench_spawn_fruit,
+    "autopilot": bench_autopilot,
+    "snapshot": bench_snapshot,
+    "layouts": bench_layouts,
+    "observation": bench_observation,
+    "render": bench_rendering,
+    "leaderboard": bench_leaderboard,
+}
+
+
+# --- Baseline Comparison ---
+def compare(results, baseline, threshold):
+    """Returns (name, baseline_us, current_us, ratio) for every benchmark slower than allowed."""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base or not base["median_us"]:
+            continue
+        ratio = current["median_us"] / base["median_us"]
+        if ratio > 1 + threshold:
+            regressions.append((name, base["median_us"], current["median_us"], ratio))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Snake game's hot paths")
+    parser.add_argument("--only", nargs="*", choices=sorted(BENCHMARKS), help="run only these groups")
+    parser.add_argument("--quick", action="store_true", help="fewer iterations and smaller sizes")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.20,
+                        help="allowed slowdown of the median before failing (default 0.20)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for group in args.only or BENCHMARKS:
+        BENCHMARKS[group](results, args.quick)
+
+    report = {
+        "meta": {"python": sys.version.split()[0], "platform": platform.platform(),
+                 "machine": platform.machine(), "quick": args.quick, "time": time.time()},
+        "results": results,
+    }
+    for name, stats in results.items():
+        print(f"{name:<45}{stats['median_us']:12.2f} us  p99 {stats['p99_us']:12.2f} us"
+              f"  {stats['ops_per_sec']:14.1f} ops/s")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for name, base, current, ratio in regressions:
+            print(f"REGRESSION {name}: {base:.2f} us -> {current:.2f} us ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
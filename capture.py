@@ -0,0 +1,339 @@
+# Frame Capture
+# Records gameplay, or re-renders a replay headlessly, as a PNG sequence,
+# GIF or video. Frames are copied into a ring of shared-memory slots and
+# encoded by a worker process, so recording never holds up the game loop.
+#
+#   python capture.py game.snkr clip.gif --fps 30 --scale 0.5   # render a replay
+#   python capture.py --top 3 --out-dir highlights             # top leaderboard runs
+#
+# The output format follows the path: .gif (needs Pillow), .raw/.rgb (raw
+# RGB24 frames), .mp4/.webm/.mkv/.avi (needs ffmpeg on PATH), otherwise a
+# directory of numbered PNGs.
+
+import argparse
+import multiprocessing as mp
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import tempfile
+from multiprocessing import shared_memory
+
+CAPTURE_CAPACITY = 16   # Frames buffered for the encoder before new ones are dropped
+VIDEO_EXTENSIONS = ('.mp4', '.webm', '.mkv', '.avi')
+RAW_EXTENSIONS = ('.raw', '.rgb')
+
+
+# --- Encoders ---
+# Run in the worker process; each takes frames as pygame surfaces.
+class PngSequenceWriter:
+    def __init__(self, path, size, fps):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.count = 0
+
+    def write(self, frame):
+        import pygame
+        pygame.image.save(frame, os.path.join(self.path, f"frame_{self.count:06d}.png"))
+        self.count += 1
+
+    def close(self):
+        pass
+
+
+class RawVideoWriter:
+    """Headerless RGB24 frames, one after another; size and rate are the caller's to remember."""
+    def __init__(self, path, size, fps):
+        self.file = open(path, 'wb')
+
+    def write(self, frame):
+        import pygame
+        self.file.write(pygame.image.tobytes(frame, "RGB"))
+
+    def close(self):
+        self.file.close()
+
+
+class FfmpegWriter:
+    """Pipes raw frames into an ffmpeg process that encodes the video."""
+    def __init__(self, path, size, fps):
+        ffmpeg = shutil.which('ffmpeg')
+        if ffmpeg is None:
+            raise RuntimeError("Video export needs ffmpeg on PATH; use .raw or .gif instead")
+        self.process = subprocess.Popen(
+            [ffmpeg, '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+             '-s', f'{size[0]}x{size[1]}', '-r', str(fps), '-i', '-',
+             '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p', path],
+            stdin=subprocess.PIPE)
+
+    def write(self, frame):
+        import pygame
+        self.process.stdin.write(pygame.image.tobytes(frame, "RGB"))
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait()
+
+
+class GifWriter:
+    """Collects palette frames and writes the GIF on close, so keep clips short or scaled down."""
+    def __init__(self, path, size, fps):
+        try:
+            from PIL import Image
+        except ImportError:
+            raise RuntimeError("GIF export requires Pillow (pip install pillow)")
+        self.Image = Image
+        self.path = path
+        self.duration = round(1000 / fps)
+        self.frames = []
+
+    def write(self, frame):
+        import pygame
+        image = self.Image.frombytes("RGB", frame.get_size(), pygame.image.tobytes(frame, "RGB"))
+        self.frames.append(image.quantize(colors=256))
+
+    def close(self):
+        if self.frames:
+            self.frames[0].save(self.path, save_all=True, append_images=self.frames[1:],
+                                duration=self.duration, loop=0)
+
+
+def writer_class(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.gif':
+        return GifWriter
+    if extension in RAW_EXTENSIONS:
+        return RawVideoWriter
+    if extension in VIDEO_EXTENSIONS:
+        return FfmpegWriter
+    return PngSequenceWriter
+
+
+def _worker(shm, size, capacity, path, fps, scale, ready, free, results):
+    """Encodes slots in the order they are handed over until told to stop."""
+    import pygame
+    width, height = size
+    frame_bytes = width * height * 4
+    out_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    count = 0
+    try:
+        cls = writer_class(path)
+        if cls is not PngSequenceWriter and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        writer = cls(path, out_size, fps)
+        try:
+            while True:
+                slot = ready.get()
+                if slot is None:
+                    break
+                view = shm.buf[slot * frame_bytes:(slot + 1) * frame_bytes]
+                frame = pygame.image.frombuffer(view, size, "BGRA")
+                if out_size != size:
+                    frame = pygame.transform.smoothscale(frame, out_size)
+                else:
+                    frame = frame.copy()   # Let the slot go before encoding
+                del view
+                free.release()
+                writer.write(frame)
+                count += 1
+        finally:
+            writer.close()
+        results.put(("done", count))
+    except Exception as e:
+        results.put(("error", f"{type(e).__name__}: {e}"))
+        # Keep releasing slots so the game never waits on a dead encoder
+        while ready.get() is not None:
+            free.release()
+
+
+# --- Capture ---
+class FrameCapture:
+    """Copies frames into a ring of shared-memory slots for a worker process to encode.
+
+    grab() is a single blit into the next free slot; the worker turns slots
+    back into surfaces, scales them and writes them out. When every slot
+    is still waiting for the encoder a frame is dropped and counted rather
+    than stall the game, unless grab() is told to block, as headless
+    rendering does. every keeps one frame in that many, so a 60 FPS game
+    can record at 30.
+    """
+    def __init__(self, path, size, fps=30, every=1, scale=1.0, capacity=CAPTURE_CAPACITY):
+        import pygame
+        self.path = path
+        self.size = size
+        self.every = every
+        self.frames = 0     # Frames offered to grab()
+        self.captured = 0
+        self.dropped = 0
+        self.error = None
+        frame_bytes = size[0] * size[1] * 4
+        ctx = mp.get_context()
+        self._shm = shared_memory.SharedMemory(create=True, size=frame_bytes * capacity)
+        self._slots = [pygame.image.frombuffer(self._shm.buf[i * frame_bytes:(i + 1) * frame_bytes], size, "BGRA")
+                       for i in range(capacity)]
+        self._ready = ctx.Queue()
+        self._free = ctx.Semaphore(capacity)
+        self._results = ctx.Queue()
+        self._process = ctx.Process(target=_worker, daemon=True, args=(
+            self._shm, size, capacity, path, fps, scale, self._ready, self._free, self._results))
+        self._process.start()
+        self.closed = False
+
+    def grab(self, surface, block=False):
+        """Queues surface for encoding; returns False if it was skipped or dropped."""
+        self.frames += 1
+        if self.closed or (self.frames - 1) % self.every:
+            return False
+        if not self._free.acquire(block):
+            self.dropped += 1
+            return False
+        slot = self.captured % len(self._slots)
+        self._slots[slot].blit(surface, (0, 0))
+        self._ready.put(slot)
+        self.captured += 1
+        return True
+
+    def close(self):
+        """Waits for every queued frame to be encoded and returns the number written."""
+        if self.closed:
+            return 0
+        self.closed = True
+        self._ready.put(None)
+        written = 0
+        try:
+            status, value = self._results.get(timeout=max(30.0, self.captured))
+        except queue.Empty:
+            status, value = "error", "encoder did not finish"
+        if status == "done":
+            written = value
+        else:
+            self.error = value
+        self._process.join(timeout=5)
+        self._slots.clear()
+        self._shm.close()
+        self._shm.unlink()
+        return written
+
+
+# --- Headless Rendering ---
+class ReplayRenderer:
+    """Plays replays through the game's own screens on the SDL dummy driver.
+
+    Frames are drawn as fast as the CPU and encoder allow; game time still
+    advances 1000 / fps ms per frame, so clips play back at the speed the
+    game was played.
+    """
+    def __init__(self):
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        import pygame
+        import snake
+
+        from scores import ScoreStore
+
+        pygame.display.init()
+        pygame.font.init()
+        snake.load_assets(audio=False)
+        # A replay that ends on the game over screen reads the leaderboard; give
+        # it a scratch one so rendering never opens or rewrites the player's scores
+        self._scratch = tempfile.TemporaryDirectory()
+        store = ScoreStore(os.path.join(self._scratch.name, 'high_scores.jsonl'), legacy_path=None)
+        self.game = snake.SnakeGame(score_store=store)
+
+    def render(self, replay, path, fps=30, scale=1.0, hold=2.0):
+        """Renders replay into path and returns the FrameCapture, closed."""
+        from replay import ReplayPilot
+
+        game = self.game
+        game.game_mode = replay.game_mode
+        game.difficulty = replay.difficulty
+        game.board_size = f"{replay.width}x{replay.height}"
+        game.player = "Human"
+        game.reset_game_state(seed=replay.seed)
+        pilot = ReplayPilot(replay).attach(game.engine)
+        game.fixed_frame_ms = 1000 / fps
+        game.game_state = "PLAYING"
+        capture = FrameCapture(path, game.screen.get_size(), fps, scale=scale)
+        try:
+            hold_frames = round(hold * fps)
+            while hold_frames > 0:
+                if game.game_state != "PLAYING" or game.engine.ticks >= replay.ticks:
+                    hold_frames -= 1   # Keep the last moments, or the game over screen, on screen
+                    if game.game_state == "PLAYING":
+                        game.engine.autopilot = None
+                        game.fixed_frame_ms = 0
+                game.render_frame()
+                capture.grab(game.screen, block=True)
+        finally:
+            pilot.detach(game.engine)
+            game.fixed_frame_ms = None
+            capture.close()
+        return capture
+
+    def close(self):
+        import pygame
+        self.game.score_store.close()
+        self._scratch.cleanup()
+        pygame.quit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render Snake replays to PNG, GIF or video")
+    parser.add_argument("replay", nargs="?", help="replay file (.snkr)")
+    parser.add_argument("output", nargs="?", help="output path; the extension picks the format")
+    parser.add_argument("--top", type=int, help="render the best N leaderboard runs that have replays")
+    parser.add_argument("--out-dir", default="highlights", help="where --top clips go")
+    parser.add_argument("--format", default="gif", help="extension for --top clips (gif, mp4, raw or png)")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--scale", type=float, default=1.0, help="output size relative to the window")
+    parser.add_argument("--hold", type=float, default=2.0, help="seconds to keep rendering after the run ends")
+    args = parser.parse_args(argv)
+    if args.top is None and not (args.replay and args.output):
+        parser.error("give a replay and an output path, or --top N")
+
+    from replay import Replay
+
+    jobs = []
+    if args.top is not None:
+        from scores import ScoreStore
+        store = ScoreStore()
+        entries = [e for e in store.top(store.max_per_board) if e.get('replay') and os.path.exists(e['replay'])]
+        store.close()
+        os.makedirs(args.out_dir, exist_ok=True)
+        for rank, entry in enumerate(entries[:args.top], 1):
+            extension = '' if args.format == 'png' else '.' + args.format
+            name = f"{rank:02d}-{entry['name']}-{entry['score']}{extension}".replace(os.sep, '_')
+            jobs.append((entry['replay'], os.path.join(args.out_dir, name)))
+        if not jobs:
+            print("No leaderboard entries with saved replays")
+    else:
+        jobs.append((args.replay, args.output))
+
+    renderer = ReplayRenderer()
+    failed = False
+    try:
+        for source, output in jobs:
+            try:
+                replay = Replay.load(source)
+            except (OSError, ValueError) as e:
+                failed = True
+                print(f"{source}: {e}")
+                continue
+            capture = renderer.render(replay, output, args.fps, args.scale, args.hold)
+            if capture.error:
+                failed = True
+                print(f"{output}: {capture.error}")
+            else:
+                size = capture.size
+                print(f"{output}: {capture.captured} frames, score {renderer.game.score} of {replay.score}")
+                if writer_class(output) is RawVideoWriter:
+                    w, h = round(size[0] * args.scale), round(size[1] * args.scale)
+                    print(f"  ffmpeg -f rawvideo -pix_fmt rgb24 -s {w}x{h} -r {args.fps} -i {output} clip.mp4")
+    finally:
+        renderer.close()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
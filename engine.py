@@ -0,0 +1,888 @@
+# Headless Snake Engine
+# Game rules for the Snake game with no pygame, display, audio or clock,
+# so bots and regression replays can advance games as fast as Python allows.
+
+import random
+from array import array
+from collections import deque
+
+# --- Engine Constants ---
+GRID_WIDTH = 1280 // 30   # Default board, matching the 1280x720 window at 30px cells
+GRID_HEIGHT = 720 // 30
+
+UP, DOWN, LEFT, RIGHT = (0, -1), (0, 1), (-1, 0), (1, 0)
+DIRECTIONS = [UP, DOWN, LEFT, RIGHT]
+
+GAME_MODES = ["Classic", "Wall-less", "Speed-up", "Obstacle", "Multi-fruit"]
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+BASE_SPEEDS = {'Easy': 8, 'Medium': 12, 'Hard': 16}
+OBSTACLE_COUNTS = {'Easy': 10, 'Medium': 20, 'Hard': 30}   # Per default-board area
+TURN_QUEUE_SIZE = 3          # Turns buffered ahead of the next moves
+MAX_STEPS_PER_UPDATE = 5     # Catch-up cap so a long stall cannot snowball
+LAYOUT_VERSION = 1           # Bump when generate_layout() would place obstacles differently
+
+FRUIT_TYPES = {
+    'apple': {'color': (230, 100, 100), 'score': 10, 'effect': None},
+    'gold_apple': {'color': (255, 215, 0), 'score': 50, 'effect': 'speed_boost'},
+    'grape': {'color': (180, 120, 255), 'score': 20, 'effect': 'slow_down'}
+}
+FRUIT_WEIGHTS = {'apple': 70, 'gold_apple': 10, 'grape': 20}
+
+# Board history: change kinds in the log, and how many changes a history may
+# hold (at least; larger boards allow a sixteenth of their cells) before the
+# next snapshot starts over from a keyframe
+BODY, BLOCKED, FRUIT, FREE_ADD, FREE_DEL = range(5)
+HISTORY_LIMIT = 4096
+
+
+# --- Occupancy Grid ---
+class Board:
+    """Occupancy grid shared by the snake, obstacles and fruit placement.
+
+    Cells are stored row-major in bytearrays so every query is a single
+    index instead of a scan over the snake or obstacle lists. Free cells
+    (no snake, obstacle or fruit) are also kept in a list with a reverse
+    index, so a uniformly random free cell can be drawn in O(1) and a full
+    board is reported instead of retried forever.
+
+    Once snapshot() has been called, every change is also logged, so
+    snapshots are marks in a history rather than copies of the grids.
+    """
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT):
+        self.resize(width, height)
+
+    def resize(self, width, height):
+        """Reallocates the grid for a new size and clears it."""
+        self.width = width
+        self.height = height
+        self.body = bytearray(width * height)      # Snake segments per cell
+        self.blocked = bytearray(width * height)   # Obstacles
+        self.fruit = bytearray(width * height)     # Fruits
+        self._grids = (self.body, self.blocked, self.fruit)
+        self._limit = max(HISTORY_LIMIT, width * height // 16)
+        self.clear()
+
+    def clear(self):
+        size = self.width * self.height
+        self.body[:] = bytes(size)
+        self.blocked[:] = bytes(size)
+        self.fruit[:] = bytes(size)
+        self.free_cells = list(range(size))
+        self.free_slot = list(range(size))   # Position of each cell in free_cells, or -1
+        self._mark = None   # Last snapshot() the log continues from
+        self._log = None    # Changes since then, or None when no history is kept
+
+    def index(self, pos):
+        return pos[1] * self.width + pos[0]
+
+    def position(self, i):
+        return (i % self.width, i // self.width)
+
+    def in_bounds(self, pos):
+        return 0 <= pos[0] < self.width and 0 <= pos[1] < self.height
+
+    def is_free(self, pos):
+        return self.free_slot[self.index(pos)] >= 0
+
+    def free_count(self):
+        return len(self.free_cells)
+
+    def sample_free(self, rng=random):
+        """Returns a uniformly random free cell, or None if the board is full."""
+        if not self.free_cells:
+            return None
+        return self.position(self.free_cells[rng.randrange(len(self.free_cells))])
+
+    def _refresh(self, i):
+        free = not self.body[i] and not self.blocked[i] and not self.fruit[i]
+        slot = self.free_slot[i]
+        if free and slot < 0:
+            self.free_slot[i] = len(self.free_cells)
+            self.free_cells.append(i)
+            if self._log is not None:
+                self._log.append((FREE_ADD, i))
+        elif not free and slot >= 0:
+            # Swap-remove: move the last free cell into the vacated slot
+            last = self.free_cells.pop()
+            if last != i:
+                self.free_cells[slot] = last
+                self.free_slot[last] = slot
+            self.free_slot[i] = -1
+            if self._log is not None:
+                self._log.append((FREE_DEL, i, slot, last))
+
+    def _set(self, kind, i, value):
+        grid = self._grids[kind]
+        log = self._log
+        if log is not None:
+            if len(log) > self._limit:
+                self._log = None   # Too long to keep; restoring falls back to a keyframe
+            else:
+                log.append((kind, i, grid[i], value))
+        grid[i] = value
+        self._refresh(i)
+
+    def add_body(self, pos):
+        if self.in_bounds(pos):
+            i = self.index(pos)
+            self._set(BODY, i, min(self.body[i] + 1, 255))
+
+    def remove_body(self, pos):
+        if self.in_bounds(pos):
+            i = self.index(pos)
+            if self.body[i]:
+                self._set(BODY, i, self.body[i] - 1)
+
+    def add_obstacle(self, pos):
+        self._set(BLOCKED, self.index(pos), 1)
+
+    def remove_obstacle(self, pos):
+        self._set(BLOCKED, self.index(pos), 0)
+
+    def add_fruit(self, pos):
+        self._set(FRUIT, self.index(pos), 1)
+
+    def remove_fruit(self, pos):
+        self._set(FRUIT, self.index(pos), 0)
+
+    # --- State ---
+    def copy_state(self):
+        """Returns the grids and free list as immutable values."""
+        return (self.width, self.height, bytes(self.body), bytes(self.blocked),
+                bytes(self.fruit), tuple(self.free_cells), tuple(self.free_slot))
+
+    def load_state(self, state):
+        """Copies a copy_state() back, reallocating only if the size differs."""
+        width, height, body, blocked, fruit, free_cells, free_slot = state
+        if (width, height) != (self.width, self.height):
+            self.width = width
+            self.height = height
+            self.body = bytearray(body)
+            self.blocked = bytearray(blocked)
+            self.fruit = bytearray(fruit)
+            self._grids = (self.body, self.blocked, self.fruit)
+            self._limit = max(HISTORY_LIMIT, width * height // 16)
+        else:
+            self.body[:] = body
+            self.blocked[:] = blocked
+            self.fruit[:] = fruit
+        # The free list's order decides which cell sample_free() draws, so it is kept exactly
+        self.free_cells = list(free_cells)
+        self.free_slot = list(free_slot)
+        self._mark = None
+        self._log = None
+
+    # --- History ---
+    def snapshot(self):
+        """Returns a BoardMark for the current state, to restore() later.
+
+        The first snapshot copies the board as a keyframe and starts
+        logging changes; later ones just close the log, so they cost
+        O(changes since the last one) only in memory that is already used.
+        Once a history holds more than a limit of changes, the next
+        snapshot is a keyframe again.
+        """
+        mark = self._mark
+        if self._log is None or mark.size + len(self._log) > self._limit:
+            mark = BoardMark(None, (), self.copy_state())
+        elif self._log:
+            mark = BoardMark(mark, self._log)
+        self._mark = mark
+        self._log = []
+        return mark
+
+    def restore(self, mark):
+        """Puts the board back into the state mark was taken in.
+
+        Within one history the changes since the common ancestor of the
+        current state and mark are undone and redone; otherwise the board
+        loads mark's keyframe and redoes the changes after it.
+        """
+        redo = []
+        target = mark
+        if self._log is not None and self._mark.root is mark.root:
+            self._undo_all(self._log)
+            node = self._mark
+            while node.depth > target.depth:
+                self._undo_all(node.changes)
+                node = node.parent
+            while target.depth > node.depth:
+                redo.append(target)
+                target = target.parent
+            while node is not target:
+                self._undo_all(node.changes)
+                node = node.parent
+                redo.append(target)
+                target = target.parent
+        else:
+            while target.parent is not None:
+                redo.append(target)
+                target = target.parent
+            self.load_state(target.keyframe)
+        for node in reversed(redo):
+            self._redo_all(node.changes)
+        self._mark = mark
+        self._log = []
+
+    def _undo_all(self, changes):
+        free_cells, free_slot, grids = self.free_cells, self.free_slot, self._grids
+        for change in reversed(changes):
+            kind = change[0]
+            if kind == FREE_ADD:
+                free_slot[free_cells.pop()] = -1
+            elif kind == FREE_DEL:
+                _, i, slot, last = change
+                if last != i:
+                    free_slot[last] = len(free_cells)
+                    free_cells.append(last)
+                    free_cells[slot] = i
+                else:
+                    free_cells.append(i)
+                free_slot[i] = slot
+            else:
+                grids[kind][change[1]] = change[2]
+
+    def _redo_all(self, changes):
+        free_cells, free_slot, grids = self.free_cells, self.free_slot, self._grids
+        for change in changes:
+            kind = change[0]
+            if kind == FREE_ADD:
+                free_slot[change[1]] = len(free_cells)
+                free_cells.append(change[1])
+            elif kind == FREE_DEL:
+                _, i, slot, last = change
+                free_cells.pop()
+                if last != i:
+                    free_cells[slot] = last
+                    free_slot[last] = slot
+                free_slot[i] = -1
+            else:
+                grids[kind][change[1]] = change[3]
+
+
+class BoardMark:
+    """A point in a board's history, returned by Board.snapshot().
+
+    A keyframe mark holds a full copy of the board; every other mark holds
+    the changes made since its parent. Marks are never modified, so a mark
+    stays valid after the board moves on, is cleared or is restored
+    elsewhere, and marks of one history share everything before them.
+    """
+    __slots__ = ('parent', 'changes', 'keyframe', 'root', 'depth', 'size')
+
+    def __init__(self, parent, changes, keyframe=None):
+        self.parent = parent
+        self.changes = changes
+        self.keyframe = keyframe
+        self.root = self if parent is None else parent.root
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.size = 0 if parent is None else parent.size + len(changes)
+
+
+# --- Obstacle Layouts ---
+ONE, ZERO = b'\x01', b'\x00'
+
+def _fill(wall, width, start):
+    """Sets every 0 cell of wall connected to start to 1 and returns how many were set.
+
+    A scanline fill: each step claims a whole horizontal run with slice
+    assignment and finds the runs next to it above and below with
+    bytearray.find, so the cost follows the number of runs, not cells.
+    """
+    filled = 0
+    stack = [start]
+    size = len(wall)
+    find, rfind = wall.find, wall.rfind
+    while stack:
+        i = stack.pop()
+        if wall[i]:
+            continue
+        row = i - i % width
+        left = rfind(ONE, row, i) + 1 or row
+        right = find(ONE, i, row + width)
+        if right < 0:
+            right = row + width
+        wall[left:right] = ONE * (right - left)
+        filled += right - left
+        for a, b in ((left - width, right - width), (left + width, right + width)):
+            if a < 0 or b > size:
+                continue
+            j = find(ZERO, a, b)
+            while j >= 0:
+                stack.append(j)
+                j = find(ONE, j, b)
+                if j < 0:
+                    break
+                j = find(ZERO, j, b)
+    return filled
+
+def _enclosing_obstacle(board, wall, cell):
+    """An obstacle on the edge of the unreachable region holding cell, found by a search of that region."""
+    width = board.width
+    seen = {cell}
+    queue = deque([cell])
+    while queue:
+        i = queue.popleft()
+        x = i % width
+        for n, ok in ((i - width, i >= width), (i + width, i + width < len(wall)),
+                      (i - 1, x > 0), (i + 1, x < width - 1)):
+            if not ok or n in seen:
+                continue
+            if board.blocked[n]:
+                return n
+            if not wall[n]:
+                seen.add(n)
+                queue.append(n)
+    return None
+
+
+class ObstacleLayout:
+    """An Obstacle-mode layout where every open cell can be reached from start.
+
+    positions are in the order they were placed. rng_state is the engine
+    rng's state once the layout was made, so a game started from a cached
+    layout draws the same fruits as one that generated it. repairs counts
+    obstacles that had to be moved to make the layout valid.
+    """
+    def __init__(self, width, height, positions, start, rng_state=None, repairs=0):
+        self.width = width
+        self.height = height
+        self.positions = positions
+        self.start = start
+        self.rng_state = rng_state
+        self.repairs = repairs
+        self._distances = None
+
+    def distances(self):
+        """Moves from start to every cell around the obstacles as a flat array, -1 where none lead.
+
+        A breadth-first search made on first use and kept, so fruit
+        placement and bots share it. It ignores the snake, so it is a lower
+        bound on the real distance between any two cells, not just from start.
+        """
+        if self._distances is None:
+            width = self.width
+            size = width * self.height
+            dist = array('i', [-1]) * size
+            unseen = bytearray(b'\x01') * size
+            for x, y in self.positions:
+                unseen[y * width + x] = 0
+            origin = self.start[1] * width + self.start[0] if self.start is not None else unseen.find(ONE)
+            frontier = [origin] if origin >= 0 else []
+            for i in frontier:
+                unseen[i] = 0
+                dist[i] = 0
+            last = width - 1
+            step = 0
+            while frontier:
+                step += 1
+                ahead = []
+                for i in frontier:
+                    x = i % width
+                    if x and unseen[i - 1]:
+                        ahead.append(i - 1)
+                        unseen[i - 1] = 0
+                    if x < last and unseen[i + 1]:
+                        ahead.append(i + 1)
+                        unseen[i + 1] = 0
+                    if i >= width and unseen[i - width]:
+                        ahead.append(i - width)
+                        unseen[i - width] = 0
+                    if i + width < size and unseen[i + width]:
+                        ahead.append(i + width)
+                        unseen[i + width] = 0
+                for i in ahead:
+                    dist[i] = step
+                frontier = ahead
+            self._distances = dist
+        return self._distances
+
+
+def obstacle_count(difficulty, width, height):
+    """Obstacles in an Obstacle-mode game, keeping the default board's density on larger boards."""
+    scale = max(1, (width * height) // (GRID_WIDTH * GRID_HEIGHT))
+    return OBSTACLE_COUNTS[difficulty] * scale
+
+
+def generate_layout(board, rng, count, start=None, heading=None):
+    """Places count obstacles on free cells of board and returns the ObstacleLayout.
+
+    Obstacles are drawn one by one from the free cells, then the layout is
+    checked: every open cell must be connected to start (or to each other
+    when start is None) and the cell ahead of start in heading must be
+    clear. Each obstacle that walls off a region or blocks the first move
+    is moved to a fresh random cell and the check repeats; after count
+    such moves, offending obstacles are dropped instead. A layout that
+    needed repairs is re-placed in its final order, so the board's free
+    list matches a fresh placement of the same positions.
+    """
+    before = board.copy_state()
+    positions = []
+    for _ in range(count):
+        pos = board.sample_free(rng)
+        if pos is None:
+            break
+        positions.append(pos)
+        board.add_obstacle(pos)
+
+    width = board.width
+    repairs = 0
+    while True:
+        culprit = None
+        if start is not None and heading is not None:
+            ahead = (start[0] + heading[0], start[1] + heading[1])
+            if board.in_bounds(ahead) and board.blocked[board.index(ahead)]:
+                culprit = board.index(ahead)
+        if culprit is None:
+            wall = bytearray(board.blocked)
+            origin = board.index(start) if start is not None else wall.find(ZERO)
+            if origin < 0:
+                break
+            _fill(wall, width, origin)
+            if ZERO not in wall:
+                break
+            culprit = _enclosing_obstacle(board, wall, wall.find(ZERO))
+            if culprit is None:
+                break
+        pos = board.position(culprit)
+        board.remove_obstacle(pos)
+        slot = positions.index(pos)
+        replacement = board.sample_free(rng) if repairs < count else None
+        if replacement is None:
+            del positions[slot]
+        else:
+            positions[slot] = replacement
+            board.add_obstacle(replacement)
+        repairs += 1
+
+    if repairs:
+        board.load_state(before)
+        for pos in positions:
+            board.add_obstacle(pos)
+    return ObstacleLayout(board.width, board.height, tuple(positions), start, rng.getstate(), repairs)
+
+
+# --- Game Object Classes ---
+class Snake:
+    """Holds the snake's body and direction.
+
+    positions is a deque with the head at index 0; the board's body grid
+    mirrors it and is updated as the head advances and the tail retracts.
+    Turns are queued, one applied per move, so quick presses within a
+    single tick are not lost.
+    """
+    def __init__(self, board=None, rng=None):
+        self.board = board if board is not None else Board()
+        self.rng = rng if rng is not None else random.Random()
+        self.positions = deque()
+        self.reset()
+
+    def reset(self):
+        for pos in self.positions:
+            self.board.remove_body(pos)
+        self.length = 1
+        start = self.start_position()
+        self.positions = deque([start])
+        self.board.add_body(start)
+        self.direction = self.rng.choice(DIRECTIONS)
+        self.next_direction = self.direction   # Direction after all queued turns
+        self.turn_queue = deque()
+        self.applied_turn_stamp = None
+        self.hit_self = False
+
+    def start_position(self):
+        return ((self.board.width // 2), (self.board.height // 2))
+
+    def snapshot(self):
+        return (tuple(self.positions), self.length, self.direction, self.next_direction,
+                tuple(self.turn_queue), self.applied_turn_stamp, self.hit_self)
+
+    def restore(self, state):
+        """Sets the body and heading from snapshot(); the board is restored separately."""
+        (positions, self.length, self.direction, self.next_direction,
+         turn_queue, self.applied_turn_stamp, self.hit_self) = state
+        self.positions = deque(positions)
+        self.turn_queue = deque(turn_queue)
+
+    def get_head_position(self):
+        return self.positions[0]
+
+    def turn(self, point, stamp=None):
+        """Queues a turn; stamp (e.g. the key press time) is handed back once it is applied."""
+        if point == self.next_direction or len(self.turn_queue) >= TURN_QUEUE_SIZE:
+            return
+        if self.length > 1 and (point[0] * -1, point[1] * -1) == self.next_direction:
+            return
+        self.turn_queue.append((point, stamp))
+        self.next_direction = point
+
+    def move(self, wall_less_mode):
+        self.applied_turn_stamp = None
+        if self.turn_queue:
+            self.direction, self.applied_turn_stamp = self.turn_queue.popleft()
+        cur = self.get_head_position()
+        x, y = self.direction
+        new = ((cur[0] + x), (cur[1] + y))
+        if wall_less_mode:
+            new = (new[0] % self.board.width, new[1] % self.board.height)
+        # Retract the tail first so moving into the cell it just left is safe
+        if len(self.positions) >= self.length:
+            self.board.remove_body(self.positions.pop())
+        self.hit_self = self.board.in_bounds(new) and self.board.body[self.board.index(new)] > 0
+        self.positions.appendleft(new)
+        self.board.add_body(new)
+
+    def grow(self):
+        self.length += 1
+
+    def collides_with_self(self):
+        return self.hit_self
+
+    def collides_with_wall(self):
+        return not self.board.in_bounds(self.get_head_position())
+
+    def collides_with_obstacles(self):
+        head = self.get_head_position()
+        return self.board.in_bounds(head) and self.board.blocked[self.board.index(head)] > 0
+
+
+class Fruit:
+    """Holds a fruit's type and position."""
+    FRUIT_TYPES = FRUIT_TYPES
+
+    def __init__(self, fruit_type='apple'):
+        self.type = fruit_type
+        self.properties = self.FRUIT_TYPES[fruit_type]
+        self.pos = (0, 0)
+
+    def randomize_position(self, board, rng=random, distances=None):
+        """Moves to a random free cell; returns False if the board is full.
+
+        distances, an ObstacleLayout's distance field, rules out cells it
+        marks unreachable. The draw is only repeated when it lands on one,
+        so layouts without such cells place the same fruits as before.
+        """
+        new_pos = board.sample_free(rng)
+        if new_pos is not None and distances is not None and distances[board.index(new_pos)] < 0:
+            cells = [i for i in board.free_cells if distances[i] >= 0]
+            new_pos = board.position(cells[rng.randrange(len(cells))]) if cells else None
+        if new_pos is None:
+            return False
+        self.pos = new_pos
+        return True
+
+
+class Obstacle:
+    """Holds an obstacle's position."""
+    def __init__(self, pos):
+        self.pos = pos
+
+
+# --- Snapshots ---
+class Snapshot:
+    """A game's full state as immutable values, taken by SnakeEngine.snapshot().
+
+    Holds a mark in the board's history, the snake, fruits, score, speed,
+    move timer and rng state, so restoring it replays the same future for
+    the same inputs. Nothing in it is ever modified, so one snapshot can be
+    restored or cloned from any number of times. Snapshots share the
+    obstacle layout, fixed for a whole game, and the board history up to
+    their mark, so taking one costs O(snake length) rather than O(board).
+    """
+    def __init__(self, game):
+        layout = game.layout()
+        self.game_mode = game.game_mode
+        self.difficulty = game.difficulty
+        self.seed = game.seed
+        self.ticks = game.ticks
+        self.score = game.score
+        self.game_over_flag = game.game_over_flag
+        self.death_cause = game.death_cause
+        self.base_speed = game.base_speed
+        self.current_speed = game.current_speed
+        self.move_timer = game.move_timer
+        self.rng_state = game.rng_state()
+        self.layout = layout
+        self.board = game.board.snapshot()
+        self.snake = game.snake.snapshot()
+        self.fruits = tuple((fruit.type, fruit.pos) for fruit in game.fruits)
+
+
+# --- Engine ---
+class SnakeEngine:
+    """Advances one game of Snake a tick at a time.
+
+    step() returns a list of (event, data) tuples so a front end can add
+    sounds and effects: ("eat", fruit) and ("game_over", cause), where
+    cause is "self", "wall", "obstacle" or "board_full" when the snake
+    has filled every cell and no fruit can be placed. ("turn", stamp) is
+    reported when a queued turn that was given a stamp is applied.
+
+    Every random choice goes through the engine's own rng, seeded per game,
+    so the same seed, mode, difficulty and inputs replay bit-exactly.
+    """
+    def __init__(self, game_mode="Classic", difficulty="Medium", seed=None,
+                 snake_class=Snake, fruit_class=Fruit, obstacle_class=Obstacle,
+                 width=GRID_WIDTH, height=GRID_HEIGHT):
+        self.snake_class = snake_class
+        self.fruit_class = fruit_class
+        self.obstacle_class = obstacle_class
+        self.recorder = None
+        self.autopilot = None   # Chooses the action when step() is given none
+        self.layout_cache = None   # Looked up before generating an obstacle layout, see layouts.py
+        self.obstacle_layout = None
+        self.rng = random.Random()
+        self.board = Board(width, height)
+        self.snake = snake_class(self.board, self.rng)
+        self.fruits = []
+        self.obstacles = []
+        self._layout = None
+        self._rng_state = None
+        self.reset(game_mode, difficulty, seed)
+
+    def reset(self, game_mode=None, difficulty=None, seed=None, width=None, height=None):
+        """Resets all variables for a new game, drawing a fresh seed unless one is given.
+
+        width and height change the board size; by default it is kept.
+        """
+        if game_mode is not None:
+            self.game_mode = game_mode
+        if difficulty is not None:
+            self.difficulty = difficulty
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.rng.seed(self.seed)
+        self._rng_state = None
+        width = width or self.board.width
+        height = height or self.board.height
+        if (width, height) != (self.board.width, self.board.height):
+            self.board.resize(width, height)
+        else:
+            self.board.clear()
+        self.snake.reset()
+        self.score = 0
+        self.ticks = 0
+        self.game_over_flag = False
+        self.death_cause = None
+        self.obstacles.clear()
+        self.fruits.clear()
+        self._layout = None
+        self.obstacle_layout = None
+
+        # Set speed based on difficulty
+        self.base_speed = BASE_SPEEDS[self.difficulty]
+        self.current_speed = self.base_speed
+        self.move_timer = 0
+
+        if self.game_mode == "Obstacle":
+            self.place_obstacles(cached=seed is not None)
+
+        # Spawn initial fruit
+        self.spawn_fruit()
+        if self.recorder is not None:
+            self.recorder.start(self)
+
+    def place_obstacles(self, cached=True):
+        """Lays out this game's obstacles from the cache, or generates and caches a validated layout.
+
+        The cache is skipped unless cached is true; reset() passes False for
+        a freshly drawn seed, whose layout would never be asked for again.
+        """
+        board = self.board
+        start = self.snake.get_head_position()
+        cache = self.layout_cache if cached else None
+        key = (self.seed, self.difficulty, board.width, board.height)
+        layout = cache.get(key, start) if cache is not None else None
+        if layout is not None:
+            for pos in layout.positions:
+                board.add_obstacle(pos)
+            self.rng.setstate(layout.rng_state)   # Where generating it would have left the rng
+        else:
+            count = obstacle_count(self.difficulty, board.width, board.height)
+            layout = generate_layout(board, self.rng, count, start, self.snake.direction)
+            if cache is not None:
+                cache.put(key, layout)
+        self.obstacle_layout = layout
+        self.obstacles[:] = [self.obstacle_class(pos) for pos in layout.positions]
+
+    # --- Snapshots ---
+    def layout(self):
+        """The obstacle grid and obstacles, made once per game; obstacles never change during one."""
+        if self._layout is None:
+            self._layout = (bytes(self.board.blocked), tuple(self.obstacles), self.obstacle_layout)
+        return self._layout
+
+    def rng_state(self):
+        """rng.getstate(), cached until the next fruit spawn since nothing else draws from the rng."""
+        if self._rng_state is None:
+            self._rng_state = self.rng.getstate()
+        return self._rng_state
+
+    def snapshot(self):
+        """Returns a Snapshot of the current state, to restore() or clone() later."""
+        return Snapshot(self)
+
+    def restore(self, snapshot):
+        """Puts the game back into the state snapshot was taken in.
+
+        Fruits are rebuilt from their types and positions; obstacles are
+        shared with the snapshot's game. An attached recorder drops the
+        ticks that are being undone.
+        """
+        self.game_mode = snapshot.game_mode
+        self.difficulty = snapshot.difficulty
+        self.seed = snapshot.seed
+        self.ticks = snapshot.ticks
+        self.score = snapshot.score
+        self.game_over_flag = snapshot.game_over_flag
+        self.death_cause = snapshot.death_cause
+        self.base_speed = snapshot.base_speed
+        self.current_speed = snapshot.current_speed
+        self.move_timer = snapshot.move_timer
+        if self._rng_state is not snapshot.rng_state:
+            self.rng.setstate(snapshot.rng_state)
+            self._rng_state = snapshot.rng_state
+        self.board.restore(snapshot.board)
+        self.snake.restore(snapshot.snake)
+        if self._layout is not snapshot.layout:
+            self._layout = snapshot.layout
+            obstacles = snapshot.layout[1]
+            if obstacles and type(obstacles[0]) is not self.obstacle_class:
+                obstacles = [self.obstacle_class(obs.pos) for obs in obstacles]   # e.g. a headless game's into the window
+            self.obstacles[:] = obstacles
+            self.obstacle_layout = snapshot.layout[2]
+        fruits = []
+        for fruit_type, pos in snapshot.fruits:
+            fruit = self.fruit_class(fruit_type)
+            fruit.pos = pos
+            fruits.append(fruit)
+        self.fruits[:] = fruits
+        if self.recorder is not None:
+            self.recorder.rewind(self)
+
+    def clone(self, snapshot=None):
+        """Returns a new engine in this one's state, or in snapshot's, with no recorder or autopilot."""
+        return SnakeEngine.from_snapshot(snapshot or self.snapshot(), self.snake_class,
+                                         self.fruit_class, self.obstacle_class)
+
+    @classmethod
+    def from_snapshot(cls, snapshot, snake_class=Snake, fruit_class=Fruit, obstacle_class=Obstacle):
+        """Builds an engine straight from a snapshot, skipping the setup of a new game."""
+        game = cls.__new__(cls)
+        game.snake_class = snake_class
+        game.fruit_class = fruit_class
+        game.obstacle_class = obstacle_class
+        game.recorder = None
+        game.autopilot = None
+        game.layout_cache = None
+        game.obstacle_layout = None
+        game.rng = random.Random.__new__(random.Random)   # Unseeded; restore() sets the state
+        game.board = Board(1, 1)   # Resized by restore()
+        game.snake = snake_class(game.board, game.rng)
+        game.fruits = []
+        game.obstacles = []
+        game._layout = None
+        game._rng_state = None
+        game.restore(snapshot)
+        return game
+
+    def spawn_fruit(self):
+        """Spawns fruit(s) based on the game mode; returns False if the board is full."""
+        for fruit in self.fruits:
+            self.board.remove_fruit(fruit.pos)
+        self.fruits.clear()
+        self._rng_state = None
+        num_fruits = 3 if self.game_mode == 'Multi-fruit' else 1
+        distances = self.obstacle_layout.distances() if self.obstacle_layout is not None else None
+
+        for _ in range(num_fruits):
+            if self.game_mode == 'Multi-fruit':
+                fruit_choice = self.rng.choices(list(FRUIT_WEIGHTS), weights=list(FRUIT_WEIGHTS.values()), k=1)[0]
+                fruit = self.fruit_class(fruit_choice)
+            else:
+                fruit = self.fruit_class('apple')
+
+            if not fruit.randomize_position(self.board, self.rng, distances):
+                break
+            self.board.add_fruit(fruit.pos)
+            self.fruits.append(fruit)
+        return bool(self.fruits)
+
+    def step(self, action=None):
+        """Turns towards action (a direction, or None to keep going) and moves one cell."""
+        events = []
+        if self.game_over_flag:
+            return events
+        if action is None and self.autopilot is not None:
+            action = self.autopilot.choose(self)
+        if action is not None:
+            self.snake.turn(action)
+
+        self.snake.move(self.game_mode == "Wall-less")
+        self.ticks += 1
+        if self.recorder is not None:
+            self.recorder.record(self.snake.direction)
+        if self.snake.applied_turn_stamp is not None:
+            events.append(("turn", self.snake.applied_turn_stamp))
+        head_pos = self.snake.get_head_position()
+        cause = None
+
+        # Collision with fruit
+        for fruit in self.fruits[:]:
+            if head_pos == fruit.pos:
+                self.score += fruit.properties['score']
+                self.snake.grow()
+                events.append(("eat", fruit))
+
+                # Handle fruit effects
+                if fruit.properties['effect'] == 'speed_boost':
+                    self.current_speed *= 1.5
+                elif fruit.properties['effect'] == 'slow_down':
+                    self.current_speed = max(self.base_speed, self.current_speed * 0.75)
+
+                self.fruits.remove(fruit)
+                self.board.remove_fruit(fruit.pos)
+                if not self.fruits and not self.spawn_fruit():
+                    cause = "board_full"
+
+        if cause is None:
+            cause = self.collision_cause()
+        if cause:
+            self.game_over_flag = True
+            self.death_cause = cause
+            events.append(("game_over", cause))
+
+        # Speed-up mode logic
+        if self.game_mode == "Speed-up":
+            self.current_speed += 0.05
+
+        return events
+
+    def collision_cause(self):
+        """Checks the head for collision with self, wall and obstacles."""
+        if self.snake.collides_with_self():
+            return "self"
+        if self.game_mode != "Wall-less" and self.snake.collides_with_wall():
+            return "wall"
+        if self.game_mode == "Obstacle" and self.snake.collides_with_obstacles():
+            return "obstacle"
+        return None
+
+    def update(self, elapsed_ms):
+        """Adds elapsed wall-clock time and runs every step owed at the current speed.
+
+        The leftover time is kept for the next call, so the effective speed
+        matches current_speed whatever the frame rate.
+        """
+        events = []
+        if self.game_over_flag:
+            return events
+        self.move_timer += elapsed_ms
+        for _ in range(MAX_STEPS_PER_UPDATE):
+            move_interval = 1000 / self.current_speed
+            if self.game_over_flag or self.move_timer < move_interval:
+                break
+            self.move_timer -= move_interval
+            events.extend(self.step())
+        else:
+            self.move_timer = min(self.move_timer, 1000 / self.current_speed)
+        return events
@@ -0,0 +1,191 @@
+# Obstacle Layout Cache
+# Keeps validated Obstacle-mode layouts on disk, one small file per seed,
+# difficulty and board size, so replaying a seed or re-running a tournament
+# starts without generating and flood-filling the layout again. Only games
+# started with a given seed use it, and the least recently used files are
+# deleted once the directory passes its size cap.
+#
+#   python layouts.py --difficulty Hard --board 1000x1000 --seeds 0-99   # fill the cache ahead of a run
+#
+# File layout (little-endian): magic b"SNKL", version u8, layout version u8,
+# width u16, height u16, start x u16, start y u16, count u32, then count
+# (x u16, y u16) positions and the 625 u32 words of the rng state.
+
+import argparse
+import os
+import struct
+import sys
+import time
+from array import array
+
+import engine
+from scores import default_path
+
+MAGIC = b"SNKL"
+VERSION = 1
+HEADER = struct.Struct("<4sBBHHHHI")
+RNG_WORDS = 625   # Mersenne Twister state plus its position
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024   # About 500 Hard 1000x1000 layouts, or 25000 on the default board
+
+
+def default_directory():
+    return os.path.join(os.path.dirname(default_path()), 'layouts')
+
+
+def to_bytes(layout):
+    version, words, gauss = layout.rng_state
+    header = HEADER.pack(MAGIC, VERSION, engine.LAYOUT_VERSION, layout.width, layout.height,
+                         layout.start[0], layout.start[1], len(layout.positions))
+    cells = array('H', [v for pos in layout.positions for v in pos])
+    state = array('I', words)
+    if sys.byteorder != 'little':
+        cells.byteswap()
+        state.byteswap()
+    return header + cells.tobytes() + state.tobytes()
+
+
+def from_bytes(data):
+    """Returns the ObstacleLayout in data, or None if it is from another version or damaged."""
+    if len(data) < HEADER.size:
+        return None
+    magic, version, layout_version, width, height, x, y, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION or layout_version != engine.LAYOUT_VERSION:
+        return None
+    if len(data) != HEADER.size + 4 * count + 4 * RNG_WORDS:
+        return None
+    cells = array('H', data[HEADER.size:HEADER.size + 4 * count])
+    state = array('I', data[HEADER.size + 4 * count:])
+    if sys.byteorder != 'little':
+        cells.byteswap()
+        state.byteswap()
+    positions = tuple(zip(cells[0::2], cells[1::2]))
+    return engine.ObstacleLayout(width, height, positions, (x, y), (3, tuple(state), None))
+
+
+class LayoutCache:
+    """Validated layouts on disk, looked up by SnakeEngine before it generates one.
+
+    Attach with engine.layout_cache = LayoutCache(). Files are written to a
+    temporary name and renamed into place, so processes sharing the
+    directory never read half a layout. A file that can't be read or
+    written is treated as a miss. A hit touches the file, and once the
+    directory holds more than max_bytes of layouts the least recently
+    used are deleted down to three quarters of it.
+    """
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or default_directory()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._bytes = None   # Size of the cached layouts, counted on the first put()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, key):
+        seed, difficulty, width, height = key
+        return os.path.join(self.directory, f"{width}x{height}-{difficulty}-{seed:x}.layout")
+
+    def get(self, key, start):
+        try:
+            with open(self.path(key), 'rb') as f:
+                layout = from_bytes(f.read())
+        except (OSError, ValueError):
+            layout = None
+        if layout is None or layout.start != start or (layout.width, layout.height) != key[2:]:
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            os.utime(self.path(key))   # Recently used, so kept longest
+        except OSError:
+            pass
+        return layout
+
+    def put(self, key, layout):
+        path = self.path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        data = to_bytes(layout)
+        try:
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+        if self._bytes is None:
+            self._bytes = sum(size for _, size, _ in self._files())
+        else:
+            self._bytes += len(data)
+        if self._bytes > self.max_bytes:
+            self.evict()
+
+    def _files(self):
+        """(modified time, size, path) of every cached layout."""
+        files = []
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.layout'):
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue   # Deleted by another process
+                        files.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            pass
+        return files
+
+    def evict(self):
+        """Deletes the least recently used layouts until they take up three quarters of max_bytes."""
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_bytes * 3 // 4:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        self._bytes = total
+
+
+def parse_seeds(text):
+    start, _, end = text.partition('-')
+    return range(int(start), int(end or start) + 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate Obstacle-mode layouts into the on-disk cache")
+    parser.add_argument("--difficulty", nargs="+", default=engine.DIFFICULTIES, choices=engine.DIFFICULTIES)
+    parser.add_argument("--board", default=f"{engine.GRID_WIDTH}x{engine.GRID_HEIGHT}", help="board size as WxH")
+    parser.add_argument("--seeds", type=parse_seeds, default=range(100), help="seed or range, e.g. 0-999")
+    parser.add_argument("--dir", help="cache directory (default: next to the high scores)")
+    parser.add_argument("--max-mb", type=float, default=DEFAULT_MAX_BYTES / 2 ** 20,
+                        help="size cap; least recently used layouts are deleted past it")
+    args = parser.parse_args(argv)
+    try:
+        width, height = (int(n) for n in args.board.lower().split('x'))
+    except ValueError:
+        parser.error("--board must look like 100x100")
+
+    cache = LayoutCache(args.dir, int(args.max_mb * 2 ** 20))
+    game = engine.SnakeEngine("Classic", args.difficulty[0], width=width, height=height)
+    game.layout_cache = cache
+    repairs = 0
+    start = time.perf_counter()
+    for difficulty in args.difficulty:
+        for seed in args.seeds:
+            game.reset("Obstacle", difficulty, seed)
+            repairs += game.obstacle_layout.repairs
+    elapsed = time.perf_counter() - start
+    games = len(args.difficulty) * len(args.seeds)
+    print(f"{games} layouts in {elapsed:.2f} s ({cache.hits} already cached, {repairs} obstacles moved "
+          f"to keep every cell reachable) in {cache.directory}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,672 @@
+# Local Multiplayer
+# An authoritative arena where many snakes share one board, served over
+# asyncio streams at a fixed tick. Clients send only direction changes and
+# the server broadcasts what changed each tick rather than the whole board.
+#
+#   python multiplayer.py server --port 7777            # run a server
+#   python multiplayer.py bots 20 --port 7777           # connect scripted bots
+#   python multiplayer.py demo --bots 100 --ticks 600   # both, over localhost
+#
+# Wire protocol (little-endian). A client sends its name once as a u8
+# length and UTF-8 bytes, then one byte per direction change: the index
+# into engine.DIRECTIONS. The server sends frames of a u32 length and a
+# payload starting with a message type:
+#   b"W" welcome: player u16, width u16, height u16, tick rate u8, mode u8,
+#        obstacle count u32 and (x u16, y u16) each, then the current state
+#        as ops
+#   b"T" tick: tick u32, then the ops that happened on it
+# Ops are an opcode u8 and fixed fields (see OPS); JOIN is followed by a
+# u8 name length and the name. A snake is rebuilt from SPAWN at its tail
+# and one HEAD per further segment, so the snapshot needs no other ops.
+
+import argparse
+import asyncio
+import random
+import statistics
+import struct
+import sys
+import time
+from collections import deque
+from itertools import islice
+
+import engine
+
+DEFAULT_PORT = 7777
+RESPAWN_TICKS = 24           # Ticks a dead player waits before rejoining the board
+SPAWN_CLEARANCE = 3          # Free cells wanted ahead of a new snake
+MAX_CLIENT_BUFFER = 1 << 20  # Unsent bytes before a client that can't keep up is dropped
+MAX_NAME = 32
+
+CAUSES = ["self", "snake", "wall", "obstacle", "left"]
+FRUIT_NAMES = list(engine.FRUIT_TYPES)
+
+FRAME = struct.Struct("<I")
+WELCOME = struct.Struct("<cHHHBBI")
+TICK = struct.Struct("<cI")
+CELL = struct.Struct("<HH")
+
+OP_HEAD, OP_TAIL, OP_FRUIT, OP_DIE, OP_SPAWN, OP_SCORE, OP_JOIN, OP_LEAVE = range(1, 9)
+OPS = {
+    OP_HEAD: struct.Struct("<BHHH"),    # player, x, y: head moved onto a cell
+    OP_TAIL: struct.Struct("<BH"),      # player: tail cell dropped
+    OP_FRUIT: struct.Struct("<BHBHH"),  # slot, fruit type, x, y: fruit (re)spawned in a slot
+    OP_DIE: struct.Struct("<BHB"),      # player, cause: snake removed from the board
+    OP_SPAWN: struct.Struct("<BHHH"),   # player, x, y: new one-cell snake
+    OP_SCORE: struct.Struct("<BHI"),    # player, score
+    OP_JOIN: struct.Struct("<BHB"),     # player, name length; name follows
+    OP_LEAVE: struct.Struct("<BH"),     # player
+}
+
+
+# --- Protocol ---
+def encode_ops(events):
+    """Packs arena events into ops."""
+    out = bytearray()
+    for event in events:
+        kind = event[0]
+        if kind == "head":
+            out += OPS[OP_HEAD].pack(OP_HEAD, event[1], *event[2])
+        elif kind == "tail":
+            out += OPS[OP_TAIL].pack(OP_TAIL, event[1])
+        elif kind == "fruit":
+            out += OPS[OP_FRUIT].pack(OP_FRUIT, event[1], FRUIT_NAMES.index(event[2]), *event[3])
+        elif kind == "die":
+            out += OPS[OP_DIE].pack(OP_DIE, event[1], CAUSES.index(event[2]))
+        elif kind == "spawn":
+            out += OPS[OP_SPAWN].pack(OP_SPAWN, event[1], *event[2])
+        elif kind == "score":
+            out += OPS[OP_SCORE].pack(OP_SCORE, event[1], event[2])
+        elif kind == "join":
+            name = event[2].encode('utf-8')[:255]
+            out += OPS[OP_JOIN].pack(OP_JOIN, event[1], len(name)) + name
+        elif kind == "leave":
+            out += OPS[OP_LEAVE].pack(OP_LEAVE, event[1])
+    return out
+
+def decode_ops(data, offset=0):
+    """Yields (opcode, fields) for each op in data from offset on."""
+    end = len(data)
+    while offset < end:
+        op = data[offset]
+        layout = OPS[op]
+        fields = layout.unpack_from(data, offset)[1:]
+        offset += layout.size
+        if op == OP_JOIN:
+            name = bytes(data[offset:offset + fields[1]]).decode('utf-8', 'replace')
+            offset += fields[1]
+            fields = (fields[0], name)
+        yield op, fields
+
+def frame(payload):
+    return FRAME.pack(len(payload)) + payload
+
+
+# --- Arena ---
+class Player:
+    """One connected player: their snake while alive, and their scores."""
+    def __init__(self, pid, name, snake):
+        self.id = pid
+        self.name = name
+        self.snake = snake
+        self.alive = False
+        self.score = 0
+        self.best = 0
+        self.deaths = 0
+        self.respawn_at = 0
+
+
+class ArenaSnake(engine.Snake):
+    """A snake that starts on a cell the arena picks instead of the board centre."""
+    def __init__(self, board, rng, start):
+        self.start = start
+        super().__init__(board, rng)
+
+    def start_position(self):
+        return self.start
+
+
+class Arena:
+    """Authoritative state of a shared board, advanced one tick at a time.
+
+    Every snake moves each tick with the engine's movement and turn rules.
+    Collisions are judged once all snakes have moved, so two heads meeting
+    on a cell both die and a head may follow another snake's tail into the
+    cell it just left. A dead snake is taken off the board and its player
+    respawns RESPAWN_TICKS later. Fruits are shared; each sits in a fixed
+    slot and a new one spawns in the slot as soon as one is eaten. Fruit
+    effects are ignored since every snake moves at the server's tick rate.
+
+    step() returns a list of events in the order a client should apply them:
+    ("head", pid, pos), ("tail", pid), ("die", pid, cause),
+    ("fruit", slot, type, pos), ("spawn", pid, pos), ("score", pid, score),
+    ("join", pid, name) and ("leave", pid). Joins and leaves between ticks
+    are reported with the next tick.
+    """
+    def __init__(self, width=100, height=100, game_mode="Classic", difficulty="Medium",
+                 fruit_count=None, seed=None):
+        self.game_mode = game_mode
+        self.difficulty = difficulty
+        self.tick_rate = engine.BASE_SPEEDS[difficulty]
+        self.rng = random.Random(seed)
+        self.board = engine.Board(width, height)
+        self.wrap = game_mode == "Wall-less"
+        self.players = {}
+        self.ticks = 0
+        self.pending = []   # Events since the last tick
+        self._next_id = 0
+
+        self.obstacles = []
+        if game_mode == "Obstacle":
+            # Snakes spawn anywhere, so the layout only has to keep the open cells connected
+            count = engine.obstacle_count(difficulty, width, height)
+            self.obstacles = list(engine.generate_layout(self.board, self.rng, count).positions)
+
+        if fruit_count is None:
+            fruit_count = 3 if game_mode == "Multi-fruit" else 1
+        self.fruits = [None] * fruit_count   # (type, pos) per slot
+        self.fixed_fruit_count = fruit_count
+        for slot in range(fruit_count):
+            self._spawn_fruit(slot, self.pending)
+
+    # --- Players ---
+    def join(self, name):
+        """Adds a player, spawning their snake if there is room, and returns their id."""
+        pid = self._next_id
+        self._next_id = (pid + 1) % 65536
+        while pid in self.players:
+            pid = self._next_id
+            self._next_id = (pid + 1) % 65536
+        player = Player(pid, name[:MAX_NAME], None)
+        self.players[pid] = player
+        self.pending.append(("join", pid, player.name))
+        self._spawn(player, self.pending)
+        self._grow_fruit()
+        return pid
+
+    def leave(self, pid):
+        player = self.players.pop(pid, None)
+        if player is None:
+            return
+        if player.alive:
+            self._remove_snake(player)
+        self.pending.append(("leave", pid))
+
+    def turn(self, pid, direction):
+        player = self.players.get(pid)
+        if player is not None and player.alive:
+            player.snake.turn(direction)
+
+    # --- Tick ---
+    def step(self):
+        """Moves every snake one cell and resolves collisions, fruit and respawns."""
+        events, self.pending = self.pending, []
+        self.ticks += 1
+        board = self.board
+        alive = [p for p in self.players.values() if p.alive]
+
+        for player in alive:
+            snake = player.snake
+            drops = len(snake.positions) >= snake.length
+            snake.move(self.wrap)
+            if drops:
+                events.append(("tail", player.id))
+            head = snake.get_head_position()
+            events.append(("head", player.id, head if board.in_bounds(head) else (65535, 65535)))
+
+        # Judge collisions against the board as it is after every move
+        dead = []
+        for player in alive:
+            cause = self._collision(player.snake)
+            if cause:
+                dead.append((player, cause))
+        for player, cause in dead:
+            self._kill(player, cause, events)
+
+        for player in alive:
+            if not player.alive:
+                continue
+            i = board.index(player.snake.get_head_position())
+            if board.fruit[i]:
+                slot = next(s for s, f in enumerate(self.fruits) if f and board.index(f[1]) == i)
+                fruit_type, pos = self.fruits[slot]
+                board.remove_fruit(pos)
+                self.fruits[slot] = None
+                player.snake.grow()
+                player.score += engine.FRUIT_TYPES[fruit_type]['score']
+                player.best = max(player.best, player.score)
+                events.append(("score", player.id, player.score))
+                self._spawn_fruit(slot, events)
+
+        for slot, fruit in enumerate(self.fruits):
+            if fruit is None:
+                self._spawn_fruit(slot, events)   # The board was full when it was eaten
+        for player in self.players.values():
+            if not player.alive and player.respawn_at <= self.ticks:
+                self._spawn(player, events)
+        return events
+
+    def _collision(self, snake):
+        board = self.board
+        head = snake.get_head_position()
+        if not board.in_bounds(head):
+            return "wall"
+        i = board.index(head)
+        if board.blocked[i]:
+            return "obstacle"
+        if board.body[i] > 1:
+            return "self" if head in islice(snake.positions, 1, None) else "snake"
+        return None
+
+    def _kill(self, player, cause, events):
+        self._remove_snake(player)
+        player.deaths += 1
+        player.score = 0
+        player.respawn_at = self.ticks + RESPAWN_TICKS
+        events.append(("die", player.id, cause))
+
+    def _remove_snake(self, player):
+        for pos in player.snake.positions:
+            self.board.remove_body(pos)
+        player.snake.positions.clear()
+        player.alive = False
+
+    def _spawn(self, player, events):
+        """Places a one-cell snake on a free cell, facing a clear run where one can be found."""
+        board = self.board
+        for _ in range(16):
+            pos = board.sample_free(self.rng)
+            if pos is None:
+                player.respawn_at = self.ticks + RESPAWN_TICKS
+                return
+            clear = [d for d in engine.DIRECTIONS if self._clear_run(pos, d)]
+            if clear:
+                break
+        player.snake = ArenaSnake(board, self.rng, pos)
+        if clear:
+            player.snake.direction = player.snake.next_direction = self.rng.choice(clear)
+        player.alive = True
+        player.score = 0
+        events.append(("spawn", player.id, pos))
+        events.append(("score", player.id, 0))
+
+    def _clear_run(self, pos, direction):
+        board = self.board
+        x, y = pos
+        for _ in range(SPAWN_CLEARANCE):
+            x, y = x + direction[0], y + direction[1]
+            if self.wrap:
+                x, y = x % board.width, y % board.height
+            if not board.in_bounds((x, y)) or board.body[board.index((x, y))] or board.blocked[board.index((x, y))]:
+                return False
+        return True
+
+    def _spawn_fruit(self, slot, events):
+        if self.game_mode == "Multi-fruit":
+            fruit_type = self.rng.choices(FRUIT_NAMES, weights=[engine.FRUIT_WEIGHTS[n] for n in FRUIT_NAMES])[0]
+        else:
+            fruit_type = 'apple'
+        pos = self.board.sample_free(self.rng)
+        if pos is None:
+            return
+        self.board.add_fruit(pos)
+        self.fruits[slot] = (fruit_type, pos)
+        events.append(("fruit", slot, fruit_type, pos))
+
+    def _grow_fruit(self):
+        """Keeps about one fruit per four players on top of the mode's own count."""
+        wanted = max(self.fixed_fruit_count, len(self.players) // 4)
+        while len(self.fruits) < wanted:
+            self.fruits.append(None)
+            self._spawn_fruit(len(self.fruits) - 1, self.pending)
+
+    # --- Snapshot ---
+    def snapshot_ops(self):
+        """The whole current state as ops, for a client that has just joined."""
+        events = []
+        for player in self.players.values():
+            events.append(("join", player.id, player.name))
+            if player.alive:
+                positions = player.snake.positions
+                events.append(("spawn", player.id, positions[-1]))
+                for i in range(len(positions) - 2, -1, -1):
+                    events.append(("head", player.id, positions[i]))
+            events.append(("score", player.id, player.score))
+        for slot, fruit in enumerate(self.fruits):
+            if fruit is not None:
+                events.append(("fruit", slot, fruit[0], fruit[1]))
+        return encode_ops(events)
+
+
+# --- Server ---
+class ArenaServer:
+    """Runs an Arena at its tick rate and streams every tick to connected clients.
+
+    Each tick's events are encoded once and the same frame is written to
+    every client without waiting on any of them; a client whose unsent
+    data passes MAX_CLIENT_BUFFER is disconnected so one slow reader can't
+    hold up the tick or grow the server's memory. Tick times (step, encode
+    and send) are kept in tick_ms for latency reports.
+    """
+    def __init__(self, arena, host='127.0.0.1', port=DEFAULT_PORT, window=1000):
+        self.arena = arena
+        self.host = host
+        self.port = port
+        self.clients = {}   # pid -> StreamWriter
+        self.tick_ms = deque(maxlen=window)
+        self.overruns = 0
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        for writer in self.clients.values():
+            writer.close()
+        self.clients.clear()
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def _handle_client(self, reader, writer):
+        try:
+            size = (await reader.readexactly(1))[0]
+            name = (await reader.readexactly(size)).decode('utf-8', 'replace')
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        arena = self.arena
+        pid = arena.join(name or "Player")
+        board = arena.board
+        header = WELCOME.pack(b"W", pid, board.width, board.height, arena.tick_rate,
+                              engine.GAME_MODES.index(arena.game_mode), len(arena.obstacles))
+        obstacles = b"".join(CELL.pack(*pos) for pos in arena.obstacles)
+        writer.write(frame(header + obstacles + arena.snapshot_ops()))
+        self.clients[pid] = writer
+        try:
+            while True:
+                data = await reader.read(64)
+                if not data:
+                    break
+                for code in data:
+                    if code < len(engine.DIRECTIONS):
+                        arena.turn(pid, engine.DIRECTIONS[code])
+        except ConnectionError:
+            pass
+        finally:
+            self._drop(pid)
+
+    def _drop(self, pid):
+        writer = self.clients.pop(pid, None)
+        if writer is not None:
+            writer.close()
+            self.arena.leave(pid)
+
+    def tick(self):
+        """Advances the arena once and sends the tick to every client."""
+        start = time.perf_counter()
+        events = self.arena.step()
+        data = frame(TICK.pack(b"T", self.arena.ticks) + encode_ops(events))
+        for pid, writer in list(self.clients.items()):
+            if writer.is_closing() or writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+                self._drop(pid)
+            else:
+                writer.write(data)
+        self.tick_ms.append((time.perf_counter() - start) * 1000)
+
+    async def run(self, ticks=None):
+        """Ticks on a fixed schedule until ticks have passed, or forever.
+
+        Deadlines are counted from the start, so a slow tick shortens the
+        next wait rather than drifting; if the server falls a whole tick
+        behind, the missed ticks are skipped instead of run back to back.
+        """
+        loop = asyncio.get_running_loop()
+        interval = 1 / self.arena.tick_rate
+        deadline = loop.time()
+        count = 0
+        while ticks is None or count < ticks:
+            deadline += interval
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
+            self.tick()
+            count += 1
+            if loop.time() - deadline > interval:
+                self.overruns += 1
+                deadline = loop.time()
+
+    def latency_report(self):
+        if not self.tick_ms:
+            return "no ticks"
+        ordered = sorted(self.tick_ms)
+        p99 = ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))]
+        return (f"tick p50 {statistics.median(ordered):.2f} ms  p99 {p99:.2f} ms  "
+                f"max {ordered[-1]:.2f} ms  overruns {self.overruns}")
+
+
+# --- Client ---
+class ClientState:
+    """A client's mirror of the arena, rebuilt from the welcome frame and kept up by ticks.
+
+    Occupancy is a plain byte grid of body segments per cell; clients never
+    place anything, so the engine Board's free-cell list would be wasted work.
+    """
+    def __init__(self):
+        self.player = None
+        self.tick = 0
+        self.tick_rate = None
+        self.game_mode = None
+        self.wrap = False
+        self.width = self.height = 0
+        self.body = bytearray()      # Snake segments per cell
+        self.blocked = bytearray()   # Obstacles
+        self.obstacles = []
+        self.names = {}
+        self.bodies = {}   # pid -> deque of positions, head first
+        self.scores = {}
+        self.fruits = {}   # slot -> (type, pos)
+        self.deaths = []   # (pid, cause) seen on the latest tick
+
+    def apply(self, payload):
+        kind = payload[:1]
+        if kind == b"W":
+            _, self.player, self.width, self.height, self.tick_rate, mode, count = WELCOME.unpack_from(payload)
+            self.game_mode = engine.GAME_MODES[mode]
+            self.wrap = self.game_mode == "Wall-less"
+            self.body = bytearray(self.width * self.height)
+            self.blocked = bytearray(self.width * self.height)
+            offset = WELCOME.size
+            self.obstacles = [CELL.unpack_from(payload, offset + i * CELL.size) for i in range(count)]
+            for x, y in self.obstacles:
+                self.blocked[y * self.width + x] = 1
+            self._apply_ops(payload, offset + count * CELL.size)
+        elif kind == b"T":
+            self.tick = TICK.unpack_from(payload)[1]
+            self.deaths = []
+            self._apply_ops(payload, TICK.size)
+
+    def _set(self, pos, delta):
+        x, y = pos
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.body[y * self.width + x] += delta
+
+    def _apply_ops(self, payload, offset):
+        for op, fields in decode_ops(payload, offset):
+            if op == OP_HEAD:
+                body = self.bodies.get(fields[0])
+                if body is not None:
+                    body.appendleft(fields[1:])
+                    self._set(fields[1:], 1)
+            elif op == OP_TAIL:
+                body = self.bodies.get(fields[0])
+                if body:
+                    self._set(body.pop(), -1)
+            elif op == OP_FRUIT:
+                self.fruits[fields[0]] = (FRUIT_NAMES[fields[1]], fields[2:])
+            elif op in (OP_DIE, OP_LEAVE):
+                for pos in self.bodies.pop(fields[0], ()):
+                    self._set(pos, -1)
+                if op == OP_DIE:
+                    self.scores[fields[0]] = 0   # A score lasts one life
+                    self.deaths.append((fields[0], CAUSES[fields[1]]))
+                else:
+                    self.names.pop(fields[0], None)
+                    self.scores.pop(fields[0], None)
+            elif op == OP_SPAWN:
+                for pos in self.bodies.get(fields[0], ()):
+                    self._set(pos, -1)
+                self.bodies[fields[0]] = deque([fields[1:]])
+                self._set(fields[1:], 1)
+            elif op == OP_SCORE:
+                self.scores[fields[0]] = fields[1]
+            elif op == OP_JOIN:
+                self.names[fields[0]] = fields[1]
+
+
+class GreedyBot:
+    """Scripted player: steps towards the nearest fruit without entering an occupied cell."""
+    def __init__(self, rng=None):
+        self.rng = rng or random.Random()
+        self.direction = None
+
+    def choose(self, state):
+        """Returns a direction index to send, or None to keep going."""
+        body = state.bodies.get(state.player)
+        if not body:
+            self.direction = None
+            return None
+        width, height = state.width, state.height
+        head = body[0]
+        options = []
+        for d, (dx, dy) in enumerate(engine.DIRECTIONS):
+            if len(body) > 1 and self.direction is not None and engine.DIRECTIONS[self.direction] == (-dx, -dy):
+                continue
+            x, y = head[0] + dx, head[1] + dy
+            if state.wrap:
+                x, y = x % width, y % height
+            if not (0 <= x < width and 0 <= y < height):
+                continue
+            i = y * width + x
+            if state.body[i] or state.blocked[i]:
+                continue
+            distance = min((abs(x - f[0]) + abs(y - f[1]) for _, f in state.fruits.values()), default=0)
+            options.append((distance, self.rng.random(), d))
+        if not options:
+            return None
+        d = min(options)[2]
+        if d == self.direction:
+            return None
+        self.direction = d
+        return d
+
+
+async def read_frame(reader):
+    size = FRAME.unpack(await reader.readexactly(FRAME.size))[0]
+    return await reader.readexactly(size)
+
+async def run_bot(host, port, name, ticks=None, bot=None):
+    """Connects a scripted bot and plays until ticks frames have arrived or the server closes."""
+    bot = bot or GreedyBot()
+    reader, writer = await asyncio.open_connection(host, port)
+    encoded = name.encode('utf-8')[:255]
+    writer.write(bytes([len(encoded)]) + encoded)
+    state = ClientState()
+    seen = 0
+    try:
+        while ticks is None or seen < ticks:
+            state.apply(await read_frame(reader))
+            if state.player is None:
+                continue
+            seen += 1
+            d = bot.choose(state)
+            if d is not None:
+                writer.write(bytes([d]))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+    return state
+
+
+# --- Command Line ---
+def add_arena_arguments(parser):
+    parser.add_argument("--host", default='127.0.0.1')
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--mode", default="Classic", choices=[m for m in engine.GAME_MODES if m != "Speed-up"])
+    parser.add_argument("--difficulty", default="Medium", choices=engine.DIFFICULTIES)
+    parser.add_argument("--board", default="100x100", help="board size as WIDTHxHEIGHT")
+    parser.add_argument("--seed", type=int)
+
+def make_arena(args):
+    width, height = (int(n) for n in args.board.lower().split('x'))
+    return Arena(width, height, args.mode, args.difficulty, seed=args.seed)
+
+async def serve(args):
+    server = await ArenaServer(make_arena(args), args.host, args.port).start()
+    print(f"Serving {args.mode} {args.difficulty} on {args.host}:{server.port}")
+    try:
+        await server.run()
+    finally:
+        await server.close()
+
+async def bots(args):
+    names = [f"Bot {i}" for i in range(args.first, args.first + args.count)]
+    await asyncio.gather(*(run_bot(args.host, args.port, name, args.ticks) for name in names))
+
+async def demo(args):
+    """Runs a server with bot clients in separate processes and reports tick latency.
+
+    Bots run in their own processes so the server's event loop, and the
+    latency it reports, is the server's alone.
+    """
+    arena = make_arena(args)
+    server = await ArenaServer(arena, args.host, 0).start()
+    processes = []
+    first = 0
+    for n in range(args.bot_processes):
+        count = args.bots // args.bot_processes + (n < args.bots % args.bot_processes)
+        if count:
+            processes.append(await asyncio.create_subprocess_exec(
+                sys.executable, __file__, "bots", str(count), "--host", args.host,
+                "--port", str(server.port), "--first", str(first)))
+        first += count
+    while len(server.clients) < args.bots:
+        await asyncio.sleep(0.01)
+    server.tick_ms.clear()
+    await server.run(args.ticks)
+    await server.close()
+    for process in processes:
+        await process.wait()
+    players = sorted(arena.players.values(), key=lambda p: -p.best)
+    print(f"{args.bots} bots, {args.ticks} ticks at {arena.tick_rate}/s on {arena.board.width}x{arena.board.height}")
+    print(server.latency_report())
+    print("best " + ", ".join(f"{p.name} {p.best}" for p in players[:5]) +
+          f"; deaths {sum(p.deaths for p in players)}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local multiplayer Snake server and bot clients")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add_arena_arguments(commands.add_parser("server", help="run a server"))
+    bot_parser = commands.add_parser("bots", help="connect scripted bots to a server")
+    bot_parser.add_argument("count", type=int)
+    bot_parser.add_argument("--host", default='127.0.0.1')
+    bot_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    bot_parser.add_argument("--ticks", type=int, help="disconnect after this many ticks")
+    bot_parser.add_argument("--first", type=int, default=0, help="number of the first bot's name")
+    demo_parser = commands.add_parser("demo", help="run a server and bots over localhost")
+    add_arena_arguments(demo_parser)
+    demo_parser.add_argument("--bots", type=int, default=100)
+    demo_parser.add_argument("--ticks", type=int, default=600)
+    demo_parser.add_argument("--bot-processes", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    command = {"server": serve, "bots": bots, "demo": demo}[args.command]
+    try:
+        asyncio.run(command(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
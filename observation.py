@@ -0,0 +1,264 @@
+# Observation Encoder
+# Turns a SnakeEngine's state into fixed-shape arrays for learning agents:
+# a multi-channel uint8 grid, an egocentric crop around the head and
+# ray-cast distance features. Requires numpy (pip install numpy).
+#
+#   encoder = ObservationEncoder(game, grid=batch[i])   # write into a batch slot
+#   game.step(action); encoder.update()
+
+import numpy as np
+
+import engine
+
+# Grid channels; fruit channels are split by effect, so a new fruit type
+# with an existing effect needs no new channel
+EFFECTS = sorted({props['effect'] for props in engine.FRUIT_TYPES.values() if props['effect']})
+CHANNELS = ["body", "head", "obstacle", "fruit"] + [f"fruit_{effect}" for effect in EFFECTS]
+CH_BODY, CH_HEAD, CH_OBSTACLE, CH_FRUIT = 0, 1, 2, 3
+FRUIT_CHANNELS = {name: [CH_FRUIT] + ([CHANNELS.index(f"fruit_{props['effect']}")] if props['effect'] else [])
+                  for name, props in engine.FRUIT_TYPES.items()}
+NUM_CHANNELS = len(CHANNELS)
+
+# Rays relative to the heading, clockwise from straight ahead
+NUM_RAYS = 8
+# features: 1/distance to danger per ray, 1/distance to fruit per ray (0 when
+# none is seen), heading one-hot, speed relative to the base speed, length
+# as a share of the board
+NUM_FEATURES = 2 * NUM_RAYS + len(engine.DIRECTIONS) + 2
+RAY_DANGER, RAY_FRUIT = 1, 2
+DANGER_BYTES = bytes(v & RAY_DANGER for v in range(256))   # translate() tables picking one bit
+FRUIT_BYTES = bytes(v & RAY_FRUIT for v in range(256))
+HEADING_ROTATIONS = {engine.UP: 0, engine.RIGHT: 1, engine.DOWN: 2, engine.LEFT: 3}   # Quarter turns clockwise
+
+
+def _buffer(out, shape, dtype):
+    if out is None:
+        return np.zeros(shape, dtype=dtype)
+    if out.shape != shape or out.dtype != dtype or not out.flags.c_contiguous:
+        raise ValueError(f"buffer must be a C-contiguous {np.dtype(dtype).name} array of shape {shape}")
+    return out
+
+def _segments(start, length, size, wrap):
+    """Splits cells start..start+length-1 of an axis into (src, src_end, dst) runs on the board."""
+    if not wrap:
+        lo, hi = max(start, 0), min(start + length, size)
+        return [(lo, hi, lo - start)] if lo < hi else []
+    runs = []
+    dst = 0
+    while dst < length:
+        src = (start + dst) % size
+        n = min(size - src, length - dst)
+        runs.append((src, src + n, dst))
+        dst += n
+    return runs
+
+
+class ObservationEncoder:
+    """Keeps observation arrays for one engine up to date, one tick at a time.
+
+    grid is (NUM_CHANNELS, height, width), crop is (NUM_CHANNELS, crop_size,
+    crop_size) centred on the head and turned so the snake heads up, with
+    off-board cells marked as obstacles unless the board wraps, and
+    features is float32 (NUM_FEATURES,). Pass preallocated arrays, such as
+    slots of a training batch, and they are written in place; otherwise
+    the encoder allocates its own.
+
+    update() compares the engine with what it saw last: one tick later
+    only the head, neck, tail and fruit cells are rewritten; any other
+    change (a reset, a skipped tick, a new board) rebuilds the grid.
+    """
+    def __init__(self, game, crop_size=11, grid=None, crop=None, features=None):
+        if crop_size % 2 == 0:
+            raise ValueError("crop_size must be odd")
+        self.game = game
+        self.crop_size = crop_size
+        board = game.board
+        self.grid = _buffer(grid, (NUM_CHANNELS, board.height, board.width), np.uint8)
+        self.crop = _buffer(crop, (NUM_CHANNELS, crop_size, crop_size), np.uint8)
+        self.features = _buffer(features, (NUM_FEATURES,), np.float32)
+        self._flat = self.grid.reshape(NUM_CHANNELS, -1)   # View with one row per channel
+        # Flat byte grid for the rays (RAY_DANGER | RAY_FRUIT bits), sliced as bytes
+        # and viewed as an array for bulk writes
+        self._cells = bytearray(board.height * board.width)
+        self._cells_view = np.frombuffer(self._cells, dtype=np.uint8)
+        # Column and row offsets repeated so a diagonal ray round a wrapping board is two slices
+        self._ray_length = max(board.width, board.height)
+        self._wrap_x = np.tile(np.arange(board.width), self._ray_length // board.width + 3)
+        self._wrap_y = np.tile(np.arange(board.height) * board.width, self._ray_length // board.height + 3)
+        self._crop_views = {d: np.rot90(self.crop, -turns, axes=(1, 2)) for d, turns in HEADING_ROTATIONS.items()}
+        self._ticks = None
+        self.rebuilds = 0
+        self.update()
+
+    # --- Grid ---
+    def update(self):
+        game = self.game
+        if self._ticks is not None and (game.ticks, game.seed) == (self._ticks, self._seed):
+            return
+        if self._ticks is not None and game.ticks == self._ticks + 1 and game.seed == self._seed:
+            self._advance()
+        else:
+            self.rebuild()
+        self._ticks = game.ticks
+        self._seed = game.seed
+        self._encode_crop()
+        self._encode_features()
+
+    def rebuild(self):
+        """Rewrites the grid from the engine's board in one pass."""
+        game = self.game
+        board = game.board
+        shape = (board.height, board.width)
+        if self.grid.shape[1:] != shape:
+            raise ValueError("the board was resized; make a new encoder for the new size")
+        grid = self.grid
+        grid.fill(0)
+        np.minimum(np.frombuffer(board.body, dtype=np.uint8).reshape(shape), 1, out=grid[CH_BODY])
+        np.minimum(np.frombuffer(board.blocked, dtype=np.uint8).reshape(shape), 1, out=grid[CH_OBSTACLE])
+        np.bitwise_or(grid[CH_BODY], grid[CH_OBSTACLE], out=self._cells_view.reshape(shape))   # RAY_DANGER
+        self._fruits = []
+        self._set_fruits()
+        self._head = self._tail = None
+        self._length = len(game.snake.positions)
+        head = game.snake.get_head_position()
+        if board.in_bounds(head):
+            self._head = board.index(head)
+            self._flat[CH_HEAD, self._head] = 1
+        tail = game.snake.positions[-1]
+        self._tail = board.index(tail) if board.in_bounds(tail) else None
+        self.rebuilds += 1
+
+    def _advance(self):
+        """Applies one move: the old head becomes body, the new head is set and the tail may drop."""
+        game = self.game
+        board = game.board
+        snake = game.snake
+        head = snake.get_head_position()
+        if self._head is not None:
+            self._flat[CH_HEAD, self._head] = 0
+        if len(snake.positions) == self._length and self._tail is not None:
+            self._refresh_body(self._tail)   # The tail dropped, unless another segment is still there
+        self._head = None
+        if board.in_bounds(head):
+            self._head = board.index(head)
+            self._flat[CH_HEAD, self._head] = 1
+            self._refresh_body(self._head)
+        self._length = len(snake.positions)
+        tail = snake.positions[-1]
+        self._tail = board.index(tail) if board.in_bounds(tail) else None
+        if self._fruits != [(board.index(f.pos), f.type) for f in game.fruits]:
+            self._set_fruits()
+
+    def _refresh_body(self, i):
+        board = self.game.board
+        body = 1 if board.body[i] else 0
+        self._flat[CH_BODY, i] = body
+        self._cells[i] = (self._cells[i] & RAY_FRUIT) | body | (1 if board.blocked[i] else 0)
+
+    def _set_fruits(self):
+        flat = self._flat
+        for i, fruit_type in self._fruits:
+            for ch in FRUIT_CHANNELS[fruit_type]:
+                flat[ch, i] = 0
+            self._cells[i] &= ~RAY_FRUIT & 0xff
+        board = self.game.board
+        self._fruits = [(board.index(f.pos), f.type) for f in self.game.fruits]
+        for i, fruit_type in self._fruits:
+            for ch in FRUIT_CHANNELS[fruit_type]:
+                flat[ch, i] = 1
+            self._cells[i] |= RAY_FRUIT
+
+    # --- Crop ---
+    def _encode_crop(self):
+        game = self.game
+        board = game.board
+        wrap = game.game_mode == "Wall-less"
+        size = self.crop_size
+        r = size // 2
+        hx, hy = game.snake.get_head_position()
+        # Writing the board-aligned crop through a rotated view turns it without a temporary
+        view = self._crop_views[game.snake.direction]
+        if not wrap:
+            self.crop.fill(0)
+            self.crop[CH_OBSTACLE].fill(1)   # Walls, overwritten by whatever is on the board
+        for y0, y1, dy in _segments(hy - r, size, board.height, wrap):
+            for x0, x1, dx in _segments(hx - r, size, board.width, wrap):
+                view[:, dy:dy + y1 - y0, dx:dx + x1 - x0] = self.grid[:, y0:y1, x0:x1]
+
+    # --- Rays ---
+    def _encode_features(self):
+        game = self.game
+        board = game.board
+        snake = game.snake
+        fx, fy = snake.direction
+        wrap = game.game_mode == "Wall-less"
+        head = snake.get_head_position()
+        on_board = board.in_bounds(head)
+        # The heading turned by each eighth-turn clockwise
+        rays = [(fx, fy), (fx - fy, fy + fx), (-fy, fx), (-fx - fy, fx - fy),
+                (-fx, -fy), (fy - fx, -fx - fy), (fy, -fx), (fx + fy, fy - fx)]
+        dangers, fruits = [], []
+        for dx, dy in rays:
+            danger, fruit = self._cast(head, dx, dy, wrap) if on_board else (1, 0)
+            dangers.append(1 / danger if danger else 0.0)
+            fruits.append(1 / fruit if fruit else 0.0)
+        heading = [0.0] * len(engine.DIRECTIONS)
+        heading[engine.DIRECTIONS.index(snake.direction)] = 1.0
+        self.features[:] = dangers + fruits + heading + [
+            game.current_speed / game.base_speed, snake.length / (board.width * board.height)]
+
+    def _cast(self, head, dx, dy, wrap):
+        """Steps to the first danger and first fruit along (dx, dy); returns their distances, 0 if unseen.
+
+        Each ray is read as a bytes slice of the flat grids, so finding the
+        first occupied cell is a C-level strip rather than a Python loop.
+        """
+        board = self.game.board
+        width, height = board.width, board.height
+        hx, hy = head
+        if not wrap:
+            # Cells up to the wall are a strided slice of the flat grids
+            n = min((width - 1 - hx) if dx > 0 else hx if dx < 0 else width + height,
+                    (height - 1 - hy) if dy > 0 else hy if dy < 0 else width + height)
+            if n == 0:
+                return 1, 0
+            stride = dy * width + dx
+            start = hy * width + hx + stride
+            stop = start + stride * n
+            stop = None if stop < 0 else stop
+            line = self._cells[start:stop:stride]
+        elif dy == 0:
+            line = _loop(self._cells[hy * width:(hy + 1) * width], hx, dx)
+        elif dx == 0:
+            line = _loop(self._cells[hx::width], hy, dy)
+        else:
+            length = self._ray_length
+            cells = _run(self._wrap_x, hx, dx, width, length) + _run(self._wrap_y, hy, dy, height, length)
+            line = self._cells_view[cells].tobytes()
+        danger_line = line.translate(DANGER_BYTES)
+        fruit_line = line.translate(FRUIT_BYTES)
+        i = _first(danger_line)
+        hit = i < len(danger_line)
+        danger = i + 1 if hit else (0 if wrap else n + 1)   # Past the last cell is the wall
+        j = _first(fruit_line)
+        fruit = j + 1 if j < len(fruit_line) and (not hit or j < i) else 0
+        return danger, fruit
+
+
+def _first(line):
+    """Index of the first non-zero byte, or len(line) if there is none."""
+    return len(line) - len(line.lstrip(b'\0'))
+
+def _run(tiled, pos, step, size, length):
+    """length coordinates from pos going step along an axis that wraps, as a view of tiled."""
+    if step > 0:
+        return tiled[pos + 1:pos + 1 + length]
+    start = pos - 1 + size * (length // size + 2)
+    return tiled[start:start - length:-1]
+
+def _loop(line, pos, step):
+    """The cells met going once round a wrapping row or column from pos, ending back on it."""
+    if step < 0:
+        line = line[::-1]
+        pos = len(line) - 1 - pos
+    return line[pos + 1:] + line[:pos + 1]
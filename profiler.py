@@ -0,0 +1,188 @@
+# Frame Profiler
+# Times each phase of a frame, keeps rolling frame-time percentiles for an
+# on-screen overlay, tracks key-press-to-move latency and exports traces
+# for chrome://tracing or as CSV.
+
+import csv
+import json
+import sys
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+_NO_PHASE = nullcontext()
+
+
+class FrameProfiler:
+    """Per-frame phase timer with rolling statistics.
+
+    Call begin_frame(), wrap each phase in `with profiler.phase(name):`
+    and call end_frame() with the frame's counters. Nothing is timed
+    unless the overlay is enabled or recording is on; recorded frames
+    are kept (up to max_frames) for export_chrome_trace() and export_csv().
+    input_latency() reports how long a key press took to move the snake;
+    each frame keeps the latencies of the moves it applied.
+    """
+    def __init__(self, window=240, max_frames=36000):
+        self.enabled = False     # Overlay shown
+        self.recording = False   # Keep every frame for export
+        self.frame_ms = deque(maxlen=window)
+        self.input_ms = deque(maxlen=window)
+        self.frames = deque(maxlen=max_frames)
+        self.last = None
+        self._ticks = deque(maxlen=window)   # (time, cumulative ticks)
+        self._frame_start = None
+        self._phases = []
+        self._inputs = []
+        self._blocks = sys.getallocatedblocks()
+
+    @property
+    def active(self):
+        return self.enabled or self.recording
+
+    def begin_frame(self):
+        if self.active:
+            self._frame_start = time.perf_counter()
+            self._phases = []
+            self._inputs = []
+
+    def phase(self, name):
+        if self._frame_start is None:
+            return _NO_PHASE
+        return self._time_phase(name)
+
+    @contextmanager
+    def _time_phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._phases.append((name, start, time.perf_counter() - start))
+
+    def input_latency(self, ms):
+        """Records the milliseconds from a key press to the move that applied it."""
+        self.input_ms.append(ms)
+        if self._frame_start is not None:
+            self._inputs.append(ms)
+
+    def end_frame(self, ticks=0, snake_length=0, particles=0):
+        """Closes the frame; ticks is a running count of simulation steps."""
+        if self._frame_start is None:
+            return
+        end = time.perf_counter()
+        blocks = sys.getallocatedblocks()
+        self._ticks.append((end, ticks))
+        record = {
+            "start": self._frame_start,
+            "ms": (end - self._frame_start) * 1000,
+            "phases": self._phases,
+            "input_ms": self._inputs,
+            "ticks_per_second": self.ticks_per_second(),
+            "snake_length": snake_length,
+            "particles": particles,
+            "allocated_blocks": blocks - self._blocks,
+        }
+        self._blocks = blocks
+        self.frame_ms.append(record["ms"])
+        if self.recording:
+            self.frames.append(record)
+        self.last = record
+        self._frame_start = None
+
+    # --- Statistics ---
+    def percentile(self, p, samples=None):
+        samples = self.frame_ms if samples is None else samples
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    def ticks_per_second(self):
+        if len(self._ticks) < 2:
+            return 0.0
+        (t0, n0), (t1, n1) = self._ticks[0], self._ticks[-1]
+        return (n1 - n0) / (t1 - t0) if t1 > t0 else 0.0
+
+    def summary_lines(self):
+        """Text lines for the overlay."""
+        lines = [
+            f"frame p50 {self.percentile(50):5.2f} ms  p99 {self.percentile(99):5.2f} ms",
+            f"ticks/s {self.ticks_per_second():5.1f}",
+        ]
+        if self.input_ms:
+            lines.append(f"input p50 {self.percentile(50, self.input_ms):5.0f} ms  "
+                         f"p99 {self.percentile(99, self.input_ms):5.0f} ms")
+        if self.last:
+            lines.append(f"length {self.last['snake_length']}  particles {self.last['particles']}  "
+                         f"blocks {self.last['allocated_blocks']:+d}")
+            for name, _, duration in self.last["phases"]:
+                lines.append(f"{name:<20}{duration * 1000:6.2f} ms")
+        return lines
+
+    # --- Export ---
+    def export_chrome_trace(self, path):
+        """Writes recorded frames in the Chrome trace event format."""
+        events = []
+        for record in self.frames:
+            us = record["start"] * 1e6
+            events.append({"name": "frame", "ph": "X", "pid": 1, "tid": 1,
+                           "ts": us, "dur": record["ms"] * 1000})
+            for name, start, duration in record["phases"]:
+                events.append({"name": name, "ph": "X", "pid": 1, "tid": 1,
+                               "ts": start * 1e6, "dur": duration * 1e6})
+            for ms in record["input_ms"]:
+                events.append({"name": "input_latency", "ph": "i", "s": "t", "pid": 1, "tid": 1,
+                               "ts": us, "args": {"ms": ms}})
+            events.append({"name": "game", "ph": "C", "pid": 1, "ts": us, "args": {
+                "ticks_per_second": record["ticks_per_second"],
+                "snake_length": record["snake_length"],
+                "particles": record["particles"],
+                "allocated_blocks": record["allocated_blocks"],
+            }})
+        with open(path, 'w') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms",
+                       "otherData": {"input_latency": self.input_summary()}}, f)
+
+    def export_csv(self, path):
+        """Writes one row per recorded frame with a column per phase."""
+        names = []
+        for record in self.frames:
+            for name, _, _ in record["phases"]:
+                if name not in names:
+                    names.append(name)
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", "frame_ms"] + [f"{n}_ms" for n in names] +
+                            ["ticks_per_second", "snake_length", "particles", "allocated_blocks",
+                             "input_latency_ms"])
+            for i, record in enumerate(self.frames):
+                phases = {}
+                for name, _, duration in record["phases"]:
+                    phases[name] = phases.get(name, 0.0) + duration * 1000
+                writer.writerow([i, round(record["ms"], 4)] +
+                                [round(phases.get(n, 0.0), 4) for n in names] +
+                                [round(record["ticks_per_second"], 2), record["snake_length"],
+                                 record["particles"], record["allocated_blocks"],
+                                 " ".join(str(ms) for ms in record["input_ms"])])
+
+    def input_summary(self):
+        """p50 and p99 input latency over every recorded frame, or None without moves."""
+        inputs = [ms for record in self.frames for ms in record["input_ms"]]
+        if not inputs:
+            return None
+        return {"moves": len(inputs), "p50_ms": self.percentile(50, inputs), "p99_ms": self.percentile(99, inputs)}
+
+    def export(self, path):
+        """Exports as CSV if path ends in .csv, otherwise as a Chrome trace.
+
+        Both keep every input latency; their percentiles are printed and
+        also stored in the trace.
+        """
+        summary = self.input_summary()
+        if summary:
+            print(f"Input latency over {summary['moves']} moves: p50 {summary['p50_ms']} ms, "
+                  f"p99 {summary['p99_ms']} ms")
+        if path.lower().endswith('.csv'):
+            self.export_csv(path)
+        else:
+            self.export_chrome_trace(path)
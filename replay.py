@@ -0,0 +1,165 @@
+# Replay Recording and Playback
+# Records a game as its seed, mode, difficulty and one 2-bit direction per
+# tick, and re-simulates replays headlessly with the engine.
+#
+# File layout (little-endian):
+#   magic b"SNKR", version u8, seed u64, mode u8, difficulty u8,
+#   width u16, height u16, ticks u32, score u32, layout version u8, then
+#   the packed directions, four ticks per byte starting at the low bits.
+# Version 1 files have no layout version; their obstacles came from the
+# generator before layouts were validated, counted as layout version 0.
+
+import struct
+
+import engine
+
+MAGIC = b"SNKR"
+VERSION = 2
+HEADER = struct.Struct("<4sBQBBHHIIB")
+HEADER_V1 = struct.Struct("<4sBQBBHHII")
+
+
+class Replay:
+    """A recorded game: its starting conditions and the direction moved each tick."""
+    def __init__(self, seed, game_mode, difficulty, width=engine.GRID_WIDTH, height=engine.GRID_HEIGHT,
+                 ticks=0, score=0, inputs=None, layout_version=engine.LAYOUT_VERSION):
+        self.seed = seed
+        self.game_mode = game_mode
+        self.difficulty = difficulty
+        self.width = width
+        self.height = height
+        self.ticks = ticks
+        self.score = score
+        self.inputs = inputs if inputs is not None else bytearray()
+        self.layout_version = layout_version
+
+    def direction(self, tick):
+        code = (self.inputs[tick >> 2] >> ((tick & 3) * 2)) & 3
+        return engine.DIRECTIONS[code]
+
+    def to_bytes(self):
+        header = HEADER.pack(MAGIC, VERSION, self.seed, engine.GAME_MODES.index(self.game_mode),
+                             engine.DIFFICULTIES.index(self.difficulty), self.width, self.height,
+                             self.ticks, self.score, self.layout_version)
+        return header + bytes(self.inputs[:(self.ticks + 3) // 4])
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Parses a replay file; raises ValueError if it isn't one or can't be re-simulated here."""
+        if data[:4] != MAGIC or len(data) < HEADER_V1.size or data[4] not in (1, VERSION):
+            raise ValueError("Not a Snake replay file")
+        if data[4] == 1:
+            header = HEADER_V1
+            _, _, seed, mode, difficulty, width, height, ticks, score = header.unpack_from(data)
+            layout_version = 0
+        else:
+            header = HEADER
+            _, _, seed, mode, difficulty, width, height, ticks, score, layout_version = header.unpack_from(data)
+        game_mode = engine.GAME_MODES[mode]
+        if game_mode == "Obstacle" and layout_version != engine.LAYOUT_VERSION:
+            raise ValueError(f"Replay was recorded with obstacle layout version {layout_version}, but this "
+                             f"game generates version {engine.LAYOUT_VERSION}, so its obstacles would differ")
+        inputs = bytearray(data[header.size:header.size + (ticks + 3) // 4])
+        return cls(seed, game_mode, engine.DIFFICULTIES[difficulty],
+                   width, height, ticks, score, inputs, layout_version)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+class ReplayRecorder:
+    """Records every game played by an engine.
+
+    Attach with attach(game); the engine then calls start() on each reset
+    and record() on each tick, and replay holds the current game.
+    """
+    def __init__(self):
+        self.replay = None
+
+    def attach(self, game):
+        game.recorder = self
+        self.start(game)
+        return self
+
+    def start(self, game):
+        self.replay = Replay(game.seed, game.game_mode, game.difficulty,
+                             game.board.width, game.board.height)
+        self.game = game
+
+    def record(self, direction):
+        replay = self.replay
+        if replay is None:
+            return
+        code = engine.DIRECTIONS.index(direction)
+        if replay.ticks & 3 == 0:
+            replay.inputs.append(code)
+        else:
+            replay.inputs[-1] |= code << ((replay.ticks & 3) * 2)
+        replay.ticks += 1
+        replay.score = self.game.score
+
+    def rewind(self, game):
+        """Drops the ticks after game.ticks, for an engine restored to an earlier snapshot.
+
+        A snapshot from another game, or from ahead of the recording, can't
+        be described by this replay, so the replay is dropped.
+        """
+        replay = self.replay
+        if replay is None or (game.seed, game.game_mode, game.difficulty, game.board.width,
+                              game.board.height) != (replay.seed, replay.game_mode, replay.difficulty,
+                                                     replay.width, replay.height) or game.ticks > replay.ticks:
+            self.replay = None
+            return
+        replay.ticks = game.ticks
+        del replay.inputs[(game.ticks + 3) // 4:]
+        if game.ticks & 3:
+            replay.inputs[-1] &= (1 << (game.ticks & 3) * 2) - 1   # Clear the undone ticks' bits
+        replay.score = game.score
+
+
+def play(replay, game=None):
+    """Re-simulates a replay headlessly and returns the finished engine."""
+    if game is None:
+        game = engine.SnakeEngine(replay.game_mode, replay.difficulty, replay.seed,
+                                  width=replay.width, height=replay.height)
+    else:
+        game.reset(replay.game_mode, replay.difficulty, replay.seed, replay.width, replay.height)
+    for tick in range(replay.ticks):
+        game.step(replay.direction(tick))
+    return game
+
+
+def verify(replay):
+    """Returns True if re-simulating the replay reaches its recorded score."""
+    game = play(replay)
+    return game.score == replay.score and game.ticks == replay.ticks
+
+
+class ReplayPilot:
+    """Steers an engine through a replay's recorded moves, like an autopilot.
+
+    Attach with attach(game) after the game has been reset to the replay's
+    seed, mode and difficulty; game.step() and game.update() then follow
+    the recording until it runs out.
+    """
+    def __init__(self, replay):
+        self.replay = replay
+
+    def attach(self, game):
+        game.autopilot = self
+        return self
+
+    def detach(self, game):
+        if game.autopilot is self:
+            game.autopilot = None
+
+    def choose(self, game):
+        if game.ticks < self.replay.ticks:
+            return self.replay.direction(game.ticks)
+        return None
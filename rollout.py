@@ -0,0 +1,226 @@
+# Multi-process Rollout Runner
+# Shards headless SnakeEngine games across CPU cores. Workers write board
+# observations and per-game stats into shared memory, so the parent reads
+# them as NumPy views without pickling. Requires numpy (pip install numpy).
+
+import multiprocessing as mp
+import os
+import random
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import engine
+
+# Observation cell codes
+CELL_EMPTY, CELL_BODY, CELL_HEAD, CELL_OBSTACLE, CELL_FRUIT = 0, 1, 2, 3, 4
+FRUIT_CODES = {name: CELL_FRUIT + i for i, name in enumerate(engine.FRUIT_TYPES)}
+
+# Columns of the shared stats array
+STAT_SCORE, STAT_LENGTH, STAT_TICKS, STAT_EPISODE = 0, 1, 2, 3
+NUM_STATS = 4
+
+RESTART_ATTEMPTS = 3   # Fresh workers tried for a slot before giving up on it
+
+DEFAULT_CONFIGS = [(mode, difficulty) for mode in engine.GAME_MODES for difficulty in engine.DIFFICULTIES]
+
+
+def write_observation(game, out):
+    """Writes one game's board into an (height, width) uint8 array."""
+    board = game.board
+    out[:] = CELL_EMPTY
+    shape = (board.height, board.width)
+    out[np.frombuffer(board.blocked, dtype=np.uint8).reshape(shape) > 0] = CELL_OBSTACLE
+    out[np.frombuffer(board.body, dtype=np.uint8).reshape(shape) > 0] = CELL_BODY
+    for fruit in game.fruits:
+        out[fruit.pos[1], fruit.pos[0]] = FRUIT_CODES[fruit.type]
+    head = game.snake.get_head_position()
+    if board.in_bounds(head):
+        out[head[1], head[0]] = CELL_HEAD
+
+
+def _worker(slot, conn, envs, configs, seed, obs_shm, act_shm, stats_shm, obs_shape):
+    """Runs envs games for one worker slot until told to close."""
+    random.seed(seed)
+    first = slot * envs
+    obs = np.ndarray(obs_shape, dtype=np.uint8, buffer=obs_shm.buf)[first:first + envs]
+    actions = np.ndarray((obs_shape[0],), dtype=np.int8, buffer=act_shm.buf)[first:first + envs]
+    stats = np.ndarray((obs_shape[0], NUM_STATS), dtype=np.int64, buffer=stats_shm.buf)[first:first + envs]
+    games = [engine.SnakeEngine(*configs[0]) for _ in range(envs)]
+    episodes = [0] * envs
+
+    def start(i):
+        # Walk the config list so every worker covers the whole mix
+        mode, difficulty = configs[(first + i + episodes[i] * obs_shape[0]) % len(configs)]
+        games[i].reset(mode, difficulty)
+        stats[i] = (0, games[i].snake.length, 0, episodes[i])
+        write_observation(games[i], obs[i])
+
+    try:
+        while True:
+            cmd = conn.recv()
+            if cmd == "close":
+                break
+            finished = []
+            for i, game in enumerate(games):
+                if cmd == "reset":
+                    start(i)
+                    continue
+                action = int(actions[i])
+                game.step(engine.DIRECTIONS[action] if action >= 0 else None)
+                if game.game_over_flag:
+                    finished.append({
+                        "env": first + i, "mode": game.game_mode, "difficulty": game.difficulty,
+                        "score": game.score, "length": game.snake.length, "ticks": game.ticks,
+                        "cause": game.death_cause,
+                    })
+                    episodes[i] += 1
+                    start(i)
+                else:
+                    stats[i] = (game.score, game.snake.length, game.ticks, episodes[i])
+                    write_observation(game, obs[i])
+            conn.send(finished)
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        conn.close()
+
+
+class RolloutPool:
+    """A pool of worker processes stepping headless games in lockstep.
+
+    observations is a shared (num_envs, height, width) uint8 array of cell
+    codes and stats a shared (num_envs, NUM_STATS) int64 array; both are
+    updated in place by step(). Games that end are reset automatically
+    with the next (mode, difficulty) from configs, and step() returns the
+    finished games as small dicts.
+    """
+    def __init__(self, num_workers=None, envs_per_worker=8, configs=None, seed=0, timeout=10.0):
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.envs_per_worker = envs_per_worker
+        self.num_envs = self.num_workers * envs_per_worker
+        self.configs = list(configs or DEFAULT_CONFIGS)
+        self.timeout = timeout
+        self.restarts = 0
+        self._seeds = np.random.SeedSequence(seed).spawn(self.num_workers)
+        self._ctx = mp.get_context()
+
+        self.obs_shape = (self.num_envs, engine.GRID_HEIGHT, engine.GRID_WIDTH)
+        self._obs_shm = shared_memory.SharedMemory(create=True, size=int(np.prod(self.obs_shape)))
+        self._act_shm = shared_memory.SharedMemory(create=True, size=self.num_envs)
+        self._stats_shm = shared_memory.SharedMemory(create=True, size=self.num_envs * NUM_STATS * 8)
+        self.observations = np.ndarray(self.obs_shape, dtype=np.uint8, buffer=self._obs_shm.buf)
+        self.actions = np.ndarray((self.num_envs,), dtype=np.int8, buffer=self._act_shm.buf)
+        self.stats = np.ndarray((self.num_envs, NUM_STATS), dtype=np.int64, buffer=self._stats_shm.buf)
+        self.actions[:] = -1
+
+        self._procs = [None] * self.num_workers
+        self._conns = [None] * self.num_workers
+        for slot in range(self.num_workers):
+            self._start_worker(slot)
+        self.reset()
+
+    def _start_worker(self, slot, generation=0):
+        seed = int(self._seeds[slot].generate_state(1)[0]) + generation
+        parent_conn, child_conn = self._ctx.Pipe()
+        proc = self._ctx.Process(
+            target=_worker, daemon=True,
+            args=(slot, child_conn, self.envs_per_worker, self.configs, seed,
+                  self._obs_shm, self._act_shm, self._stats_shm, self.obs_shape))
+        proc.start()
+        child_conn.close()
+        self._procs[slot] = proc
+        self._conns[slot] = parent_conn
+
+    def _stop_worker(self, slot):
+        proc = self._procs[slot]
+        if proc.is_alive():
+            proc.terminate()
+        proc.join(1.0)
+        self._conns[slot].close()
+
+    def _restart_worker(self, slot):
+        """Replaces a dead or hung worker with a fresh one on the same slot.
+
+        The replacement has timeout seconds to answer a reset; if it dies
+        or hangs too, another is tried, up to RESTART_ATTEMPTS in all.
+        """
+        for _ in range(RESTART_ATTEMPTS):
+            self._stop_worker(slot)
+            self.restarts += 1
+            self._start_worker(slot, generation=self.restarts)
+            conn = self._conns[slot]
+            try:
+                conn.send("reset")
+                if conn.poll(self.timeout):
+                    conn.recv()
+                    return
+            except (EOFError, OSError):
+                pass
+        raise RuntimeError(f"rollout worker {slot} failed to start {RESTART_ATTEMPTS} times in a row")
+
+    def _broadcast(self, cmd):
+        waiting = []
+        for slot, conn in enumerate(self._conns):
+            try:
+                conn.send(cmd)
+                waiting.append(slot)
+            except (BrokenPipeError, OSError):
+                self._restart_worker(slot)
+        finished = []
+        for slot in waiting:
+            conn = self._conns[slot]
+            try:
+                if not conn.poll(self.timeout):
+                    raise TimeoutError
+                finished.extend(conn.recv())
+            except (EOFError, OSError, TimeoutError):
+                self._restart_worker(slot)
+        return finished
+
+    def reset(self):
+        """Starts a new game in every env."""
+        self._broadcast("reset")
+
+    def step(self, actions=None):
+        """Applies direction indices (-1 keeps going) and steps every env once."""
+        if actions is not None:
+            self.actions[:] = actions
+        return self._broadcast("step")
+
+    def run(self, num_games, policy=None, seed=0):
+        """Plays until num_games have finished and returns their results.
+
+        policy maps the observations array to an action array; the default
+        picks random directions.
+        """
+        rng = np.random.default_rng(seed)
+        results = []
+        while len(results) < num_games:
+            if policy is None:
+                actions = rng.integers(-1, len(engine.DIRECTIONS), size=self.num_envs)
+            else:
+                actions = policy(self.observations)
+            results.extend(self.step(actions))
+        return results[:num_games]
+
+    def close(self):
+        for conn in self._conns:
+            try:
+                conn.send("close")
+            except (BrokenPipeError, OSError):
+                pass
+        for proc in self._procs:
+            proc.join(1.0)
+            if proc.is_alive():
+                proc.terminate()
+        del self.observations, self.actions, self.stats
+        for shm in (self._obs_shm, self._act_shm, self._stats_shm):
+            shm.close()
+            shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
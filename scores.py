@@ -0,0 +1,168 @@
+# Leaderboard Score Store
+# Keeps high scores indexed per (mode, difficulty) in memory and persists
+# them to an append-only JSON-lines log on a background thread, compacting
+# the log with an atomic rename so a crash can never corrupt it.
+
+import atexit
+import json
+import os
+import queue
+import threading
+from bisect import insort
+
+
+def default_path():
+    """Per-user data location: %APPDATA%/SnakeGame on Windows, ~/.local/share/SnakeGame elsewhere."""
+    base = os.environ.get('APPDATA') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+    return os.path.join(base, 'SnakeGame', 'high_scores.jsonl')
+
+
+class ScoreStore:
+    """Indexed, durable store of score entries.
+
+    Entries are dicts with name, score, date, mode and difficulty. Each
+    (mode, difficulty) board, plus the overall board under None, is a list
+    kept sorted best first as entries arrive, so top-K queries are a slice.
+    Each board keeps at most max_per_board entries.
+
+    add() updates the index immediately and queues the entry for the
+    writer thread, which appends it to the log; every compact_every
+    appends the log is rewritten to just the retained entries that are
+    already in it, so entries still queued are appended once, after it.
+    """
+    def __init__(self, path=None, max_per_board=1000, compact_every=500, legacy_path='high_scores.json'):
+        self.path = path or default_path()
+        self.max_per_board = max_per_board
+        self.compact_every = compact_every
+        self.lock = threading.Lock()
+        self.boards = {}   # None or (mode, difficulty) -> [(sort_key, entry)] best first
+        self._seq = 0
+        self._written = 0   # Highest sequence number in the log
+        self._appends = 0
+        self._queue = queue.Queue()
+        self._closed = False
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.path):
+            self._load()
+        elif legacy_path and os.path.exists(legacy_path):
+            self._import_legacy(legacy_path)
+
+        self._writer = threading.Thread(target=self._write_loop, name="ScoreStoreWriter", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    # --- Index ---
+    def _index(self, entry):
+        self._seq += 1
+        item = ((-entry['score'], self._seq), entry)
+        for key in (None, (entry['mode'], entry['difficulty'])):
+            board = self.boards.setdefault(key, [])
+            insort(board, item, key=lambda x: x[0])
+            if len(board) > self.max_per_board:
+                board.pop()
+
+    def _retained(self, upto=None):
+        """Entries still on some board, oldest first; only those numbered up to upto if given."""
+        items = {}
+        for key, board in self.boards.items():
+            if key is not None:
+                for item in board:
+                    seq = item[0][1]
+                    if upto is None or seq <= upto:
+                        items[seq] = item[1]
+        return [items[seq] for seq in sorted(items)]
+
+    def top(self, k=10, mode=None, difficulty=None):
+        """Returns the best k entries overall, or for one (mode, difficulty) board."""
+        key = None if mode is None else (mode, difficulty)
+        with self.lock:
+            return [entry for _, entry in self.boards.get(key, [])[:k]]
+
+    def add(self, entry):
+        """Records an entry; the file write happens on the writer thread."""
+        with self.lock:
+            self._index(entry)
+            self._queue.put((self._seq, entry))   # Under the lock, so the log stays in sequence order
+
+    # --- Persistence ---
+    def _load(self):
+        lines = 0
+        damaged = False
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                lines += 1
+                try:
+                    self._index(json.loads(line))
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    damaged = True   # A write cut short by a crash
+        self._written = self._seq
+        self._appends = lines - len(self._retained())
+        if damaged:
+            self._compact()
+
+    def _import_legacy(self, legacy_path):
+        try:
+            with open(legacy_path, 'r') as f:
+                entries = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        for entry in entries:
+            self._index(entry)
+        self._written = self._seq
+        self._compact()
+
+    def _compact(self):
+        with self.lock:
+            entries = self._retained(self._written)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._appends = 0
+
+    def _write_loop(self):
+        while True:
+            entries = [self._queue.get()]
+            while True:
+                try:
+                    entries.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in entries
+            batch = [e for e in entries if e is not None]
+            try:
+                if batch:
+                    with open(self.path, 'a', encoding='utf-8') as f:
+                        for _, entry in batch:
+                            f.write(json.dumps(entry) + '\n')
+                        f.flush()
+                        os.fsync(f.fileno())
+                    self._written = batch[-1][0]
+                    self._appends += len(batch)
+                    if self._appends >= self.compact_every:
+                        self._compact()
+            except OSError as e:
+                print(f"Warning: Could not save scores: {e}")
+            finally:
+                for _ in entries:
+                    self._queue.task_done()
+            if stop:
+                break
+
+    def flush(self):
+        """Blocks until every added entry has been written."""
+        if not self._closed:
+            self._queue.join()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
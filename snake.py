@@ -2,13 +2,31 @@
 # Developed by Asim Husain - An Intermediate Python Developer
 # September 29, 2025
 
+import time
+_IMPORT_START = time.perf_counter()
+
 import pygame
 import sys
+import argparse
+import atexit
+import multiprocessing
+import shutil
+import threading
+from contextlib import contextmanager
 import random
-import json
 from datetime import datetime
 import math
 import os
+from itertools import islice
+from collections import OrderedDict
+from array import array
+
+import engine
+from autopilot import Autopilot
+from replay import ReplayRecorder
+from scores import ScoreStore
+from profiler import FrameProfiler
+from capture import FrameCapture
 
 # --- Resource Helper Function ---
 def resource_path(relative_path):
@@ -19,15 +37,13 @@ def resource_path(relative_path):
         base_path = os.path.abspath(".")
     return os.path.join(base_path, relative_path)
 
-# --- Initialization ---
-pygame.init()
-pygame.mixer.init()
-
 # --- Game Constants ---
 SCREEN_WIDTH, SCREEN_HEIGHT = 1280, 720 
 GRID_SIZE = 30
-GRID_WIDTH = SCREEN_WIDTH // GRID_SIZE
+GRID_WIDTH = SCREEN_WIDTH // GRID_SIZE     # Cells visible in the window
 GRID_HEIGHT = SCREEN_HEIGHT // GRID_SIZE
+BOARD_SIZES = [f"{engine.GRID_WIDTH}x{engine.GRID_HEIGHT}", "100x100", "250x250", "1000x1000"]
+CAMERA_MARGIN = 8   # Cells kept between the head and the edge of the view
 
 # Colors
 COLOR_BG = (15, 20, 30)
@@ -43,263 +59,529 @@ COLOR_INPUT_BOX = (40, 50, 65)
 
 # Game settings
 FPS = 60
-
-# --- Load Fonts ---
-try:
-    FONT_PATH_REGULAR = resource_path('assets/fonts/Ubuntu-Regular.ttf')
-    FONT_PATH_BOLD = resource_path('assets/fonts/Ubuntu-Bold.ttf')
-    FONT_S = pygame.font.Font(FONT_PATH_REGULAR, 18)
-    FONT_M = pygame.font.Font(FONT_PATH_REGULAR, 24)
-    FONT_L = pygame.font.Font(FONT_PATH_BOLD, 48)
-    FONT_XL = pygame.font.Font(FONT_PATH_BOLD, 72)
-except FileNotFoundError:
-    print("Warning: Font files not found. Using default font.")
-    FONT_S = pygame.font.SysFont('sans-serif', 18)
-    FONT_M = pygame.font.SysFont('sans-serif', 24)
-    FONT_L = pygame.font.SysFont('sans-serif', 48, bold=True)
-    FONT_XL = pygame.font.SysFont('sans-serif', 72, bold=True)
-
-# --- Load Sounds ---
-try:
-    SOUND_EAT = pygame.mixer.Sound(resource_path('assets/sounds/eat_fruit.wav'))
-    SOUND_GAMEOVER = pygame.mixer.Sound(resource_path('assets/sounds/game_over.wav'))
-    SOUND_CLICK = pygame.mixer.Sound(resource_path('assets/sounds/click.wav'))
-    SOUND_EAT.set_volume(0.3)
-    SOUND_GAMEOVER.set_volume(0.2)
-    SOUND_CLICK.set_volume(0.3)
-    pygame.mixer.music.load(resource_path('assets/sounds/background_music.ogg'))
-    pygame.mixer.music.set_volume(0.05)
-except pygame.error as e:
-    print(f"Warning: Sound file not found or failed to load: {e}")
-    class DummySound:
-        def play(self): pass
-        def set_volume(self, vol): pass
-    SOUND_EAT = SOUND_GAMEOVER = SOUND_CLICK = DummySound()
-
-    class DummyMusic:
-        def load(self, file): pass
-        def play(self, loops): pass
-        def stop(self): pass
-        def set_volume(self, vol): pass
-    pygame.mixer.music = DummyMusic()
+SCORE_ANIM_FRAMES = 15
+FRUIT_SPAWN_FRAMES = 30   # Frames a new fruit takes to grow to full size
+RECORD_FPS = 30   # Frame rate of F9 recordings
+IDLE_SCREENS = ("MAIN_MENU", "GAME_OVER", "LEADERBOARD")   # Redrawn only when something changes
+IDLE_WAIT_MS = 1000   # Longest an idle screen sleeps before redrawing anyway
+MAX_PARTICLES = 600
+# Font sizes used by the score-pop animation, largest first
+SCORE_FONT_SIZES = sorted({int(28 * (1 + 0.5 * (t / SCORE_ANIM_FRAMES))) for t in range(SCORE_ANIM_FRAMES + 1)}, reverse=True)
+
+# --- Startup Timing ---
+STARTUP_PHASES = []   # (phase, milliseconds), printed with --startup-report
+
+@contextmanager
+def startup_phase(name):
+    start = time.perf_counter()
+    yield
+    STARTUP_PHASES.append((name, (time.perf_counter() - start) * 1000))
+
+# --- Assets ---
+# Fonts and sounds are loaded by load_assets() once main() has a window up,
+# never at import, so tools importing this module never touch display or audio.
+FONT_PATH_REGULAR = resource_path('assets/fonts/Ubuntu-Regular.ttf')
+FONT_PATH_BOLD = resource_path('assets/fonts/Ubuntu-Bold.ttf')
+FONT_S = FONT_M = FONT_L = FONT_XL = None
+FONT_SCORE = {}
+
+class DummySound:
+    def play(self): pass
+    def set_volume(self, vol): pass
+
+class DummyMusic:
+    def load(self, file): pass
+    def play(self, loops): pass
+    def stop(self): pass
+    def set_volume(self, vol): pass
+
+SOUND_EAT = SOUND_GAMEOVER = SOUND_CLICK = DummySound()
+
+def load_fonts():
+    global FONT_S, FONT_M, FONT_L, FONT_XL, FONT_SCORE
+    with startup_phase("fonts"):
+        try:
+            FONT_S = pygame.font.Font(FONT_PATH_REGULAR, 18)
+            FONT_M = pygame.font.Font(FONT_PATH_REGULAR, 24)
+            FONT_L = pygame.font.Font(FONT_PATH_BOLD, 48)
+            FONT_XL = pygame.font.Font(FONT_PATH_BOLD, 72)
+            FONT_SCORE = {size: pygame.font.Font(FONT_PATH_BOLD, size) for size in SCORE_FONT_SIZES}
+        except FileNotFoundError:
+            print("Warning: Font files not found. Using default font.")
+            FONT_S = pygame.font.SysFont('sans-serif', 18)
+            FONT_M = pygame.font.SysFont('sans-serif', 24)
+            FONT_L = pygame.font.SysFont('sans-serif', 48, bold=True)
+            FONT_XL = pygame.font.SysFont('sans-serif', 72, bold=True)
+            FONT_SCORE = {size: pygame.font.SysFont('sans-serif', size, bold=True) for size in SCORE_FONT_SIZES}
+
+def load_sounds():
+    global SOUND_EAT, SOUND_GAMEOVER, SOUND_CLICK
+    try:
+        with startup_phase("audio init"):
+            pygame.mixer.init()
+        with startup_phase("sounds"):
+            SOUND_EAT = pygame.mixer.Sound(resource_path('assets/sounds/eat_fruit.wav'))
+            SOUND_GAMEOVER = pygame.mixer.Sound(resource_path('assets/sounds/game_over.wav'))
+            SOUND_CLICK = pygame.mixer.Sound(resource_path('assets/sounds/click.wav'))
+            SOUND_EAT.set_volume(0.3)
+            SOUND_GAMEOVER.set_volume(0.2)
+            SOUND_CLICK.set_volume(0.3)
+            pygame.mixer.music.load(resource_path('assets/sounds/background_music.ogg'))
+            pygame.mixer.music.set_volume(0.05)
+    except pygame.error as e:
+        print(f"Warning: Sound file not found or failed to load: {e}")
+        SOUND_EAT = SOUND_GAMEOVER = SOUND_CLICK = DummySound()
+        pygame.mixer.music = DummyMusic()
+
+def load_assets(audio=True):
+    """Loads fonts and, unless audio is off, initializes the mixer and loads sounds."""
+    load_fonts()
+    if audio:
+        load_sounds()
+    else:
+        pygame.mixer.music = DummyMusic()
 
 # --- Helper Functions & Classes ---
+class TextCache:
+    """LRU cache of rendered text surfaces keyed on (text, font, color).
+
+    Fonts are keyed by object, so each loaded size counts as its own font.
+    """
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+
+    def render(self, text, font, color):
+        key = (text, font, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+        surface = font.render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+TEXT_CACHE = TextCache()
+
+class SpriteAtlas:
+    """Every cell appearance rendered once, so drawing a cell is one blit.
+
+    Cells are keyed on their fill color and border, fruits on their color
+    and spawn animation frame. Sprites are made on first use; prerender()
+    makes the usual ones up front so the first frames of a game don't.
+    """
+    COLORKEY = (255, 0, 255)   # Transparent corners of the rounded fruit sprites
+
+    def __init__(self):
+        self.sprites = {}
+
+    def cell(self, color, border):
+        """A filled cell with a border of that width in the grid color."""
+        key = (color, border, COLOR_GRID)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = pygame.Surface((GRID_SIZE, GRID_SIZE)).convert()
+            sprite.fill(color)
+            pygame.draw.rect(sprite, COLOR_GRID, sprite.get_rect(), border)
+            self.sprites[key] = sprite
+        return sprite
+
+    def fruit(self, color, timer):
+        """Returns (sprite, offset) for a fruit timer frames before it is full size.
+
+        The offset places the shrunken sprite inside its cell; sprite is
+        None on the first frame, when the fruit has no size yet.
+        """
+        key = ("fruit", color, timer)
+        entry = self.sprites.get(key)
+        if entry is None:
+            r = pygame.Rect(0, 0, GRID_SIZE, GRID_SIZE)
+            if timer > 0:
+                scale = 1.0 - (timer / FRUIT_SPAWN_FRAMES)
+                r = r.inflate(GRID_SIZE * (scale-1), GRID_SIZE * (scale-1))
+            sprite = None
+            if r.width > 0 and r.height > 0:
+                sprite = pygame.Surface(r.size).convert()
+                sprite.fill(self.COLORKEY)
+                sprite.set_colorkey(self.COLORKEY, pygame.RLEACCEL)
+                pygame.draw.rect(sprite, color, sprite.get_rect(), border_radius=8)
+            entry = (sprite, r.topleft)
+            self.sprites[key] = entry
+        return entry
+
+    def prerender(self, body_palette):
+        for color in body_palette:
+            self.cell(color, 1)
+        self.cell(COLOR_SNAKE_HEAD, 2)
+        self.cell(COLOR_OBSTACLE, 2)
+        for props in engine.FRUIT_TYPES.values():
+            for timer in range(FRUIT_SPAWN_FRAMES + 1):
+                self.fruit(props['color'], timer)
+
+SPRITES = SpriteAtlas()
+
+def blit_batch(surface, batch):
+    """Draws a list of (sprite, dest) pairs in one call."""
+    if hasattr(surface, 'fblits'):
+        surface.fblits(batch)   # pygame-ce's faster variant
+    else:
+        surface.blits(batch, False)
+
 def draw_text(text, font, color, surface, x, y, center=False):
-    text_obj = font.render(text, True, color)
+    text_obj = TEXT_CACHE.render(text, font, color)
     text_rect = text_obj.get_rect()
     if center:
         text_rect.center = (x, y)
     else:
         text_rect.topleft = (x, y)
     surface.blit(text_obj, text_rect)
-
-class Particle:
-    def __init__(self, x, y, color):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.radius = random.randint(4, 8)
-        self.life = 20
-        angle = random.uniform(0, 2 * math.pi)
-        speed = random.uniform(1, 4)
-        self.vx = math.cos(angle) * speed
-        self.vy = math.sin(angle) * speed
+    return text_rect
+
+class ParticleSystem:
+    """Fixed-capacity particle pool stored as parallel arrays.
+
+    Each particle is a slot index into the x, y, vx, vy, radius, life and
+    color arrays. Dead slots go back on a free list, so bursts reuse storage
+    instead of allocating objects, and bursts past capacity are dropped.
+    """
+    def __init__(self, capacity=MAX_PARTICLES, rng=random):
+        self.capacity = capacity
+        self.rng = rng
+        self.x = array('d', bytes(8 * capacity))
+        self.y = array('d', bytes(8 * capacity))
+        self.vx = array('d', bytes(8 * capacity))
+        self.vy = array('d', bytes(8 * capacity))
+        self.radius = array('d', bytes(8 * capacity))
+        self.life = array('i', bytes(4 * capacity))
+        self.color = array('B', bytes(capacity))
+        self.palette = []   # Color index -> RGB
+        self.free = list(range(capacity - 1, -1, -1))
+        self.live = []
+
+    def __len__(self):
+        return len(self.live)
+
+    def clear(self):
+        self.free.extend(self.live)
+        self.live.clear()
+
+    def burst(self, x, y, color, count=20):
+        """Spawns up to count particles flying out from (x, y)."""
+        if color not in self.palette:
+            self.palette.append(color)
+        color_index = self.palette.index(color)
+        rng = self.rng
+        for _ in range(min(count, len(self.free))):
+            i = self.free.pop()
+            self.x[i] = x
+            self.y[i] = y
+            self.radius[i] = rng.randint(4, 8)
+            self.life[i] = 20
+            angle = rng.uniform(0, 2 * math.pi)
+            speed = rng.uniform(1, 4)
+            self.vx[i] = math.cos(angle) * speed
+            self.vy[i] = math.sin(angle) * speed
+            self.color[i] = color_index
+            self.live.append(i)
 
     def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.radius -= 0.2
-        self.life -= 1
-        return self.radius > 0
+        """Moves and shrinks every live particle and frees the ones that vanished."""
+        xs, ys, vxs, vys, radii, lives = self.x, self.y, self.vx, self.vy, self.radius, self.life
+        alive = []
+        for i in self.live:
+            xs[i] += vxs[i]
+            ys[i] += vys[i]
+            radii[i] -= 0.2
+            lives[i] -= 1
+            if radii[i] > 0:
+                alive.append(i)
+            else:
+                self.free.append(i)
+        self.live = alive
+
+    def draw(self, surface, offset=(0, 0)):
+        """Draws every live particle shifted by offset and returns the rects they cover."""
+        circle, palette = pygame.draw.circle, self.palette
+        ox, oy = offset
+        rects = []
+        for i in self.live:
+            x, y, r = int(self.x[i]) + ox, int(self.y[i]) + oy, int(self.radius[i])
+            circle(surface, palette[self.color[i]], (x, y), r)
+            rects.append(pygame.Rect(x - r - 1, y - r - 1, 2 * r + 3, 2 * r + 3))
+        return rects
+
+# --- Camera ---
+class Camera:
+    """The window's view onto the board, in whole cells.
+
+    x and y are the board cell shown at the top-left. The view scrolls to
+    keep the head CAMERA_MARGIN cells inside its edges and never shows
+    past the board; a board that fits in the window never scrolls. Drawing
+    code asks the camera for screen rects and visible cells, so its cost
+    follows the size of the window rather than of the board.
+    """
+    def __init__(self, cols=GRID_WIDTH, rows=GRID_HEIGHT):
+        self.cols = cols
+        self.rows = rows
+        self.x = 0
+        self.y = 0
+
+    def _axis(self, start, head, view, size, center):
+        if size <= view:
+            return 0
+        if center:
+            start = head - view // 2
+        else:
+            margin = min(CAMERA_MARGIN, (view - 1) // 2)
+            start = min(max(start, head - view + margin + 1), head - margin)
+        return max(0, min(start, size - view))
+
+    def follow(self, pos, board, center=False):
+        """Scrolls to keep pos in view; returns True if the view moved."""
+        x = self._axis(self.x, pos[0], self.cols, board.width, center)
+        y = self._axis(self.y, pos[1], self.rows, board.height, center)
+        moved = (x, y) != (self.x, self.y)
+        self.x, self.y = x, y
+        return moved
+
+    def offset(self):
+        """Pixel offset from board coordinates to screen coordinates."""
+        return (-self.x * GRID_SIZE, -self.y * GRID_SIZE)
+
+    def visible(self, pos):
+        return self.x <= pos[0] < self.x + self.cols and self.y <= pos[1] < self.y + self.rows
+
+    def rect(self, pos):
+        return pygame.Rect(((pos[0] - self.x) * GRID_SIZE, (pos[1] - self.y) * GRID_SIZE), (GRID_SIZE, GRID_SIZE))
+
+    def occupied(self, grid, board):
+        """Yields the visible cells that are set in one of the board's grids."""
+        x0, x1 = self.x, min(self.x + self.cols, board.width)
+        for y in range(self.y, min(self.y + self.rows, board.height)):
+            start = y * board.width
+            row = grid[start + x0:start + x1]
+            if any(row):
+                for dx, value in enumerate(row):
+                    if value:
+                        yield (x0 + dx, y)
 
-    def draw(self, surface):
-        if self.radius > 0:
-            pygame.draw.circle(surface, self.color, (int(self.x), int(self.y)), int(self.radius))
 
 # --- Game Object Classes ---
-class Snake:
-    def __init__(self):
-        self.reset()
-
+# Game rules live in engine.py; these subclasses only add drawing.
+class Snake(engine.Snake):
     def reset(self):
-        self.length = 1
-        self.positions = [((GRID_WIDTH // 2), (GRID_HEIGHT // 2))]
-        self.direction = random.choice([(0, -1), (0, 1), (-1, 0), (1, 0)])
+        super().reset()
         self.color_head = COLOR_SNAKE_HEAD
         self.color_body = COLOR_SNAKE_BODY
         self.body_palette = [(80, 160, 170), (90, 180, 190), (70, 140, 150), (100, 200, 210)]
-        self.next_direction = self.direction
-
-    def get_head_position(self):
-        return self.positions[0]
-
-    def turn(self, point):
-        if self.length > 1 and (point[0] * -1, point[1] * -1) == self.direction:
-            return
-        self.next_direction = point
+        # Body colors follow each segment's move number, so a segment keeps its
+        # color as the snake moves and only the head, neck and tail need redrawing
+        self.moves = 0
+        self.damaged = []   # (kind, pos, move) cells changed since the last frame
+        # Move number each cell was entered on, so a long snake can be drawn
+        # from the visible cells alone instead of walking the whole body
+        if len(getattr(self, 'entered', ())) != self.board.width * self.board.height:
+            self.entered = array('i', bytes(4 * self.board.width * self.board.height))
 
     def move(self, wall_less_mode):
-        self.direction = self.next_direction
-        cur = self.get_head_position()
-        x, y = self.direction
-        new = ((cur[0] + x), (cur[1] + y))
-        if wall_less_mode:
-            new = (new[0] % GRID_WIDTH, new[1] % GRID_HEIGHT)
-        self.positions.insert(0, new)
-        if len(self.positions) > self.length:
-            self.positions.pop()
-
-    def grow(self):
-        self.length += 1
-
-    def collides_with_self(self):
-        return self.get_head_position() in self.positions[1:]
-
-    def collides_with_wall(self):
-        x, y = self.get_head_position()
-        return x < 0 or x >= GRID_WIDTH or y < 0 or y >= GRID_HEIGHT
-
-    def collides_with_obstacles(self, obstacles):
-        return self.get_head_position() in [obs.pos for obs in obstacles]
-
-    def draw(self, surface):
-        for i, p in enumerate(self.positions[1:]):
-            r = pygame.Rect((p[0] * GRID_SIZE, p[1] * GRID_SIZE), (GRID_SIZE, GRID_SIZE))
-            color = self.body_palette[i % len(self.body_palette)]
-            pygame.draw.rect(surface, color, r)
-            pygame.draw.rect(surface, COLOR_GRID, r, 1)
-        head_rect = pygame.Rect((self.positions[0][0] * GRID_SIZE, self.positions[0][1] * GRID_SIZE), (GRID_SIZE, GRID_SIZE))
-        pygame.draw.rect(surface, self.color_head, head_rect)
-        pygame.draw.rect(surface, COLOR_GRID, head_rect, 2)
-
-
-class Fruit:
-    """Manages fruit properties and drawing."""
-    FRUIT_TYPES = {
-        'apple': {'color': COLOR_ACCENT, 'score': 10, 'effect': None},
-        'gold_apple': {'color': COLOR_GOLD, 'score': 50, 'effect': 'speed_boost'},
-        'grape': {'color': COLOR_PURPLE, 'score': 20, 'effect': 'slow_down'}
-    }
-
+        if len(self.positions) >= self.length:
+            self.damaged.append(("tail", self.positions[-1], 0))
+        super().move(wall_less_mode)
+        self.moves += 1
+        head = self.positions[0]
+        if self.board.in_bounds(head):
+            self.entered[self.board.index(head)] = self.moves
+        if len(self.positions) > 1:
+            self.damaged.append(("body", self.positions[1], self.moves - 1))
+        self.damaged.append(("head", self.positions[0], self.moves))
+
+    def restore(self, state):
+        super().restore(state)
+        self.damaged.clear()
+        size = self.board.width * self.board.height
+        if len(self.entered) != size:
+            self.entered = array('i', bytes(4 * size))
+        # Number the segments back from the head so they keep alternating colors
+        board = self.board
+        for i, pos in enumerate(self.positions):
+            if board.in_bounds(pos):
+                self.entered[board.index(pos)] = self.moves - i
+
+    def segment_color(self, move):
+        return self.body_palette[move % len(self.body_palette)]
+
+    def add_sprites(self, batch, camera):
+        """Appends a (sprite, dest) pair for every visible segment, head last."""
+        head = self.positions[0]
+        palette = [SPRITES.cell(color, 1) for color in self.body_palette]
+        n = len(palette)
+        cx, cy = camera.x, camera.y
+        x1, y1 = cx + camera.cols, cy + camera.rows
+        append = batch.append
+        if len(self.positions) <= camera.cols * camera.rows:
+            move = self.moves
+            for i, (x, y) in enumerate(islice(self.positions, 1, None), start=1):
+                if cx <= x < x1 and cy <= y < y1:
+                    append((palette[(move - i) % n], ((x - cx) * GRID_SIZE, (y - cy) * GRID_SIZE)))
+        else:
+            # Longer than the view holds: find the segments from the visible cells
+            entered, width = self.entered, self.board.width
+            for p in camera.occupied(self.board.body, self.board):
+                if p != head:
+                    x, y = p
+                    append((palette[entered[y * width + x] % n], ((x - cx) * GRID_SIZE, (y - cy) * GRID_SIZE)))
+        if camera.visible(head):
+            append((SPRITES.cell(self.color_head, 2), camera.rect(head).topleft))
+
+    def cell_sprite(self, kind, move):
+        """The sprite for a damaged cell, or None for a cell the tail left."""
+        if kind == "body":
+            return SPRITES.cell(self.segment_color(move), 1)
+        if kind == "head":
+            return SPRITES.cell(self.color_head, 2)
+        return None
+
+
+class Fruit(engine.Fruit):
+    """Manages fruit drawing."""
     def __init__(self, fruit_type='apple'):
-        self.type = fruit_type
-        self.properties = self.FRUIT_TYPES[fruit_type]
-        self.pos = (0, 0)
-        self.spawn_animation_timer = 30
-
-    def randomize_position(self, snake_positions, obstacle_positions):
-        while True:
-            new_pos = (random.randint(0, GRID_WIDTH - 1), random.randint(0, GRID_HEIGHT - 1))
-            if new_pos not in snake_positions and new_pos not in obstacle_positions:
-                self.pos = new_pos
-                self.spawn_animation_timer = 30
-                break
+        super().__init__(fruit_type)
+        self.spawn_animation_timer = FRUIT_SPAWN_FRAMES
+        self.settled = False   # Drawn at full size at least once
 
-    def draw(self, surface):
-        r = pygame.Rect((self.pos[0] * GRID_SIZE, self.pos[1] * GRID_SIZE), (GRID_SIZE, GRID_SIZE))
+    def add_sprite(self, batch, camera):
+        """Appends this frame's (sprite, dest) pair and advances the spawn animation."""
+        sprite, (dx, dy) = SPRITES.fruit(self.properties['color'], self.spawn_animation_timer)
         if self.spawn_animation_timer > 0:
-            scale = 1.0 - (self.spawn_animation_timer / 30.0)
-            anim_rect = r.inflate(GRID_SIZE * (scale-1), GRID_SIZE * (scale-1))
-            pygame.draw.rect(surface, self.properties['color'], anim_rect, border_radius=8)
             self.spawn_animation_timer -= 1
         else:
-            pygame.draw.rect(surface, self.properties['color'], r, border_radius=8)
+            self.settled = True
+        if sprite is not None:
+            x, y = camera.rect(self.pos).topleft
+            batch.append((sprite, (x + dx, y + dy)))
 
 
-class Obstacle:
-    """Manages obstacle positions and drawing."""
-    def __init__(self, pos):
-        self.pos = pos
-
-    def draw(self, surface):
-        r = pygame.Rect((self.pos[0] * GRID_SIZE, self.pos[1] * GRID_SIZE), (GRID_SIZE, GRID_SIZE))
-        pygame.draw.rect(surface, COLOR_OBSTACLE, r)
-        pygame.draw.rect(surface, COLOR_GRID, r, 2)
+class Obstacle(engine.Obstacle):
+    """Manages obstacle drawing."""
+    def add_sprite(self, batch, camera):
+        batch.append((SPRITES.cell(COLOR_OBSTACLE, 2), camera.rect(self.pos).topleft))
 
 
 # --- Main Game Class ---
 class SnakeGame:
-    def __init__(self):
+    def __init__(self, score_store=None):
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption(" S N A K E ")
         self.clock = pygame.time.Clock()
         self.game_state = "MAIN_MENU"
-        self.particles = []
+        self.effects_rng = random.Random()   # Kept apart from the game's rng so effects never change play
+        self.particles = ParticleSystem(MAX_PARTICLES, self.effects_rng)
+        self.background_cache = {}   # with_obstacles -> (key, surface)
+
+        # Dirty-rectangle rendering for gameplay: the world layer holds the
+        # background, fruits and snake and is patched cell by cell each tick
+        self.dirty_rendering = True
+        self.world = None
+        self.overlay_rects = []   # Particles and HUD drawn over the world last frame
+        self.camera = Camera()
+        self.sprite_batch = []   # (sprite, dest) pairs, reused every frame
+        self.restore_batch = []  # (background, dest, area) triples for damaged cells
+        self.last_state = None
+        # Idle screens sleep in pygame.event.wait; the event that woke them is
+        # handed to the next frame's event loop
+        self.waited_events = []
+        self.frame_events = 0   # Events the last frame handled
+        self.poll_ticks = 0     # get_ticks() when this frame's events were taken off the queue
 
         # Game settings
         self.game_mode = "Classic"
+        self.player = "Human"   # "AI" lets the autopilot play
         self.difficulty = "Medium"
+        self.board_size = BOARD_SIZES[0]
         self.player_name = ""
 
         # Game objects
-        self.snake = Snake()
-        self.fruits = []
-        self.obstacles = []
-        self.reset_game_state()
+        self.engine = engine.SnakeEngine(self.game_mode, self.difficulty,
+                                         snake_class=Snake, fruit_class=Fruit, obstacle_class=Obstacle)
+        self.recorder = ReplayRecorder().attach(self.engine)   # Holds the replay of the current game
+        self.autopilot = Autopilot()
+        SPRITES.prerender(self.snake.body_palette)
 
         # UI elements for menus
         self.menu_buttons = {
             "game_mode": ["Classic", "Wall-less", "Speed-up", "Obstacle", "Multi-fruit"],
+            "player": ["Human", "AI"],
             "difficulty": ["Easy", "Medium", "Hard"],
+            "board_size": BOARD_SIZES,
             "start": ["Start Game"],
             "leaderboard": ["Leaderboard"],
             "quit": ["Quit"]
         }
         self.selected_button = ("game_mode", 0)
+        self.score_store = score_store if score_store is not None else ScoreStore()
         self.high_scores = self.load_scores()
         
         # Score animation
         self.score_anim_timer = 0
 
+        # Frame profiler, toggled with F3
+        self.profiler = FrameProfiler()
+        self.ticks_simulated = 0
 
-    def reset_game_state(self):
-        """Resets all variables for a new game."""
-        self.snake.reset()
-        self.score = 0
-        self.game_over_flag = False
-        self.obstacles.clear()
-        self.fruits.clear()
-
-        # Set speed based on difficulty
-        self.base_speed = {'Easy': 8, 'Medium': 12, 'Hard': 16}[self.difficulty]
-        self.current_speed = self.base_speed
-        self.move_timer = 0
-
-        # Generate obstacles if in Obstacle mode
-        if self.game_mode == "Obstacle":
-            num_obstacles = {'Easy': 10, 'Medium': 20, 'Hard': 30}[self.difficulty]
-            for _ in range(num_obstacles):
-                pos = (random.randint(0, GRID_WIDTH - 1), random.randint(0, GRID_HEIGHT - 1))
-                if pos not in self.snake.positions:
-                    self.obstacles.append(Obstacle(pos))
-        
-        # Spawn initial fruit
-        self.spawn_fruit()
+        # Gameplay recording, toggled with F9
+        self.capture = None
+        self.fixed_frame_ms = None    # Game time per frame when rendering headlessly
 
-    def spawn_fruit(self):
-        """Spawns fruit(s) based on the game mode."""
-        self.fruits.clear()
-        num_fruits = 3 if self.game_mode == 'Multi-fruit' else 1
-        
-        for _ in range(num_fruits):
-            if self.game_mode == 'Multi-fruit':
-                fruit_choice = random.choices(['apple', 'gold_apple', 'grape'], weights=[70, 10, 20], k=1)[0]
-                fruit = Fruit(fruit_choice)
-            else:
-                fruit = Fruit('apple')
-            
-            occupied_pos = self.snake.positions + [obs.pos for obs in self.obstacles] + [f.pos for f in self.fruits]
-            fruit.randomize_position(self.snake.positions, [obs.pos for obs in self.obstacles])
-            self.fruits.append(fruit)
+
+    # Game objects are owned by the engine
+    @property
+    def snake(self):
+        return self.engine.snake
+
+    @property
+    def fruits(self):
+        return self.engine.fruits
+
+    @property
+    def obstacles(self):
+        return self.engine.obstacles
+
+    @property
+    def score(self):
+        return self.engine.score
+
+    def reset_game_state(self, seed=None):
+        """Resets all variables for a new game, with a fresh seed unless one is given."""
+        if self.player == "AI":
+            self.autopilot.attach(self.engine)
+        else:
+            self.autopilot.detach(self.engine)
+        width, height = (int(n) for n in self.board_size.split('x'))
+        self.engine.reset(self.game_mode, self.difficulty, seed, width, height)
+        self.camera.follow(self.snake.get_head_position(), self.engine.board, center=True)
+        self.background_cache.pop(True, None)   # New obstacle layout
+        self.world = None
+
+    def snapshot(self):
+        """The game's state without any of the window's; see SnakeEngine.snapshot()."""
+        return self.engine.snapshot()
+
+    def restore(self, snapshot):
+        """Rewinds or jumps the game to snapshot and redraws the board."""
+        layout = self.engine.layout()
+        self.engine.restore(snapshot)
+        for fruit in self.fruits:
+            fruit.spawn_animation_timer = 0   # Already on the board; don't grow it in again
+        self.camera.follow(self.snake.get_head_position(), self.engine.board, center=True)
+        if snapshot.layout is not layout:
+            self.background_cache.pop(True, None)
+        self.world = None
 
     def load_scores(self):
-        """Loads scores from a JSON file."""
-        try:
-            with open('high_scores.json', 'r') as f:
-                scores = json.load(f)
-                return sorted(scores, key=lambda x: x['score'], reverse=True)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
+        """Returns the top 10 scores from the store's in-memory index."""
+        return self.score_store.top(10)
 
     def save_score(self):
         """Saves the current score if it's a high score."""
@@ -312,129 +594,208 @@ class SnakeGame:
             "mode": self.game_mode,
             "difficulty": self.difficulty
         }
-        self.high_scores.append(score_entry)
-        self.high_scores = sorted(self.high_scores, key=lambda x: x['score'], reverse=True)[:10] # Keep top 10
-        with open('high_scores.json', 'w') as f:
-            json.dump(self.high_scores, f, indent=4)
+        replay_path = self.save_replay()
+        if replay_path:
+            score_entry["replay"] = replay_path
+        self.score_store.add(score_entry)   # Written to disk on the store's writer thread
+        self.high_scores = self.load_scores()
+
+    def save_replay(self):
+        """Saves the finished game's replay next to the scores and returns its path, or None."""
+        replay = self.recorder.replay
+        if replay is None:
+            return None   # Restored from another game's snapshot
+        directory = os.path.join(os.path.dirname(self.score_store.path), 'replays')
+        path = os.path.join(directory, f"{datetime.now():%Y%m%d-%H%M%S}-{replay.seed:016x}.snkr")
+        try:
+            os.makedirs(directory, exist_ok=True)
+            replay.save(path)
+        except OSError as e:
+            print(f"Warning: Could not save replay: {e}")
+            return None
+        return path
 
     def create_particle_burst(self, position, color):
         """Creates a burst of particles at a given position."""
         x, y = (position[0] * GRID_SIZE + GRID_SIZE // 2, position[1] * GRID_SIZE + GRID_SIZE // 2)
-        for _ in range(20):
-            self.particles.append(Particle(x, y, color))
+        self.particles.burst(x, y, color, 20)   # In board pixels; drawn shifted by the camera
 
     def update_particles(self):
         """Updates and removes dead particles."""
-        self.particles = [p for p in self.particles if p.update()]
-
-    def draw_background(self):
-        """Draws the background and grid."""
-        self.screen.fill(COLOR_BG)
-
-        for x in range(0, SCREEN_WIDTH, GRID_SIZE):
-            pygame.draw.line(self.screen, COLOR_GRID, (x, 0), (x, SCREEN_HEIGHT))
-        for y in range(0, SCREEN_HEIGHT, GRID_SIZE):
-            pygame.draw.line(self.screen, COLOR_GRID, (0, y), (SCREEN_WIDTH, y))
+        self.particles.update()
+
+    def build_background(self, with_obstacles):
+        """Draws the background, grid and optionally the obstacles into a new surface."""
+        width, height = self.screen.get_size()
+        surface = pygame.Surface((width, height)).convert()
+        surface.fill(COLOR_BG)
+
+        for x in range(0, width, GRID_SIZE):
+            pygame.draw.line(surface, COLOR_GRID, (x, 0), (x, height))
+        for y in range(0, height, GRID_SIZE):
+            pygame.draw.line(surface, COLOR_GRID, (0, y), (width, y))
+        if with_obstacles:
+            # Obstacles never move during a game, so the visible ones are baked in
+            camera = self.camera
+            if len(self.obstacles) <= camera.cols * camera.rows:
+                visible = [obs for obs in self.obstacles if camera.visible(obs.pos)]
+            else:
+                visible = [Obstacle(pos) for pos in camera.occupied(self.engine.board.blocked, self.engine.board)]
+            batch = []
+            for obs in visible:
+                obs.add_sprite(batch, camera)
+            blit_batch(surface, batch)
+        return surface
+
+    def get_background(self, with_obstacles=False):
+        """Returns the cached background, rebuilding it if the resolution, colors or view changed."""
+        key = (self.screen.get_size(), COLOR_BG, COLOR_GRID)
+        if with_obstacles:
+            key += (self.camera.x, self.camera.y)
+        cached = self.background_cache.get(with_obstacles)
+        if cached is None or cached[0] != key:
+            cached = (key, self.build_background(with_obstacles))
+            self.background_cache[with_obstacles] = cached
+        return cached[1]
+
+    def draw_background(self, with_obstacles=False):
+        """Blits the cached background."""
+        self.screen.blit(self.get_background(with_obstacles), (0, 0))
             
     def draw_hud(self):
         score_text = f"Score: {self.score}"
         if self.score_anim_timer > 0:
-            scale = 1 + 0.5 * (self.score_anim_timer / 15)
-            font = pygame.font.Font(FONT_PATH_BOLD, int(28 * scale))
+            scale = 1 + 0.5 * (self.score_anim_timer / SCORE_ANIM_FRAMES)
+            font = FONT_SCORE[int(28 * scale)]
             self.score_anim_timer -= 1
         else:
-            font = pygame.font.Font(FONT_PATH_BOLD, 28)
+            font = FONT_SCORE[28]
         
-        draw_text(score_text, font, COLOR_TEXT, self.screen, 20, 20)
-        draw_text(f"Mode: {self.game_mode}", FONT_M, COLOR_TEXT, self.screen, 20, 60)
-        draw_text(f"Difficulty: {self.difficulty}", FONT_M, COLOR_TEXT, self.screen, 20, 90)
+        hud_rect = draw_text(score_text, font, COLOR_TEXT, self.screen, 20, 20)
+        mode = f"{self.game_mode} (AI)" if self.player == "AI" else self.game_mode
+        hud_rect.union_ip(draw_text(f"Mode: {mode}", FONT_M, COLOR_TEXT, self.screen, 20, 60))
+        hud_rect.union_ip(draw_text(f"Difficulty: {self.difficulty}", FONT_M, COLOR_TEXT, self.screen, 20, 90))
+        return hud_rect
 
     def handle_game_events(self):
         """Handles user input during the game."""
-        for event in pygame.event.get():
+        for event in self.poll_events():
+            if self.handle_hotkey(event):
+                continue
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
             if event.type == pygame.KEYDOWN:
-                if event.key in [pygame.K_UP, pygame.K_w]:
-                    self.snake.turn((0, -1))
+                event_time = getattr(event, 'timestamp', self.poll_ticks)   # When the key was pressed
+                if event.key == pygame.K_ESCAPE:
+                    self.game_state = "Main Menu"
+                    pygame.mixer.music.play(-1)
+                elif self.engine.autopilot is not None:
+                    continue   # The autopilot steers
+                elif event.key in [pygame.K_UP, pygame.K_w]:
+                    self.snake.turn((0, -1), event_time)
                 elif event.key in [pygame.K_DOWN, pygame.K_s]:
-                    self.snake.turn((0, 1))
+                    self.snake.turn((0, 1), event_time)
                 elif event.key in [pygame.K_LEFT, pygame.K_a]:
-                    self.snake.turn((-1, 0))
+                    self.snake.turn((-1, 0), event_time)
                 elif event.key in [pygame.K_RIGHT, pygame.K_d]:
-                    self.snake.turn((1, 0))
-                elif event.key == pygame.K_ESCAPE:
-                    self.game_state = "Main Menu"
-                    pygame.mixer.music.play(-1)
+                    self.snake.turn((1, 0), event_time)
 
     def update_game_logic(self):
         """Updates the game state each frame."""
-        if self.game_over_flag:
-            return
-
-        self.move_timer += self.clock.get_time()
-        move_interval = 1000 / self.current_speed
-        if self.move_timer >= move_interval:
-            self.move_timer = 0
-            self.snake.move(self.game_mode == "Wall-less")
-
-            head_pos = self.snake.get_head_position()
-            
-            # Collision with fruit
-            for fruit in self.fruits[:]: 
-                if head_pos == fruit.pos:
-                    self.score += fruit.properties['score']
-                    self.snake.grow()
-                    SOUND_EAT.play()
-                    self.create_particle_burst(fruit.pos, fruit.properties['color'])
-                    self.score_anim_timer = 15 
-
-                    # Handle fruit effects
-                    if fruit.properties['effect'] == 'speed_boost':
-                        self.current_speed *= 1.5
-                    elif fruit.properties['effect'] == 'slow_down':
-                        self.current_speed = max(self.base_speed, self.current_speed * 0.75)
-
-                    self.fruits.remove(fruit)
-                    if not self.fruits:
-                        self.spawn_fruit()
-
-            # Collision with self
-            if self.snake.collides_with_self():
+        ticks = self.engine.ticks
+        elapsed = self.clock.get_time() if self.fixed_frame_ms is None else self.fixed_frame_ms
+        events = self.engine.update(elapsed)
+        self.ticks_simulated += self.engine.ticks - ticks
+        now = pygame.time.get_ticks()
+        for event, data in events:
+            if event == "eat":
+                SOUND_EAT.play()
+                self.create_particle_burst(data.pos, data.properties['color'])
+                self.score_anim_timer = SCORE_ANIM_FRAMES
+            elif event == "turn":
+                self.profiler.input_latency(now - data)
+            elif event == "game_over":
                 self.game_over()
-
-            # Collision with wall
-            if self.game_mode != "Wall-less" and self.snake.collides_with_wall():
-                self.game_over()
-            
-            # Collision with obstacles
-            if self.game_mode == "Obstacle" and self.snake.collides_with_obstacles(self.obstacles):
-                self.game_over()
-
-            # Speed-up mode logic
-            if self.game_mode == "Speed-up":
-                self.current_speed += 0.05
     
     def game_over(self):
         """Handles the game over sequence."""
-        self.game_over_flag = True
         SOUND_GAMEOVER.play()
         pygame.mixer.music.stop()
         self.game_state = "GAME_OVER"
-        self.player_name = ""
+        self.player_name = "AI" if self.player == "AI" else ""
         self.high_scores = self.load_scores()
 
     def draw_game_elements(self):
-        """Draws all active game objects."""
-        for obs in self.obstacles:
-            obs.draw(self.screen)
-        for fruit in self.fruits:
-            fruit.draw(self.screen)
-        self.snake.draw(self.screen)
-        for p in self.particles:
-            p.draw(self.screen)
+        """Draws all active game objects; obstacles are part of the play background."""
+        self.draw_sprites(self.screen)
+        self.particles.draw(self.screen, self.camera.offset())
     
+    def draw_sprites(self, surface):
+        """Draws the visible fruits and the snake in one batched blit."""
+        batch = self.sprite_batch
+        batch.clear()
+        for fruit in self.fruits:
+            if self.camera.visible(fruit.pos):
+                fruit.add_sprite(batch, self.camera)
+        self.snake.add_sprites(batch, self.camera)
+        blit_batch(surface, batch)
+
+    def draw_game_incremental(self):
+        """Redraws only what changed since the last frame and returns the damaged rects.
+
+        Returns None after a full redraw, when the whole screen must be flipped.
+        """
+        background = self.get_background(with_obstacles=True)
+        if self.world is None or self.world.get_size() != self.screen.get_size():
+            self.world = background.copy()
+            self.draw_sprites(self.world)
+            self.snake.damaged.clear()
+            self.screen.blit(self.world, (0, 0))
+            self.overlay_rects = self.particles.draw(self.screen, self.camera.offset())
+            self.overlay_rects.append(self.draw_hud())
+            return None
+
+        # Patch the world layer: tail, neck and head cells, then animating fruits.
+        # Only the last change to a cell counts, so every cell is cleared in one
+        # batch and the sprites are drawn over them in another
+        camera = self.camera
+        cells = {}
+        for kind, pos, move in self.snake.damaged:
+            cells[pos] = (kind, move)
+        self.snake.damaged.clear()
+        restore, batch = self.restore_batch, self.sprite_batch
+        restore.clear()
+        batch.clear()
+        damaged = []
+        for pos, (kind, move) in cells.items():
+            if camera.visible(pos):
+                r = camera.rect(pos)
+                restore.append((background, r, r))
+                sprite = self.snake.cell_sprite(kind, move)
+                if sprite is not None:
+                    batch.append((sprite, r))
+                damaged.append(r)
+        for fruit in self.fruits:
+            if not fruit.settled and camera.visible(fruit.pos):
+                r = camera.rect(fruit.pos)
+                restore.append((background, r, r))
+                fruit.add_sprite(batch, camera)
+                damaged.append(r)
+        self.world.blits(restore, False)
+        blit_batch(self.world, batch)
+
+        # Restore what was under last frame's overlays, then draw this frame's
+        damaged.extend(self.overlay_rects)
+        for r in damaged:
+            self.screen.blit(self.world, r, r)
+        self.overlay_rects = self.particles.draw(self.screen, camera.offset())
+        self.overlay_rects.append(self.draw_hud())
+        damaged.extend(self.overlay_rects)
+
+        screen_rect = self.screen.get_rect()
+        return [r.clip(screen_rect) for r in damaged]
+
     def game_over_transition(self, progress):
         """Draws a fade-to-black transition effect."""
         overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
@@ -442,21 +803,165 @@ class SnakeGame:
         overlay.fill((0, 0, 0))
         self.screen.blit(overlay, (0, 0))
         
-    def main_loop(self):
-        """The main loop for the entire application."""
-        while True:
-            if self.game_state == "MAIN_MENU":
+    def render_frame(self):
+        """Draws one frame of the current screen; returns the damaged rects, or None to flip."""
+        profiler = self.profiler
+        dirty_rects = None
+        if self.game_state != self.last_state:
+            self.world = None   # Other screens drew over the play area
+            self.last_state = self.game_state
+        if self.game_state == "MAIN_MENU":
+            with profiler.phase("main_menu_screen"):
                 self.main_menu_screen()
-            elif self.game_state == "PLAYING":
-                self.game_play_screen()
-            elif self.game_state == "GAME_OVER":
+        elif self.game_state == "PLAYING":
+            dirty_rects = self.game_play_screen()
+        elif self.game_state == "GAME_OVER":
+            with profiler.phase("game_over_screen"):
                 self.game_over_screen()
-            elif self.game_state == "LEADERBOARD":
+        elif self.game_state == "LEADERBOARD":
+            with profiler.phase("leaderboard_screen"):
                 self.leaderboard_screen()
 
-            pygame.display.flip()
+        if profiler.enabled:
+            overlay_rect = self.draw_profiler_overlay()
+            if dirty_rects is not None:
+                dirty_rects.append(overlay_rect)
+        return dirty_rects
+
+    def main_loop(self):
+        """The main loop for the entire application."""
+        profiler = self.profiler
+        while True:
+            if self.is_idle():
+                self.wait_for_event()
+            profiler.begin_frame()
+            dirty_rects = self.render_frame()
+            with profiler.phase("display.flip"):
+                if dirty_rects is None:
+                    pygame.display.flip()
+                else:
+                    pygame.display.update(dirty_rects)
+            if self.capture is not None:
+                with profiler.phase("capture"):
+                    self.capture.grab(self.screen)
+            profiler.end_frame(self.ticks_simulated, len(self.snake.positions), len(self.particles))
             self.clock.tick(FPS)
 
+    def is_idle(self):
+        """True when the screen already shows the current state and nothing on it animates."""
+        if self.game_state not in IDLE_SCREENS or self.game_state != self.last_state:
+            return False
+        if self.frame_events or self.profiler.enabled or self.capture is not None:
+            return False   # Show what the events changed; the overlay and recordings want every frame
+        if self.game_state == "GAME_OVER" and not all(fruit.settled for fruit in self.fruits):
+            return False   # A fruit is still growing in behind the game over text
+        return True
+
+    def wait_for_event(self):
+        """Sleeps until an event arrives or IDLE_WAIT_MS passes, rather than redrawing at FPS."""
+        deadline = pygame.time.get_ticks() + IDLE_WAIT_MS
+        while True:
+            event = pygame.event.wait(max(1, deadline - pygame.time.get_ticks()))
+            if event.type == pygame.NOEVENT:
+                break
+            if event.type != pygame.MOUSEMOTION:   # No screen reacts to the pointer moving
+                self.waited_events.append(event)
+                self.poll_ticks = pygame.time.get_ticks()
+                break
+        self.clock.tick()   # Don't count the sleep as frame time
+
+    def poll_events(self):
+        """Returns this frame's events, starting with any an idle wait took off the queue."""
+        if not self.waited_events:
+            self.poll_ticks = pygame.time.get_ticks()
+        events = self.waited_events + pygame.event.get()
+        self.waited_events = []
+        self.frame_events = len(events)
+        return events
+
+    def handle_hotkey(self, event):
+        """Handles keys that work on every screen; returns True if the event was used."""
+        if event.type != pygame.KEYDOWN:
+            return False
+        if event.key == pygame.K_F3:
+            self.toggle_profiler()
+        elif event.key == pygame.K_F9:
+            self.toggle_recording()
+        else:
+            return False
+        return True
+
+    def toggle_profiler(self):
+        self.profiler.enabled = not self.profiler.enabled
+        self.world = None   # Full redraw to clear or show the overlay
+
+    def toggle_recording(self):
+        if self.capture is None:
+            self.start_recording()
+        else:
+            self.stop_recording()
+
+    def start_recording(self, path=None):
+        """Records every other frame to path, by default a dated video (or PNG folder) under captures/."""
+        if path is None:
+            extension = '.mp4' if shutil.which('ffmpeg') else ''   # Otherwise a PNG sequence
+            path = os.path.join('captures', f"snake-{datetime.now():%Y%m%d-%H%M%S}{extension}")
+        self.capture = FrameCapture(path, self.screen.get_size(), RECORD_FPS, every=max(1, FPS // RECORD_FPS))
+        print(f"Recording to {path} (F9 to stop)")
+
+    def stop_recording(self, background=True):
+        """Stops recording; the encoder finishes on a thread so the game carries on."""
+        capture, self.capture = self.capture, None
+        if capture is None:
+            return
+        if background:
+            threading.Thread(target=self.finish_recording, args=(capture,), name="CaptureClose").start()
+        else:
+            self.finish_recording(capture)
+
+    def finish_recording(self, capture):
+        written = capture.close()
+        if capture.error:
+            print(f"Warning: Recording failed: {capture.error}")
+        else:
+            print(f"Saved {written} frames to {capture.path} ({capture.dropped} dropped)")
+
+    def draw_profiler_overlay(self):
+        """Draws the profiler's rolling stats in an opaque box at the top right."""
+        lines = self.profiler.summary_lines()
+        line_height = FONT_S.get_linesize()
+        box = pygame.Rect(0, 0, 340, 16 + line_height * 12)
+        box.topright = (SCREEN_WIDTH - 10, 10)
+        pygame.draw.rect(self.screen, COLOR_INPUT_BOX, box)
+        for i, line in enumerate(lines[:12]):
+            self.screen.blit(FONT_S.render(line, True, COLOR_TEXT), (box.x + 8, box.y + 8 + i * line_height))
+        return box
+
+
+    def loading_screen(self, loader):
+        """Starts the asset loader thread and shows a loading bar until it finishes.
+
+        The label is rendered before the loader starts, since SDL_ttf must
+        not be used from two threads at once; the loop itself only blits.
+        """
+        label = pygame.font.Font(None, 36).render("Loading...", True, COLOR_TEXT)
+        loader.start()
+        bar = pygame.Rect(0, 0, 400, 12)
+        bar.center = (SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2 + 40)
+        frame = 0
+        while loader.is_alive():
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.quit(), sys.exit()
+            self.draw_background()
+            self.screen.blit(label, label.get_rect(center=(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)))
+            pygame.draw.rect(self.screen, COLOR_INPUT_BOX, bar)
+            block = pygame.Rect(bar.x + (frame * 8) % (bar.width - 80), bar.y, 80, bar.height)
+            pygame.draw.rect(self.screen, COLOR_ACCENT, block)
+            pygame.display.flip()
+            self.clock.tick(FPS)
+            frame += 1
+        loader.join()
 
     def main_menu_screen(self):
         """Displays the main menu and handles its logic."""
@@ -471,7 +976,7 @@ class SnakeGame:
         for i, (key, options) in enumerate(self.menu_buttons.items()):
             label = key.replace("_", " ").title()
             
-            if key in ["game_mode", "difficulty"]:
+            if key in ["game_mode", "player", "difficulty", "board_size"]:
                 current_selection_index = self.menu_buttons[key].index(getattr(self, key))
                 value = self.menu_buttons[key][current_selection_index]
                 display_text = f"{label}: {value}"
@@ -481,15 +986,17 @@ class SnakeGame:
             is_selected = self.selected_button[0] == key
             color = COLOR_ACCENT if is_selected else COLOR_TEXT
             
-            text_surf = FONT_L.render(display_text, True, color)
+            text_surf = TEXT_CACHE.render(display_text, FONT_L, color)
             text_rect = text_surf.get_rect(center=(SCREEN_WIDTH / 2, y_pos))
             self.screen.blit(text_surf, text_rect)
             
             button_rects[key] = text_rect
-            y_pos += 70
+            y_pos += 60
 
         # Handle menu input
-        for event in pygame.event.get():
+        for event in self.poll_events():
+            if self.handle_hotkey(event):
+                continue
             if event.type == pygame.QUIT:
                 pygame.quit(), sys.exit()
             
@@ -523,13 +1030,13 @@ class SnakeGame:
                     new_cat_idx = (current_cat_idx + 1) % len(button_keys)
                     self.selected_button = (button_keys[new_cat_idx], 0)
                 elif event.key in [pygame.K_LEFT, pygame.K_a]:
-                    if current_cat in ["game_mode", "difficulty"]:
+                    if current_cat in ["game_mode", "player", "difficulty", "board_size"]:
                         options = self.menu_buttons[current_cat]
                         current_val_idx = options.index(getattr(self, current_cat))
                         new_val_idx = (current_val_idx - 1) % len(options)
                         setattr(self, current_cat, options[new_val_idx])
                 elif event.key in [pygame.K_RIGHT, pygame.K_d]:
-                    if current_cat in ["game_mode", "difficulty"]:
+                    if current_cat in ["game_mode", "player", "difficulty", "board_size"]:
                         options = self.menu_buttons[current_cat]
                         current_val_idx = options.index(getattr(self, current_cat))
                         new_val_idx = (current_val_idx + 1) % len(options)
@@ -545,18 +1052,35 @@ class SnakeGame:
                         pygame.quit(), sys.exit()
 
     def game_play_screen(self):
-        """Manages the active gameplay session."""
-        self.handle_game_events()
-        self.update_game_logic()
-        
-        self.draw_background()
-        self.draw_game_elements()
-        self.draw_hud()
-        self.update_particles()
+        """Manages the active gameplay session; returns the damaged rects when drawing incrementally."""
+        profiler = self.profiler
+        with profiler.phase("handle_game_events"):
+            self.handle_game_events()
+        with profiler.phase("update_game_logic"):
+            self.update_game_logic()
+        if self.camera.follow(self.snake.get_head_position(), self.engine.board):
+            self.world = None   # The view scrolled; redraw the visible cells
+
+        if self.dirty_rendering:
+            with profiler.phase("draw_game_incremental"):
+                dirty_rects = self.draw_game_incremental()
+            with profiler.phase("update_particles"):
+                self.update_particles()
+            return dirty_rects
+
+        with profiler.phase("draw_background"):
+            self.draw_background(with_obstacles=True)
+        with profiler.phase("draw_game_elements"):
+            self.draw_game_elements()
+        with profiler.phase("draw_hud"):
+            self.draw_hud()
+        with profiler.phase("update_particles"):
+            self.update_particles()
+        return None
 
     def game_over_screen(self):
         """Displays the game over screen and input for name."""
-        self.draw_background()
+        self.draw_background(with_obstacles=True)
         self.draw_game_elements()
 
         # Game Over text
@@ -573,7 +1097,9 @@ class SnakeGame:
         draw_text(self.player_name, FONT_M, COLOR_TEXT, self.screen, input_rect.x + 10, input_rect.y + 10)
         draw_text("Enter Name , Press Enter", FONT_S, COLOR_TEXT, self.screen, SCREEN_WIDTH / 2, SCREEN_HEIGHT * 0.75, center=True)
 
-        for event in pygame.event.get():
+        for event in self.poll_events():
+            if self.handle_hotkey(event):
+                continue
             if event.type == pygame.QUIT:
                 pygame.quit(), sys.exit()
             if event.type == pygame.KEYDOWN:
@@ -613,7 +1139,9 @@ class SnakeGame:
         
         draw_text("Press ESC to return to Main Menu", FONT_M, COLOR_TEXT, self.screen, SCREEN_WIDTH / 2, SCREEN_HEIGHT - 50, center=True)
 
-        for event in pygame.event.get():
+        for event in self.poll_events():
+            if self.handle_hotkey(event):
+                continue
             if event.type == pygame.QUIT:
                 pygame.quit(), sys.exit()
             if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
@@ -621,7 +1149,59 @@ class SnakeGame:
                 pygame.mixer.music.play(-1)
 
 
-if __name__ == '__main__':
-    game = SnakeGame()
+def print_startup_report():
+    print("Startup time by phase (fonts and audio load in the background):")
+    for name, ms in STARTUP_PHASES:
+        print(f"  {name:<16}{ms:8.1f} ms")
+
+
+def main(argv=None):
+    """Opens the window, loads assets behind a loading screen and runs the game."""
+    parser = argparse.ArgumentParser(description="Advanced Snake Game")
+    parser.add_argument("--no-audio", action="store_true", help="skip audio initialization and sounds")
+    parser.add_argument("--startup-report", action="store_true", help="print how long each startup phase took")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="record frame timings and write them on exit (.csv, otherwise Chrome trace JSON)")
+    parser.add_argument("--board", metavar="WxH", help="start with a custom board size, e.g. 500x300")
+    parser.add_argument("--record", metavar="PATH",
+                        help="record from startup (.gif, .mp4, .raw, otherwise a PNG directory); F9 stops")
+    args = parser.parse_args(argv)
+    if args.board:
+        try:
+            width, height = (int(n) for n in args.board.lower().split('x'))
+        except ValueError:
+            parser.error("--board must look like 500x300")
+        if not (2 <= width <= 65535 and 2 <= height <= 65535):
+            parser.error("--board sides must be between 2 and 65535 cells")
+    STARTUP_PHASES.append(("import", (time.perf_counter() - _IMPORT_START) * 1000))
+
+    # Only the display and font modules are needed to show the first frame
+    with startup_phase("display init"):
+        pygame.display.init()
+        pygame.font.init()
+    with startup_phase("window"):
+        game = SnakeGame()
+    if args.board:
+        game.board_size = f"{width}x{height}"
+        if game.board_size not in BOARD_SIZES:
+            BOARD_SIZES.append(game.board_size)
+    if args.profile:
+        game.profiler.recording = True
+        atexit.register(game.profiler.export, args.profile)
+
+    loader = threading.Thread(target=load_assets, args=(not args.no_audio,), daemon=True)
+    game.loading_screen(loader)
+    STARTUP_PHASES.append(("to menu", (time.perf_counter() - _IMPORT_START) * 1000))
+    if args.startup_report:
+        print_startup_report()
+
     pygame.mixer.music.play(-1)
-    game.main_loop()
\ No newline at end of file
+    atexit.register(game.stop_recording, False)
+    if args.record:
+        game.start_recording(args.record)
+    game.main_loop()
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()   # The recording encoder runs in a child process
+    main()
\ No newline at end of file
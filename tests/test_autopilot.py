@@ -0,0 +1,33 @@
+import time
+
+import pytest
+
+import autopilot
+import engine
+
+
+@pytest.mark.parametrize("mode", ["Classic", "Obstacle", "Wall-less"])
+def test_no_tick_on_a_large_board_outlasts_a_hard_tick(mode):
+    game = engine.SnakeEngine(mode, "Hard", seed=3, width=250, height=250)
+    pilot = autopilot.Autopilot().attach(game)
+    worst = 0
+    while game.ticks < 2000 and not game.game_over_flag:
+        start = time.thread_time()   # CPU time, so other processes on a busy machine don't count
+        game.step()
+        worst = max(worst, time.thread_time() - start)
+    assert not game.game_over_flag and game.score > 0
+    assert pilot.searches > 0
+    assert worst < 1 / engine.BASE_SPEEDS["Hard"]
+
+
+@pytest.mark.parametrize("mode", ["Classic", "Obstacle"])
+def test_searches_over_budget_finish_while_holding_course(mode):
+    game = engine.SnakeEngine(mode, "Hard", seed=3, width=250, height=250)
+    pilot = autopilot.Autopilot(budget=autopilot.SEARCH_CHUNK).attach(game)
+    held_at = None
+    while game.ticks < 3000 and not game.game_over_flag:
+        game.step()
+        if held_at is None and pilot._pending is not None:
+            held_at = game.score
+    assert held_at is not None
+    assert not game.game_over_flag and game.score > held_at
@@ -0,0 +1,29 @@
+import engine
+from replay import ReplayRecorder
+
+
+def test_rendering_a_replay_leaves_the_players_scores_alone(tmp_path, monkeypatch):
+    home = tmp_path / "home"
+    home.mkdir()
+    legacy = tmp_path / "high_scores.json"
+    legacy.write_text('[{"name": "Bob", "score": 40, "date": "2025-01-01", "mode": "Classic", "difficulty": "Easy"}]')
+    before = (legacy.read_bytes(), legacy.stat().st_mtime_ns)
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.delenv("APPDATA", raising=False)
+    monkeypatch.chdir(tmp_path)   # Where the game would import a legacy high_scores.json from
+
+    game = engine.SnakeEngine("Classic", "Easy", seed=1)
+    recorder = ReplayRecorder().attach(game)
+    for tick in range(40):
+        game.step(engine.DIRECTIONS[tick // 10 % 4])
+
+    from capture import ReplayRenderer
+    renderer = ReplayRenderer()
+    try:
+        capture = renderer.render(recorder.replay, str(tmp_path / "clip.raw"), fps=30, hold=0.1)
+    finally:
+        renderer.close()
+
+    assert capture.error is None and capture.captured > 0
+    assert list(home.iterdir()) == []   # No score store was created or imported into
+    assert (legacy.read_bytes(), legacy.stat().st_mtime_ns) == before
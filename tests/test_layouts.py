@@ -0,0 +1,33 @@
+import random
+
+import engine
+
+
+def walled_layout():
+    # A 5x3 board with a wall down column 2 that leaves a gap in the bottom row,
+    # plus an obstacle ring shutting cell (4, 0) off from the rest
+    board = engine.Board(5, 3)
+    positions = ((2, 0), (2, 1), (3, 0), (4, 1))
+    for pos in positions:
+        board.add_obstacle(pos)
+    return board, engine.ObstacleLayout(5, 3, positions, (0, 0))
+
+
+def test_distances_count_moves_around_obstacles():
+    _, layout = walled_layout()
+    assert list(layout.distances()) == [0, 1, -1, -1, -1,
+                                        1, 2, -1, 6, -1,
+                                        2, 3, 4, 5, 6]
+    assert layout.distances() is layout.distances()
+
+
+def test_fruit_never_lands_where_the_distances_lead_nowhere():
+    board, layout = walled_layout()
+    fruit = engine.Fruit()
+    rng = random.Random(0)
+    seen = set()
+    for _ in range(200):
+        assert fruit.randomize_position(board, rng, layout.distances())
+        seen.add(fruit.pos)
+    assert (4, 0) not in seen
+    assert len(seen) == 10   # Every other open cell
@@ -0,0 +1,47 @@
+import multiprocessing as mp
+import os
+import time
+
+import pytest
+
+pytest.importorskip("numpy")
+import rollout
+
+# The failing workers below are swapped in by patching rollout._worker, which
+# only reaches the child processes when they are forked
+pytestmark = pytest.mark.skipif(mp.get_start_method() != "fork", reason="needs the fork start method")
+
+
+def test_restart_survives_a_replacement_that_dies(tmp_path, monkeypatch):
+    real_worker = rollout._worker
+    died = tmp_path / "died"
+
+    def dies_once(*args):
+        if not died.exists():
+            died.touch()
+            os._exit(1)   # The first replacement dies during startup
+        real_worker(*args)
+
+    with rollout.RolloutPool(num_workers=1, envs_per_worker=2, timeout=2.0) as pool:
+        monkeypatch.setattr(rollout, "_worker", dies_once)
+        pool._procs[0].kill()
+        pool._procs[0].join()
+        pool.step()
+        assert died.exists()
+        assert pool.restarts == 2
+        pool.step()   # The second replacement keeps working
+
+
+def test_restart_gives_up_on_a_slot_that_never_starts(monkeypatch):
+    def hangs(*args):
+        time.sleep(60)
+
+    with rollout.RolloutPool(num_workers=1, envs_per_worker=1, timeout=0.5) as pool:
+        monkeypatch.setattr(rollout, "_worker", hangs)
+        pool._procs[0].kill()
+        pool._procs[0].join()
+        start = time.perf_counter()
+        with pytest.raises(RuntimeError, match="rollout worker 0"):
+            pool.step()
+        assert time.perf_counter() - start < 10
+        assert pool.restarts == rollout.RESTART_ATTEMPTS
@@ -0,0 +1,309 @@
+# Tournament Runner
+# Plays many headless games per (mode, difficulty) with a chosen policy,
+# streams one result per game to JSONL or CSV as games finish, and reports
+# throughput, score and length distributions and death causes with 95%
+# confidence intervals. Never opens a window.
+#
+#   python tournament.py --games 200                                # autopilot, every mode and difficulty
+#   python tournament.py --modes Classic Obstacle --difficulties Hard --policy random -o runs.csv
+#   python tournament.py --policy mybots:GreedyBot --workers 4 -o runs.jsonl
+#   python tournament.py --fruit-weights apple=60,gold_apple=15,grape=25
+#   python tournament.py --modes Obstacle --board 1000x1000 --layout-cache   # reuse layouts across runs
+#
+# A plugin policy is module:name, where name is a class or factory whose
+# objects have choose(game) -> direction or None, the autopilot interface.
+
+import argparse
+import csv
+import importlib
+import json
+import math
+import multiprocessing as mp
+import random
+import sys
+import time
+from collections import Counter
+
+import engine
+from autopilot import Autopilot
+from layouts import LayoutCache
+
+DEFAULT_MAX_TICKS = 50000   # Games still going after this many ticks end with cause "max_ticks"
+Z_95 = 1.96
+RESULT_FIELDS = (["game", "mode", "difficulty", "seed", "policy", "score", "length", "ticks", "death_cause"]
+                 + [f"eaten_{name}" for name in engine.FRUIT_TYPES] + ["seconds"])
+
+
+# --- Policies ---
+class RandomPolicy:
+    """Moves in a random direction every tick; the floor any bot should clear."""
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def choose(self, game):
+        return self.rng.choice(engine.DIRECTIONS)
+
+
+def load_policy(spec):
+    """Returns a factory making a fresh policy for a game from its seed."""
+    if spec == "scripted":
+        autopilot = Autopilot()   # One per process, so its Hamiltonian cycle is built once
+        return lambda seed: autopilot
+    if spec == "random":
+        return RandomPolicy
+    module_name, _, name = spec.partition(':')
+    if not module_name or not name:
+        raise ValueError(f"unknown policy {spec!r}; use scripted, random or module:name")
+    factory = getattr(importlib.import_module(module_name), name)
+    if not hasattr(factory(), 'choose'):
+        raise ValueError(f"{spec} objects have no choose(game) method")
+    return lambda seed: factory()
+
+
+# --- Games ---
+_policies = {}   # Policy factories and engines, per process
+_engines = {}
+_layout_cache = None
+
+def _init_worker(fruit_weights, layout_dir=None):
+    global _layout_cache
+    if layout_dir is not None:
+        _layout_cache = LayoutCache(layout_dir or None)
+    if fruit_weights:
+        engine.FRUIT_WEIGHTS.clear()
+        engine.FRUIT_WEIGHTS.update(fruit_weights)
+
+def play_game(job):
+    """Plays one game to its end (or max_ticks) and returns its result row."""
+    index, mode, difficulty, seed, width, height, policy, max_ticks = job
+    factory = _policies.get(policy)
+    if factory is None:
+        factory = _policies[policy] = load_policy(policy)
+    game = _engines.get((width, height))
+    if game is None:
+        game = _engines[(width, height)] = engine.SnakeEngine("Classic", difficulty, width=width, height=height)
+        game.layout_cache = _layout_cache
+    game.reset(mode, difficulty, seed)
+    game.autopilot = factory(seed)
+    eaten = Counter()
+    start = time.perf_counter()
+    while not game.game_over_flag and game.ticks < max_ticks:
+        for event, data in game.step():
+            if event == "eat":
+                eaten[data.type] += 1
+    result = {
+        "game": index, "mode": mode, "difficulty": difficulty, "seed": seed, "policy": policy,
+        "score": game.score, "length": game.snake.length, "ticks": game.ticks,
+        "death_cause": game.death_cause or "max_ticks",
+    }
+    for name in engine.FRUIT_TYPES:
+        result[f"eaten_{name}"] = eaten[name]
+    result["seconds"] = round(time.perf_counter() - start, 6)
+    game.autopilot = None
+    return result
+
+def jobs(configs, games, seed, width, height, policy, max_ticks):
+    """Yields the games to play; seeds depend only on seed, so runs can be repeated."""
+    rng = random.Random(seed)
+    index = 0
+    for mode, difficulty in configs:
+        for _ in range(games):
+            yield (index, mode, difficulty, rng.getrandbits(64), width, height, policy, max_ticks)
+            index += 1
+
+
+# --- Result Files ---
+# Files are line-buffered, so every row is written out as its game finishes
+# and a killed run keeps all the rows it reported
+class JsonlResults:
+    def __init__(self, path):
+        self.file = open(path, 'w', buffering=1)
+
+    def write(self, result):
+        self.file.write(json.dumps(result) + '\n')
+
+    def close(self):
+        self.file.close()
+
+
+class CsvResults:
+    def __init__(self, path):
+        self.file = open(path, 'w', newline='', buffering=1)
+        self.writer = csv.DictWriter(self.file, RESULT_FIELDS)
+        self.writer.writeheader()
+
+    def write(self, result):
+        self.writer.writerow(result)
+
+    def close(self):
+        self.file.close()
+
+
+def open_results(path):
+    return CsvResults(path) if path.lower().endswith('.csv') else JsonlResults(path)
+
+
+# --- Statistics ---
+def mean_ci(counts):
+    """Mean of a value -> count histogram and the half-width of its 95% confidence interval."""
+    n = sum(counts.values())
+    if n == 0:
+        return 0.0, 0.0
+    mean = sum(v * c for v, c in counts.items()) / n
+    if n == 1:
+        return mean, math.inf
+    variance = sum(c * (v - mean) ** 2 for v, c in counts.items()) / (n - 1)
+    return mean, Z_95 * math.sqrt(variance / n)
+
+def quantile(counts, q):
+    """The q-quantile of a value -> count histogram (nearest rank)."""
+    n = sum(counts.values())
+    rank = max(1, math.ceil(q * n))
+    seen = 0
+    for value in sorted(counts):
+        seen += counts[value]
+        if seen >= rank:
+            return value
+    return 0
+
+def wilson(k, n):
+    """95% Wilson score interval for a proportion k/n."""
+    if n == 0:
+        return 0.0, 0.0
+    p = k / n
+    z2 = Z_95 * Z_95
+    center = (p + z2 / (2 * n)) / (1 + z2 / n)
+    half = Z_95 * math.sqrt(p * (1 - p) / n + z2 / (4 * n * n)) / (1 + z2 / n)
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+class Summary:
+    """Running totals for one group of games.
+
+    Scores and lengths are kept as value -> count histograms, so memory
+    follows the number of distinct values rather than the number of games.
+    """
+    def __init__(self):
+        self.games = 0
+        self.ticks = 0
+        self.seconds = 0.0
+        self.scores = Counter()
+        self.lengths = Counter()
+        self.causes = Counter()
+        self.eaten = Counter()
+
+    def add(self, result):
+        self.games += 1
+        self.ticks += result["ticks"]
+        self.seconds += result["seconds"]
+        self.scores[result["score"]] += 1
+        self.lengths[result["length"]] += 1
+        self.causes[result["death_cause"]] += 1
+        for name in engine.FRUIT_TYPES:
+            self.eaten[name] += result[f"eaten_{name}"]
+
+    def lines(self):
+        def distribution(label, counts):
+            mean, half = mean_ci(counts)
+            return (f"  {label:<7}{mean:10.1f} ± {half:<8.1f} median {quantile(counts, 0.5)}"
+                    f"  p10 {quantile(counts, 0.1)}  p90 {quantile(counts, 0.9)}"
+                    f"  min {min(counts)}  max {max(counts)}")
+
+        lines = [distribution("score", self.scores), distribution("length", self.lengths)]
+        causes = []
+        for cause, k in self.causes.most_common():
+            lo, hi = wilson(k, self.games)
+            causes.append(f"{cause} {k / self.games:.1%} [{lo:.1%}, {hi:.1%}]")
+        lines.append("  deaths  " + ", ".join(causes))
+        total = sum(self.eaten.values())
+        if total:
+            lines.append("  eaten   " + ", ".join(f"{name} {self.eaten[name] / total:.1%}"
+                                                  for name in engine.FRUIT_TYPES if self.eaten[name]))
+        return lines
+
+
+# --- Command Line ---
+def parse_weights(text):
+    weights = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        if name not in engine.FRUIT_TYPES:
+            raise argparse.ArgumentTypeError(f"unknown fruit {name!r}; choose from {', '.join(engine.FRUIT_TYPES)}")
+        try:
+            weights[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"weight for {name} must be a number")
+    return weights
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run headless Snake games in bulk and summarize the results")
+    parser.add_argument("--games", type=int, default=100, help="games per mode and difficulty")
+    parser.add_argument("--modes", nargs="+", default=engine.GAME_MODES, choices=engine.GAME_MODES)
+    parser.add_argument("--difficulties", nargs="+", default=engine.DIFFICULTIES, choices=engine.DIFFICULTIES)
+    parser.add_argument("--policy", default="scripted", help="scripted (the autopilot), random or module:name")
+    parser.add_argument("--board", default=f"{engine.GRID_WIDTH}x{engine.GRID_HEIGHT}", help="board size as WxH")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the games' seeds")
+    parser.add_argument("--max-ticks", type=int, default=DEFAULT_MAX_TICKS)
+    parser.add_argument("--workers", type=int, default=1, help="processes to play games in")
+    parser.add_argument("--fruit-weights", type=parse_weights,
+                        help="Multi-fruit spawn weights, e.g. apple=70,gold_apple=10,grape=20")
+    parser.add_argument("--layout-cache", nargs="?", const="", metavar="DIR",
+                        help="load and save Obstacle layouts in DIR (default: next to the high scores)")
+    parser.add_argument("-o", "--output", help="stream per-game results here (.csv, otherwise JSONL)")
+    args = parser.parse_args(argv)
+    try:
+        width, height = (int(n) for n in args.board.lower().split('x'))
+    except ValueError:
+        parser.error("--board must look like 100x100")
+    try:
+        load_policy(args.policy)
+    except (ImportError, AttributeError, ValueError) as e:
+        parser.error(f"--policy: {e}")
+
+    configs = [(mode, difficulty) for mode in args.modes for difficulty in args.difficulties]
+    total = len(configs) * args.games
+    todo = jobs(configs, args.games, args.seed, width, height, args.policy, args.max_ticks)
+    summaries = {config: Summary() for config in configs}
+    overall = Summary()
+    results = open_results(args.output) if args.output else None
+    pool = None
+    start = shown = time.perf_counter()
+    try:
+        if args.workers > 1:
+            pool = mp.get_context().Pool(args.workers, initializer=_init_worker, initargs=(args.fruit_weights, args.layout_cache))
+            finished = pool.imap_unordered(play_game, todo, chunksize=max(1, min(16, total // (args.workers * 8))))
+        else:
+            _init_worker(args.fruit_weights, args.layout_cache)
+            finished = map(play_game, todo)
+        for result in finished:
+            if results is not None:
+                results.write(result)
+            summaries[(result["mode"], result["difficulty"])].add(result)
+            overall.add(result)
+            now = time.perf_counter()
+            if now - shown > 1.0:
+                shown = now
+                print(f"\r{overall.games}/{total} games", end="", file=sys.stderr, flush=True)
+    except KeyboardInterrupt:
+        print("\nStopped early; summarizing the games that finished", file=sys.stderr)
+    finally:
+        if pool is not None:
+            pool.terminate()
+        if results is not None:
+            results.close()
+    elapsed = time.perf_counter() - start
+    if shown != start:
+        print("\r" + " " * 40 + "\r", end="", file=sys.stderr)   # Clear the progress line
+
+    for (mode, difficulty), summary in summaries.items():
+        if summary.games:
+            print(f"{mode} / {difficulty}: {summary.games} games, {summary.ticks / summary.games:.0f} ticks per game")
+            print("\n".join(summary.lines()))
+    if overall.games:
+        print(f"{overall.games} games with policy {args.policy} in {elapsed:.2f} s: "
+              f"{overall.games / elapsed:.1f} games/s, {overall.ticks / elapsed:,.0f} ticks/s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())